@@ -33,8 +33,107 @@ class Settings(BaseSettings):
     # YouTube Transcript API 設定
     default_language: str = "zh-Hant"  # 繁體中文
     
+    # yt-dlp 設定
+    subtitle_in_memory: bool = True  # 直接從 info_dict 取回 json3 字幕，不寫入暫存檔
+    ytdlp_backend: str = "thread"  # thread: 在執行緒中執行; process: 在工作行程池中執行
+    ytdlp_process_workers: int = 4  # 工作行程數
+    ytdlp_process_max_tasks: int = 100  # 每個工作行程執行多少個工作後回收
+    ytdlp_process_timeout: float = 120.0  # 單一工作逾時秒數，逾時會重建行程池
+    
+    # 影片 metadata 設定
+    video_metadata_backend: str = "pytubefix"  # pytubefix 或 ytdlp（啟用避險時為優先的後端）
+    video_metadata_hedging: bool = True  # 後端過慢或失敗時改用另一個後端
+    metadata_hedge_window: int = 50  # 每個後端統計延遲與錯誤率的滑動視窗（最近 N 次呼叫）
+    metadata_hedge_default_delay: float = 3.0  # 樣本不足時啟動另一個後端前的等待秒數
+    metadata_hedge_min_delay: float = 0.5  # 避險等待秒數下限（p95 延遲低於此值時）
+    metadata_hedge_max_delay: float = 10.0  # 避險等待秒數上限
+    
+    # 上游 HTTP 連線池設定（每個主機一個連線池）
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0  # 閒置連線保留秒數
+    http_timeout: float = 30.0  # 預設逾時秒數
+    http2_enabled: bool = False  # 需要安裝 h2 套件
+    
+    # 上游速率調節設定（每個主機一個 AIMD token bucket）
+    upstream_governor_enabled: bool = True
+    upstream_rate_per_second: float = 5.0  # 初始速率
+    upstream_min_rate: float = 0.2  # 被節流時速率下限
+    upstream_max_rate: float = 20.0  # 速率上限
+    upstream_rate_increase: float = 0.1  # 每次成功增加的速率
+    upstream_rate_decrease: float = 0.5  # 遇到 429／機器人驗證時速率乘上的係數
+    upstream_burst: float = 5.0  # 允許的瞬間請求數
+    upstream_max_retries: int = 3  # 單一請求遇到節流時最多重試次數
+    upstream_retry_base_delay: float = 1.0  # 退避基準秒數（full jitter 指數退避）
+    upstream_retry_max_delay: float = 30.0  # 單次退避上限秒數
+    upstream_retry_budget_ratio: float = 0.1  # 每個請求存入的重試額度，避免重試風暴
+    upstream_max_wait: float | None = 30.0  # 等待 token 的上限秒數，超過時回應 503（None 表示不限）
+    
+    # 阻塞工作執行器設定（yt-dlp / pytubefix）
+    blocking_max_in_flight: int = 8  # 同時執行的阻塞工作數
+    blocking_max_queue: int = 64  # 等待中的工作數上限，超過時回傳 503
+    
+    # 本機資料目錄（SQLite 等持久化資料）
+    data_dir: str = "data"
+    
+    # 字幕持久化儲存設定
+    transcript_store_enabled: bool = True
+    transcript_store_max_bytes: int = 512 * 1024 * 1024  # 512 MB
+    transcript_store_ttl_manual: int = 30 * 24 * 3600  # 手動字幕幾乎不會變動
+    transcript_store_ttl_generated: int = 24 * 3600  # 自動字幕可能被重新產生
+    
+    # Whisper 轉錄結果儲存設定
+    whisper_store_enabled: bool = True
+    
+    # info_dict 快取設定
+    info_cache_ttl: int = 600  # 秒
+    info_cache_max_entries: int = 512
+    
+    # 頻道／播放清單資訊快取設定
+    metadata_cache_ttl: int = 3600  # 秒
+    metadata_cache_max_entries: int = 2048
+    
+    # 負面快取設定（各失敗類別分別設定 TTL，秒）
+    negative_cache_ttl_video_not_found: int = 1800  # 私人、已移除或不存在的影片
+    negative_cache_ttl_disabled: int = 600  # 字幕已停用
+    negative_cache_ttl_not_found: int = 300  # 沒有字幕
+    negative_cache_max_entries: int = 4096
+    
+    # 批次字幕設定
+    batch_max_items: int = 500  # 單次批次請求的影片數上限
+    batch_max_concurrency: int = 8  # 批次請求同時抓取的影片數
+    
+    # 頻道／播放清單列表設定
+    listing_page_delay: float = 1.0  # 連續抓取列表頁面時每次請求的最小間隔（秒）
+    listing_prefetch: bool = True  # 處理目前這一頁時是否預先抓取下一頁
+    
+    # 列表項目補充資訊設定（enrich=publish_date,captions,chapters）
+    enrich_max_concurrency: int = 4  # 單一請求同時抓取的影片數
+    enrich_time_budget: float = 20.0  # 單一請求的補充時間預算（秒），逾時的項目不補充
+    
+    # 頻道增量同步設定
+    channel_sync_max_items: int = 500  # 單次同步最多回傳的新增影片數
+    channel_sync_recent_ids: int = 20  # 水位線保留的最近影片 ID 數
+    
+    # 批量收集工作設定
+    harvest_concurrency: int = 2  # 每個工作同時處理的影片數
+    harvest_rate_per_second: float = 0.5  # 每個工作每秒最多開始幾支影片
+    harvest_max_attempts: int = 3  # 單支影片最多嘗試次數
+    harvest_retry_base_delay: float = 60.0  # 暫時性失敗後第一次重試前等待的秒數，之後每次加倍
+    harvest_retry_max_delay: float = 3600.0  # 重試前等待的秒數上限
+    
     # Whisper Transcribe API 設定 (fallback)
     transcribe_api_url: str | None = "http://192.168.0.160:8001"
+    transcribe_timeout: float = 300.0  # 轉錄可能需要較長時間
+    transcribe_breaker_window: int = 20  # 斷路器滑動視窗（最近 N 次呼叫）
+    transcribe_breaker_min_calls: int = 5  # 視窗內至少幾次呼叫才判斷
+    transcribe_breaker_failure_rate: float = 0.5  # 失敗比例門檻
+    # 慢呼叫秒數，預設為 transcribe_timeout 的一半
+    transcribe_breaker_slow_seconds: float | None = None
+    transcribe_breaker_slow_rate: float = 0.8  # 慢呼叫比例門檻
+    transcribe_breaker_open_seconds: float = 30.0  # 開啟後多久進行探測
+    transcribe_max_concurrent_jobs: int = 2  # 非同步轉錄工作同時執行數
+    transcribe_job_retention: int = 3600  # 已結束的轉錄工作保留秒數
     
     @property
     def fallback_languages(self) -> List[str]:
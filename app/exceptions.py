@@ -48,6 +48,46 @@ class VideoNotFoundError(YouTubeTranscriptError):
         super().__init__(message, status.HTTP_404_NOT_FOUND)
 
 
+class ChannelNotFoundError(YouTubeTranscriptError):
+    """頻道不存在例外"""
+    
+    def __init__(self, channel_id: str):
+        message = f"頻道不存在: {channel_id}"
+        super().__init__(message, status.HTTP_404_NOT_FOUND)
+
+
+class PlaylistNotFoundError(YouTubeTranscriptError):
+    """播放清單不存在例外"""
+    
+    def __init__(self, playlist_id: str):
+        message = f"播放清單不存在或不公開: {playlist_id}"
+        super().__init__(message, status.HTTP_404_NOT_FOUND)
+
+
+class JobNotFoundError(YouTubeTranscriptError):
+    """工作不存在例外"""
+    
+    def __init__(self, job_id: str):
+        message = f"找不到工作: {job_id}"
+        super().__init__(message, status.HTTP_404_NOT_FOUND)
+
+
+class InvalidCursorError(YouTubeTranscriptError):
+    """無效的分頁 cursor 例外"""
+    
+    def __init__(self):
+        message = "無效的分頁 cursor"
+        super().__init__(message, status.HTTP_400_BAD_REQUEST)
+
+
+class ServiceOverloadedError(YouTubeTranscriptError):
+    """服務過載例外（阻塞工作佇列已滿）"""
+    
+    def __init__(self):
+        message = "服務忙碌中，請稍後再試"
+        super().__init__(message, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
 # 例外處理器
 async def youtube_transcript_exception_handler(
     request: Request, exc: YouTubeTranscriptError
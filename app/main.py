@@ -9,7 +9,16 @@ from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from .config import settings
-from .routers import transcript, video, channel, playlist
+from .routers import transcript, video, channel, playlist, harvest
+from .services.executor import get_executor, shutdown_executor
+from .services.yt_dlp_wrapper import shutdown_wrapper
+from .services.cache import get_info_cache, get_metadata_cache, get_negative_cache
+from .services.transcribe_client import get_transcribe_breaker
+from .services.transcribe_jobs import get_job_registry
+from .services.http_client import get_upstream_clients, close_upstream_clients
+from .services.harvest import get_harvest_manager, shutdown_harvest_manager
+from .services.video import get_metadata_provider
+from .services.governor import get_governor
 from .exceptions import (
     YouTubeTranscriptError,
     youtube_transcript_exception_handler,
@@ -24,9 +33,17 @@ async def lifespan(app: FastAPI):
     print(f"🚀 {settings.app_name} v{settings.app_version} 正在啟動...")
     print(f"🌐 服務運行在: http://{settings.host}:{settings.port}")
     print(f"📝 API 文檔可在以下網址查看: http://{settings.host}:{settings.port}/docs")
+    get_upstream_clients()
+    resumed = await get_harvest_manager().resume()
+    if resumed:
+        print(f"📦 繼續執行 {resumed} 個未完成的批量收集工作")
     yield
     # 關閉時執行
     print(f"👋 {settings.app_name} 正在關閉...")
+    await shutdown_harvest_manager()
+    await close_upstream_clients()
+    shutdown_executor()
+    shutdown_wrapper()
 
 
 # 建立 FastAPI 應用程式實例
@@ -79,6 +96,12 @@ app.include_router(
     responses={404: {"description": "Not found"}}
 )
 
+app.include_router(
+    harvest.router,
+    prefix=settings.api_prefix,
+    responses={404: {"description": "Not found"}}
+)
+
 
 # 根路由
 @app.get("/", tags=["系統"])
@@ -108,6 +131,29 @@ async def health_check():
     }
 
 
+@app.get("/status", tags=["系統"])
+async def get_status():
+    """
+    服務內部狀態：執行器、快取、Whisper 後端斷路器、轉錄工作、metadata 後端與上游速率
+    """
+    return {
+        "executor": get_executor().stats(),
+        "caches": {
+            "info": get_info_cache().stats(),
+            "metadata": get_metadata_cache().stats(),
+            "negative": get_negative_cache().stats(),
+        },
+        "transcribe": {
+            "enabled": bool(settings.transcribe_api_url),
+            "circuit": get_transcribe_breaker().status(),
+            "jobs": get_job_registry().stats(),
+        },
+        "upstream_http": get_upstream_clients().stats(),
+        "metadata_backends": get_metadata_provider().stats(),
+        "upstream_governor": get_governor().stats(),
+    }
+
+
 @app.get("/version", tags=["系統"])
 async def get_version():
     """
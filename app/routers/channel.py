@@ -1,10 +1,16 @@
 """YouTube 頻道 API 路由模組"""
 
 from fastapi import APIRouter, HTTPException, Query, status
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from datetime import datetime
-from ..schemas.channel import ChannelVideosResponse, ChannelInfoResponse, VideoItem
+from ..schemas.channel import (
+    ChannelVideosResponse, ChannelSyncResponse, ChannelInfoResponse, VideoItem
+)
 from ..services import channel as service
+from ..services import channel_sync
+from ..services import enrich as enrich_service
+from ..streaming import NDJSON_MEDIA_TYPE, ndjson_response
 
 router = APIRouter(
     prefix="/channel",
@@ -12,13 +18,68 @@ router = APIRouter(
     responses={404: {"description": "頻道不存在"}}
 )
 
+VALID_CONTENT_TYPES = service.CONTENT_TYPES
+
+
+def _validate_content_type(content_type: str) -> None:
+    """驗證 content_type"""
+    if content_type not in VALID_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"無效的 content_type: {content_type}，有效值為: {VALID_CONTENT_TYPES}"
+        )
+
+
+def _parse_enrich(enrich: Optional[str]) -> List[str]:
+    """解析 enrich 欄位，無效時回傳 400"""
+    try:
+        return enrich_service.parse_enrich_fields(enrich)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+async def _enrich_videos(
+    videos: List[dict], fields: List[str], since: Optional[datetime]
+) -> List[dict]:
+    """補充影片詳細資訊；取得確切發布日期後以日期重新套用 since"""
+    if not fields:
+        return videos
+    await enrich_service.enrich_videos(videos, fields)
+    if since and "publish_date" in fields:
+        videos = [info for info in videos if not enrich_service.published_before_date(info, since)]
+    return videos
+
+
+def _parse_content_types(content_type: str) -> List[str]:
+    """
+    解析 content_type，支援單一類型、逗號分隔的列表或 all
+    
+    Returns:
+        不重複的內容類型列表（保留指定的順序）
+    """
+    if content_type == "all":
+        return list(VALID_CONTENT_TYPES)
+    content_types = []
+    for item in content_type.split(","):
+        item = item.strip()
+        _validate_content_type(item)
+        if item not in content_types:
+            content_types.append(item)
+    return content_types
+
 
 @router.get("/{channel_id}/videos", response_model=ChannelVideosResponse)
 async def get_channel_videos(
     channel_id: str,
     since: Optional[datetime] = Query(None, description="只回傳此時間之後發佈的影片 (ISO 8601)"),
     limit: int = Query(20, ge=1, le=100, description="回傳數量上限"),
-    content_type: str = Query("videos", description="內容類型 (videos, shorts, streams)")
+    content_type: str = Query(
+        "videos", description="內容類型 (videos, shorts, streams, all 或逗號分隔的列表)"
+    ),
+    cursor: Optional[str] = Query(None, description="上一頁回傳的 next_cursor（僅限單一內容類型）"),
+    enrich: Optional[str] = Query(
+        None, description="補充詳細資訊 (publish_date, captions, chapters，逗號分隔)"
+    )
 ):
     """
     獲取頻道影片列表
@@ -26,53 +87,85 @@ async def get_channel_videos(
     - **channel_id**: 頻道 ID（以 UC 開頭）
     - **since**: 只回傳此時間之後發佈的影片
     - **limit**: 回傳數量上限（預設 20，最大 100）
-    - **content_type**: 內容類型（videos, shorts, streams）
+    - **content_type**: 內容類型（videos, shorts, streams）；
+      `all` 或逗號分隔的列表會並行抓取並依時間合併
+    - **cursor**: 上一頁回傳的 next_cursor，從上次停下的位置繼續
+    - **enrich**: 並行補充每支影片的確切發布日期、字幕與章節資訊（受時間預算限制）
     """
-    # Validate content_type
-    valid_types = ["videos", "shorts", "streams"]
-    if content_type not in valid_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"無效的 content_type: {content_type}，有效值為: {valid_types}"
+    content_types = _parse_content_types(content_type)
+    enrich_fields = _parse_enrich(enrich)
+    if len(content_types) > 1:
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="合併多個內容類型時不支援 cursor"
+            )
+        return await _get_merged_channel_videos(
+            channel_id, content_types, since, limit, enrich_fields
         )
+    content_type = content_types[0]
     
     try:
         videos = []
+        pager = service.open_channel_pager(channel_id, content_type, cursor, wanted=limit)
         
-        # 獲取生成器，多抓一些以便過濾
-        video_generator = service.get_channel_videos_generator(channel_id, limit=limit * 2, content_type=content_type)
-        
-        for video_data in video_generator:
-            if len(videos) >= limit:
-                break
-            
+        reached_since = False
+        async for video_data in pager:
             info = service.extract_video_info(video_data)
             if not info:
                 continue
             
-            # 處理 since 時間篩選
-            if since:
-                publish_time = service._parse_relative_time(info.get('publish_date'))
-                if publish_time:
-                    # 確保 since 對比的是 aware datetime (假設 parse 出來的是 native，這裡既然只是比較，簡單起見全部轉為 naive 或 aware)
-                    # _parse_relative_time 回傳的是 naive (datetime.now() - delta)
-                    
-                    # 處理時區問題：如果 since 有時區，轉為 naive UTC 或 local？
-                    # 簡單起見，比較 timestamp 或都轉 naive
-                    since_naive = since.replace(tzinfo=None)
-                    
-                    if publish_time < since_naive:
-                        continue
+            # 頻道列表由新到舊，遇到早於 since 的影片即可停止，不必再抓下一頁
+            if since and service.published_before(info, since):
+                reached_since = True
+                break
             
-            videos.append(VideoItem(**info))
+            videos.append(info)
+            if len(videos) >= limit:
+                break
+        
+        videos = await _enrich_videos(videos, enrich_fields, since)
         
         return ChannelVideosResponse(
             success=True,
             channel_id=channel_id,
-            videos=videos,
-            count=len(videos)
+            videos=[VideoItem(content_type=content_type, **info) for info in videos],
+            count=len(videos),
+            next_cursor=None if reached_since else pager.next_cursor()
         )
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"獲取頻道影片時發生錯誤: {str(e)}"
+        )
+
+
+async def _get_merged_channel_videos(
+    channel_id: str,
+    content_types: List[str],
+    since: Optional[datetime],
+    limit: int,
+    enrich_fields: List[str]
+) -> ChannelVideosResponse:
+    """並行抓取多個內容類型並依時間合併"""
+    try:
+        videos = [
+            info async for info in service.stream_channel_videos(
+                channel_id, limit, content_types, since
+            )
+        ]
+        videos = await _enrich_videos(videos, enrich_fields, since)
+        return ChannelVideosResponse(
+            success=True,
+            channel_id=channel_id,
+            videos=[VideoItem(**info) for info in videos],
+            count=len(videos)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -80,6 +173,98 @@ async def get_channel_videos(
         )
 
 
+@router.get(
+    "/{channel_id}/videos/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "每行一個 VideoItem"}}
+)
+async def stream_channel_videos(
+    channel_id: str,
+    since: Optional[datetime] = Query(None, description="只回傳此時間之後發佈的影片 (ISO 8601)"),
+    limit: Optional[int] = Query(None, ge=1, description="回傳數量上限（預設不限）"),
+    content_type: str = Query(
+        "videos", description="內容類型 (videos, shorts, streams, all 或逗號分隔的列表)"
+    )
+):
+    """
+    以 NDJSON 串流頻道影片列表，每取得一頁就立即送出，沒有數量上限
+    
+    - **channel_id**: 頻道 ID（以 UC 開頭）
+    - **since**: 只回傳此時間之後發佈的影片
+    - **limit**: 回傳數量上限（預設不限）
+    - **content_type**: 內容類型（videos, shorts, streams）；
+      `all` 或逗號分隔的列表會並行抓取並依時間合併
+    
+    串流途中發生錯誤時，最後一行為 `{"success": false, "error": ...}`。
+    """
+    content_types = _parse_content_types(content_type)
+    
+    async def items():
+        async for info in service.stream_channel_videos(channel_id, limit, content_types, since):
+            yield VideoItem(**info)
+    
+    return ndjson_response(items())
+
+
+@router.post("/{channel_id}/sync", response_model=ChannelSyncResponse)
+async def sync_channel_videos(
+    channel_id: str,
+    content_type: str = Query("videos", description="內容類型 (videos, shorts, streams)"),
+    limit: int = Query(20, ge=1, le=100, description="第一次同步時回傳的影片數")
+):
+    """
+    增量同步頻道影片，只回傳上次同步之後新增的影片
+    
+    伺服器為每個頻道保存水位線，走訪到第一支已知的影片就停止，一般只需要抓取一頁。
+    
+    - **channel_id**: 頻道 ID（以 UC 開頭）
+    - **content_type**: 內容類型（videos, shorts, streams）
+    - **limit**: 第一次同步（尚無水位線）時回傳的影片數（預設 20，最大 100）
+    """
+    _validate_content_type(content_type)
+    
+    try:
+        result = await channel_sync.sync_channel(channel_id, content_type, limit)
+        videos = [VideoItem(content_type=content_type, **info) for info in result["videos"]]
+        
+        return ChannelSyncResponse(
+            success=True,
+            channel_id=channel_id,
+            content_type=content_type,
+            videos=videos,
+            count=len(videos),
+            initial=result["initial"],
+            truncated=result["truncated"],
+            watermark_video_id=result["watermark"]["latest_video_id"],
+            synced_at=result["watermark"]["synced_at"]
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"同步頻道影片時發生錯誤: {str(e)}"
+        )
+
+
+@router.delete("/{channel_id}/sync")
+async def reset_channel_sync(
+    channel_id: str,
+    content_type: str = Query("videos", description="內容類型 (videos, shorts, streams)")
+):
+    """
+    清除頻道的同步水位線，下次同步會視為第一次同步
+    
+    - **channel_id**: 頻道 ID（以 UC 開頭）
+    - **content_type**: 內容類型（videos, shorts, streams）
+    """
+    _validate_content_type(content_type)
+    removed = await channel_sync.reset_sync(channel_id, content_type)
+    return {
+        "success": True, "channel_id": channel_id, "content_type": content_type, "reset": removed
+    }
+
 
 @router.get("/{channel_id}/info", response_model=ChannelInfoResponse)
 async def get_channel_info(channel_id: str):
@@ -89,13 +274,15 @@ async def get_channel_info(channel_id: str):
     - **channel_id**: 頻道 ID（以 UC 開頭）
     """
     try:
-        info = service.get_channel_basic_info(channel_id)
+        info = await service.get_channel_basic_info_async(channel_id)
         
         return ChannelInfoResponse(
             success=True,
             **info
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,89 @@
+"""批量字幕收集工作 API 路由模組"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from ..config import Settings
+from ..dependencies import get_settings
+from ..exceptions import JobNotFoundError
+from ..schemas.harvest import HarvestJobListResponse, HarvestJobResponse, HarvestRequest
+from ..services.harvest import HARVEST_FAILED, get_harvest_manager
+
+router = APIRouter(
+    prefix="/jobs/harvest",
+    tags=["批量收集"],
+    responses={404: {"description": "工作不存在"}}
+)
+
+
+def _job_response(job: dict) -> HarvestJobResponse:
+    """將工作進度轉換為回應模型"""
+    return HarvestJobResponse(success=job["status"] != HARVEST_FAILED, **job)
+
+
+@router.post("", response_model=HarvestJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_harvest_job(
+    request: HarvestRequest,
+    settings: Settings = Depends(get_settings)
+):
+    """
+    建立批量字幕收集工作，收集整個頻道或播放清單的字幕
+
+    - **source_type**: 來源類型 (channel, playlist)
+    - **source_id**: 頻道 ID 或播放清單 ID
+    - **language**: 可選的語言代碼，預設為繁體中文
+    - **max_videos**: 最多收集幾支影片（預設全部）
+    """
+    try:
+        job = await get_harvest_manager().create_job(
+            request.source_type,
+            request.source_id,
+            request.language or settings.default_language,
+            request.max_videos
+        )
+        return _job_response(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"建立收集工作時發生錯誤: {str(e)}"
+        )
+
+
+@router.get("", response_model=HarvestJobListResponse)
+async def list_harvest_jobs(
+    limit: int = Query(50, ge=1, le=200, description="回傳數量上限")
+):
+    """
+    列出最近的批量字幕收集工作
+
+    - **limit**: 回傳數量上限（預設 50，最大 200）
+    """
+    jobs = [_job_response(job) for job in await get_harvest_manager().list_jobs(limit)]
+    return HarvestJobListResponse(success=True, jobs=jobs, count=len(jobs))
+
+
+@router.get("/{job_id}", response_model=HarvestJobResponse)
+async def get_harvest_job(job_id: str):
+    """
+    查詢批量字幕收集工作進度（含處理速度與預估剩餘時間）
+
+    - **job_id**: 工作 ID
+    """
+    job = await get_harvest_manager().get_job(job_id)
+    if job is None:
+        raise JobNotFoundError(job_id)
+    return _job_response(job)
+
+
+@router.delete("/{job_id}", response_model=HarvestJobResponse)
+async def cancel_harvest_job(job_id: str):
+    """
+    取消批量字幕收集工作
+
+    - **job_id**: 工作 ID
+    """
+    job = await get_harvest_manager().cancel_job(job_id)
+    if job is None:
+        raise JobNotFoundError(job_id)
+    return _job_response(job)
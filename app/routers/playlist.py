@@ -1,8 +1,12 @@
 """YouTube 播放清單 API 路由模組"""
 
 from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
 from ..schemas.playlist import PlaylistVideosResponse, PlaylistInfoResponse, PlaylistVideoItem
 from ..services import playlist as service
+from ..services import enrich as enrich_service
+from ..streaming import NDJSON_MEDIA_TYPE, ndjson_response
 
 router = APIRouter(
     prefix="/playlist",
@@ -14,38 +18,52 @@ router = APIRouter(
 @router.get("/{playlist_id}/videos", response_model=PlaylistVideosResponse)
 async def get_playlist_videos(
     playlist_id: str,
-    limit: int = Query(50, ge=1, le=200, description="回傳數量上限")
+    limit: int = Query(50, ge=1, le=200, description="回傳數量上限"),
+    cursor: Optional[str] = Query(None, description="上一頁回傳的 next_cursor"),
+    enrich: Optional[str] = Query(
+        None, description="補充詳細資訊 (publish_date, captions, chapters，逗號分隔)"
+    )
 ):
     """
     獲取播放清單影片列表
     
     - **playlist_id**: 播放清單 ID（以 PL 開頭）
     - **limit**: 回傳數量上限（預設 50，最大 200）
+    - **cursor**: 上一頁回傳的 next_cursor，從上次停下的位置繼續
+    - **enrich**: 並行補充每支影片的發布日期、字幕與章節資訊（受時間預算限制）
     """
+    try:
+        enrich_fields = enrich_service.parse_enrich_fields(enrich)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
     try:
         videos = []
         position = 1
+        pager = service.open_playlist_pager(playlist_id, cursor, wanted=limit)
         
-        video_generator = service.get_playlist_videos_generator(playlist_id, limit=limit)
-        
-        for video_data in video_generator:
-            if len(videos) >= limit:
-                break
-            
+        async for video_data in pager:
             info = service.extract_playlist_video_info(video_data, position)
             if not info:
                 continue
             
-            videos.append(PlaylistVideoItem(**info))
+            videos.append(info)
             position += 1
+            if len(videos) >= limit:
+                break
+        
+        await enrich_service.enrich_videos(videos, enrich_fields)
         
         return PlaylistVideosResponse(
             success=True,
             playlist_id=playlist_id,
-            videos=videos,
-            count=len(videos)
+            videos=[PlaylistVideoItem(**info) for info in videos],
+            count=len(videos),
+            next_cursor=pager.next_cursor()
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -53,21 +71,55 @@ async def get_playlist_videos(
         )
 
 
+@router.get(
+    "/{playlist_id}/videos/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "每行一個 PlaylistVideoItem"}
+    }
+)
+async def stream_playlist_videos(
+    playlist_id: str,
+    limit: Optional[int] = Query(None, ge=1, description="回傳數量上限（預設不限）")
+):
+    """
+    以 NDJSON 串流播放清單影片列表，每取得一頁就立即送出，沒有數量上限
+    
+    - **playlist_id**: 播放清單 ID（以 PL 開頭）
+    - **limit**: 回傳數量上限（預設不限）
+    
+    串流途中發生錯誤時，最後一行為 `{"success": false, "error": ...}`。
+    """
+    async def items():
+        async for info in service.stream_playlist_videos(playlist_id, limit):
+            yield PlaylistVideoItem(**info)
+    
+    return ndjson_response(items())
+
+
 @router.get("/{playlist_id}/info", response_model=PlaylistInfoResponse)
-async def get_playlist_info(playlist_id: str):
+async def get_playlist_info(
+    playlist_id: str,
+    include_videos: bool = Query(False, description="是否一併回傳第一頁影片"),
+    limit: int = Query(100, ge=1, le=200, description="一併回傳的影片數上限（不超過第一頁）")
+):
     """
     獲取播放清單資訊
     
     - **playlist_id**: 播放清單 ID（以 PL 開頭）
+    - **include_videos**: 一併回傳第一頁影片與下一頁的 cursor（同一次上游請求）
+    - **limit**: 一併回傳的影片數上限（預設 100，不超過第一頁）
     """
     try:
-        info = service.get_playlist_basic_info(playlist_id)
+        info = await service.get_playlist_overview(playlist_id, include_videos, limit)
         
         return PlaylistInfoResponse(
             success=True,
             **info
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
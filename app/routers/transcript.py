@@ -1,7 +1,9 @@
 """YouTube 字幕 API 路由模組"""
 
 from fastapi import APIRouter, Depends, HTTPException, Form, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional
+import json
 
 from ..config import Settings
 from ..dependencies import validate_youtube_url, get_settings
@@ -10,13 +12,24 @@ from ..schemas.transcript import (
     TranscriptResponse, 
     TranscriptTextResponse,
     AvailableLanguagesResponse,
-    TranscriptItem
+    TranscriptItem,
+    TranscribeJobResponse,
+    BatchTranscriptRequest,
+    BatchTranscriptResult
 )
 from ..services import transcript as service
+from ..services.transcribe_jobs import (
+    TranscribeJob,
+    TranscriptionDeferred,
+    get_job_registry
+)
+from ..streaming import ndjson_response
 from ..exceptions import (
+    YouTubeTranscriptError,
     TranscriptNotFoundError,
     TranscriptDisabledError,
-    VideoNotFoundError
+    VideoNotFoundError,
+    JobNotFoundError
 )
 
 
@@ -27,8 +40,29 @@ router = APIRouter(
     responses={404: {"description": "字幕不存在"}}
 )
 
+# SSE 心跳間隔（秒），避免代理伺服器關閉閒置連線
+SSE_HEARTBEAT_SECONDS = 15.0
+
+
+def _job_response(job: TranscribeJob) -> TranscribeJobResponse:
+    """將轉錄工作轉換為回應模型"""
+    return TranscribeJobResponse(success=job.status != "failed", **job.to_dict())
+
+
+def _accepted(job: TranscribeJob, settings: Settings) -> JSONResponse:
+    """回傳 202 與工作資訊（Location 指向工作查詢端點）"""
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=_job_response(job).model_dump(),
+        headers={"Location": f"{settings.api_prefix}{router.prefix}/jobs/{job.id}"}
+    )
 
-@router.post("/", response_model=TranscriptResponse)
+
+@router.post(
+    "/",
+    response_model=TranscriptResponse,
+    responses={202: {"model": TranscribeJobResponse, "description": "已建立 Whisper 轉錄工作"}}
+)
 async def get_transcript(
     request: TranscriptRequest,
     settings: Settings = Depends(get_settings)
@@ -38,6 +72,7 @@ async def get_transcript(
     
     - **youtube_url**: YouTube 影片網址
     - **language**: 可選的語言代碼，預設為繁體中文
+    - **async_fallback**: 需要 Whisper 轉錄時回傳 202 與工作 ID
     """
     # 驗證並提取影片 ID
     video_id = validate_youtube_url(request.youtube_url)
@@ -48,7 +83,8 @@ async def get_transcript(
     try:
         # 獲取字幕
         transcript_data, actual_language = await service.get_transcript_with_fallback(
-            video_id, target_language, settings.fallback_languages
+            video_id, target_language, settings.fallback_languages,
+            defer_fallback=request.async_fallback
         )
         
         # 處理資料
@@ -63,6 +99,8 @@ async def get_transcript(
             duration=total_duration
         )
         
+    except TranscriptionDeferred as deferred:
+        return _accepted(deferred.job, settings)
     except TranscriptDisabledError:
         raise
     except VideoNotFoundError:
@@ -71,7 +109,11 @@ async def get_transcript(
         raise
 
 
-@router.post("/text", response_model=TranscriptTextResponse)
+@router.post(
+    "/text",
+    response_model=TranscriptTextResponse,
+    responses={202: {"model": TranscribeJobResponse, "description": "已建立 Whisper 轉錄工作"}}
+)
 async def get_transcript_text(
     request: TranscriptRequest,
     settings: Settings = Depends(get_settings)
@@ -82,6 +124,7 @@ async def get_transcript_text(
     - **youtube_url**: YouTube 影片網址
     - **language**: 可選的語言代碼，預設為繁體中文
     - **include_chapters**: 是否包含章節標題
+    - **async_fallback**: 需要 Whisper 轉錄時回傳 202 與工作 ID
     """
     # 驗證並提取影片 ID
     video_id = validate_youtube_url(request.youtube_url)
@@ -92,11 +135,12 @@ async def get_transcript_text(
     try:
         # 獲取字幕
         transcript_data, actual_language = await service.get_transcript_with_fallback(
-            video_id, target_language, settings.fallback_languages
+            video_id, target_language, settings.fallback_languages,
+            defer_fallback=request.async_fallback
         )
         
         # 生成輸出
-        full_text, title, has_chapters = service.generate_text_output(
+        full_text, title, has_chapters = await service.generate_text_output_async(
             transcript_data, 
             request.youtube_url, 
             request.include_chapters
@@ -111,6 +155,8 @@ async def get_transcript_text(
             has_chapters=has_chapters
         )
         
+    except TranscriptionDeferred as deferred:
+        return _accepted(deferred.job, settings)
     except TranscriptDisabledError:
         raise
     except VideoNotFoundError:
@@ -119,6 +165,94 @@ async def get_transcript_text(
         raise
 
 
+@router.post(
+    "/batch",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "每行一筆 BatchTranscriptResult"
+        }
+    }
+)
+async def get_transcript_batch(
+    request: BatchTranscriptRequest,
+    settings: Settings = Depends(get_settings)
+):
+    """
+    批次獲取多支影片的字幕，以 NDJSON 依完成順序串流回傳
+    
+    - **items**: 影片列表，每項包含 youtube_url 與可選的 language
+    
+    重複的影片（相同影片 ID 與語言）只會抓取一次；每筆結果各自帶有成功或錯誤資訊，
+    單一影片失敗不影響其他影片。
+    """
+    if len(request.items) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"批次請求最多 {settings.batch_max_items} 支影片"
+        )
+    
+    # 驗證網址並合併重複項目
+    targets = {}
+    invalid = []
+    for index, item in enumerate(request.items):
+        try:
+            video_id = validate_youtube_url(item.youtube_url)
+        except HTTPException as e:
+            invalid.append(BatchTranscriptResult(
+                success=False,
+                indices=[index],
+                youtube_url=item.youtube_url,
+                error=e.detail,
+                error_type="InvalidYouTubeURLError",
+                status_code=e.status_code
+            ))
+            continue
+        
+        key = (video_id, item.language or settings.default_language)
+        if key not in targets:
+            targets[key] = {"youtube_url": item.youtube_url, "indices": []}
+        targets[key]["indices"].append(index)
+    
+    async def results():
+        for result in invalid:
+            yield result
+        
+        async for video_id, language, data, error in service.iter_transcripts_concurrently(
+            list(targets), settings.fallback_languages, settings.batch_max_concurrency
+        ):
+            target = targets[(video_id, language)]
+            if error is None:
+                transcript_items, total_duration = service.process_transcript_data(data[0])
+                yield BatchTranscriptResult(
+                    success=True,
+                    indices=target["indices"],
+                    youtube_url=target["youtube_url"],
+                    video_id=video_id,
+                    language=data[1],
+                    transcript=[TranscriptItem(**item) for item in transcript_items],
+                    total_items=len(transcript_items),
+                    duration=total_duration
+                )
+            else:
+                is_known = isinstance(error, YouTubeTranscriptError)
+                yield BatchTranscriptResult(
+                    success=False,
+                    indices=target["indices"],
+                    youtube_url=target["youtube_url"],
+                    video_id=video_id,
+                    error=error.message if is_known else str(error),
+                    error_type=type(error).__name__ if is_known else "InternalServerError",
+                    status_code=(
+                        error.status_code if is_known
+                        else status.HTTP_500_INTERNAL_SERVER_ERROR
+                    )
+                )
+    
+    return ndjson_response(results())
+
+
 @router.post("/form", response_model=TranscriptResponse)
 async def get_transcript_form(
     youtube_url: str = Form(..., description="YouTube 影片網址"),
@@ -142,7 +276,7 @@ async def get_available_languages(video_id: str):
     - **video_id**: YouTube 影片 ID
     """
     try:
-        languages = service.get_available_languages(video_id)
+        languages = await service.get_available_languages_async(video_id)
         
         return AvailableLanguagesResponse(
             success=True,
@@ -156,4 +290,50 @@ async def get_available_languages(video_id: str):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"獲取可用語言時發生錯誤: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/jobs/{job_id}", response_model=TranscribeJobResponse)
+async def get_transcribe_job(job_id: str):
+    """
+    查詢 Whisper 轉錄工作狀態
+    
+    - **job_id**: 工作 ID
+    """
+    job = get_job_registry().get(job_id)
+    if job is None:
+        raise JobNotFoundError(job_id)
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_transcribe_job(job_id: str):
+    """
+    以 Server-Sent Events 串流 Whisper 轉錄工作狀態，工作結束後關閉連線
+    
+    - **job_id**: 工作 ID
+    """
+    job = get_job_registry().get(job_id)
+    if job is None:
+        raise JobNotFoundError(job_id)
+    
+    async def event_stream():
+        last_status = None
+        while True:
+            if job.status != last_status:
+                last_status = job.status
+                payload = _job_response(job).model_dump()
+                yield f"event: {job.status}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+                if job.finished:
+                    break
+                continue
+            
+            # 等待狀態改變，逾時則送出心跳
+            if not await job.wait_for_change(SSE_HEARTBEAT_SECONDS):
+                yield ": keep-alive\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
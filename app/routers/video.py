@@ -1,9 +1,11 @@
 """YouTube 影片資訊 API 路由模組"""
 
-from fastapi import APIRouter, HTTPException, status
-from ..schemas.video import VideoInfoResponse, ChapterInfo
+from fastapi import APIRouter, HTTPException, Query, status
+from typing import Optional
+from ..config import settings
+from ..schemas.video import VideoInfoResponse, VideoBundleResponse, ChapterInfo
 from ..services import video as service
-from pytubefix import YouTube
+from ..services import bundle as bundle_service
 
 router = APIRouter(
     prefix="/video",
@@ -20,8 +22,8 @@ async def get_video_metadata(video_id: str):
     - **video_id**: YouTube 影片 ID
     """
     try:
-        url = f"https://www.youtube.com/watch?v={video_id}"
-        info = service.get_video_info(url)
+        # 所有欄位來自同一次 extract，快取命中時不會請求上游
+        info = await service.get_video_metadata_async(video_id)
         
         if not info.get('title'):
             raise HTTPException(
@@ -29,9 +31,6 @@ async def get_video_metadata(video_id: str):
                 detail=f"無法獲取影片資訊: {video_id}"
             )
         
-        # 從 pytubefix 獲取更多資訊
-        yt = YouTube(url)
-        
         chapters = [
             ChapterInfo(title=ch['title'], start_seconds=ch['start_seconds'])
             for ch in info.get('chapters', [])
@@ -40,13 +39,13 @@ async def get_video_metadata(video_id: str):
         return VideoInfoResponse(
             success=True,
             video_id=video_id,
-            title=info.get('title'),
-            channel_id=yt.channel_id,
-            channel_name=yt.author,
-            duration=yt.length,
-            publish_date=yt.publish_date.isoformat() if yt.publish_date else None,
+            title=info['title'],
+            channel_id=info['channel_id'],
+            channel_name=info['channel_name'],
+            duration=info['duration'],
+            publish_date=info['publish_date'],
             chapters=chapters,
-            thumbnail_url=yt.thumbnail_url
+            thumbnail_url=info['thumbnail_url']
         )
         
     except HTTPException:
@@ -56,3 +55,44 @@ async def get_video_metadata(video_id: str):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"獲取影片資訊時發生錯誤: {str(e)}"
         )
+
+
+@router.get("/{video_id}/bundle", response_model=VideoBundleResponse)
+async def get_video_bundle(
+    video_id: str,
+    parts: Optional[str] = Query(
+        None,
+        description="要組合的部分 (metadata, languages, chapters, transcript，逗號分隔；預設全部)"
+    ),
+    language: Optional[str] = Query(
+        None, description="偏好的字幕語言（預設為 default_language）"
+    )
+):
+    """
+    以一次 extract 組合影片頁面所需的資訊
+    
+    - **video_id**: YouTube 影片 ID
+    - **parts**: 要組合的部分，預設全部
+    - **language**: 偏好的字幕語言，找不到時依備用語言回退
+    
+    無法取得字幕時其他部分照常回傳，原因放在 `transcript_error`；
+    需要 Whisper 轉錄時建立背景工作，工作 ID 放在 `transcript_job_id`。
+    """
+    try:
+        selected = bundle_service.parse_bundle_parts(parts)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    try:
+        bundle = await bundle_service.get_video_bundle(
+            video_id, selected, language or settings.default_language, settings.fallback_languages
+        )
+        return VideoBundleResponse(success=True, **bundle)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"獲取影片組合資訊時發生錯誤: {str(e)}"
+        )
@@ -6,21 +6,45 @@ class VideoItem(BaseModel):
     """影片項目"""
     video_id: str = Field(..., description="影片 ID")
     title: str = Field(..., description="影片標題")
-    publish_date: Optional[str] = Field(None, description="發布日期")
+    publish_date: Optional[str] = Field(
+        None, description="發布日期（相對時間文字；enrich=publish_date 時為 ISO 日期）"
+    )
     duration: Optional[int] = Field(None, description="影片長度（秒）")
     thumbnail_url: Optional[str] = Field(None, description="縮圖網址")
     view_count: Optional[int] = Field(None, description="觀看次數")
+    content_type: Optional[str] = Field(None, description="內容類型 (videos, shorts, streams)")
+    has_captions: Optional[bool] = Field(
+        None, description="是否有字幕（含自動字幕，僅 enrich=captions）"
+    )
+    caption_languages: Optional[List[str]] = Field(
+        None, description="手動字幕語言列表（僅 enrich=captions）"
+    )
+    chapter_count: Optional[int] = Field(None, description="章節數（僅 enrich=chapters）")
+    enriched: Optional[bool] = Field(None, description="是否已補充詳細資訊（指定 enrich 時才有值）")
 
 class ChannelVideosResponse(BaseResponse):
     """頻道影片列表回應"""
     channel_id: str = Field(..., description="頻道 ID")
     videos: List[VideoItem] = Field(..., description="影片列表")
     count: int = Field(..., description="回傳影片數量")
+    next_cursor: Optional[str] = Field(None, description="下一頁的 cursor，沒有更多影片時為 null")
+
+class ChannelSyncResponse(BaseResponse):
+    """頻道增量同步回應"""
+    channel_id: str = Field(..., description="頻道 ID")
+    content_type: str = Field(..., description="內容類型")
+    videos: List[VideoItem] = Field(..., description="上次同步之後新增的影片（由新到舊）")
+    count: int = Field(..., description="新增影片數量")
+    initial: bool = Field(..., description="是否為第一次同步（尚無水位線）")
+    truncated: bool = Field(default=False, description="新增影片過多，只回傳了最新的部分")
+    watermark_video_id: Optional[str] = Field(None, description="同步後的水位線影片 ID")
+    synced_at: float = Field(..., description="同步時間（Unix timestamp）")
 
 class ChannelInfoResponse(BaseResponse):
     """頻道資訊回應"""
     channel_id: str = Field(..., description="頻道 ID")
     name: Optional[str] = Field(None, description="頻道名稱")
+    handle: Optional[str] = Field(None, description="頻道 handle（例如 @example）")
     description: Optional[str] = Field(None, description="頻道描述")
     subscriber_count: Optional[int] = Field(None, description="訂閱數")
     video_count: Optional[int] = Field(None, description="影片數量")
@@ -0,0 +1,41 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from .base import BaseResponse
+
+
+class HarvestRequest(BaseModel):
+    """批量字幕收集工作請求模型"""
+    source_type: Literal["channel", "playlist"] = Field(
+        ..., description="來源類型 (channel, playlist)"
+    )
+    source_id: str = Field(..., description="頻道 ID 或播放清單 ID")
+    language: Optional[str] = Field(None, description="指定語言代碼 (例如: zh-Hant, en)")
+    max_videos: Optional[int] = Field(None, ge=1, description="最多收集幾支影片（預設全部）")
+
+class HarvestJobResponse(BaseResponse):
+    """批量字幕收集工作回應模型"""
+    job_id: str = Field(..., description="工作 ID")
+    source_type: str = Field(..., description="來源類型")
+    source_id: str = Field(..., description="頻道 ID 或播放清單 ID")
+    language: str = Field(..., description="字幕語言")
+    status: str = Field(
+        ..., description="工作狀態 (pending, listing, running, done, cancelled, failed)"
+    )
+    listed: bool = Field(..., description="是否已列出來源的所有影片")
+    total: int = Field(..., description="已加入佇列的影片數")
+    pending: int = Field(..., description="等待處理的影片數")
+    running: int = Field(..., description="處理中的影片數")
+    done: int = Field(..., description="已完成的影片數")
+    failed: int = Field(..., description="失敗的影片數")
+    throughput: Optional[float] = Field(None, description="處理速度（影片/秒，本次執行期間）")
+    eta_seconds: Optional[float] = Field(None, description="預估剩餘秒數")
+    created_at: float = Field(..., description="建立時間（Unix timestamp）")
+    updated_at: float = Field(..., description="最後更新時間（Unix timestamp）")
+    finished_at: Optional[float] = Field(None, description="結束時間（Unix timestamp）")
+
+class HarvestJobListResponse(BaseResponse):
+    """批量字幕收集工作列表回應模型"""
+    jobs: List[HarvestJobResponse] = Field(..., description="工作列表")
+    count: int = Field(..., description="工作數")
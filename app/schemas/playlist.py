@@ -11,12 +11,24 @@ class PlaylistVideoItem(BaseModel):
     channel_name: Optional[str] = Field(None, description="頻道名稱")
     duration: Optional[int] = Field(None, description="影片長度（秒）")
     thumbnail_url: Optional[str] = Field(None, description="縮圖網址")
+    publish_date: Optional[str] = Field(
+        None, description="發布日期 ISO 日期（僅 enrich=publish_date）"
+    )
+    has_captions: Optional[bool] = Field(
+        None, description="是否有字幕（含自動字幕，僅 enrich=captions）"
+    )
+    caption_languages: Optional[List[str]] = Field(
+        None, description="手動字幕語言列表（僅 enrich=captions）"
+    )
+    chapter_count: Optional[int] = Field(None, description="章節數（僅 enrich=chapters）")
+    enriched: Optional[bool] = Field(None, description="是否已補充詳細資訊（指定 enrich 時才有值）")
 
 class PlaylistVideosResponse(BaseResponse):
     """播放清單影片列表回應"""
     playlist_id: str = Field(..., description="播放清單 ID")
     videos: List[PlaylistVideoItem] = Field(..., description="影片列表")
     count: int = Field(..., description="回傳影片數量")
+    next_cursor: Optional[str] = Field(None, description="下一頁的 cursor，沒有更多影片時為 null")
 
 class PlaylistInfoResponse(BaseResponse):
     """播放清單資訊回應"""
@@ -27,3 +39,9 @@ class PlaylistInfoResponse(BaseResponse):
     channel_name: Optional[str] = Field(None, description="建立者頻道名稱")
     video_count: Optional[int] = Field(None, description="影片數量")
     thumbnail_url: Optional[str] = Field(None, description="縮圖網址")
+    videos: Optional[List[PlaylistVideoItem]] = Field(
+        None, description="第一頁影片（僅當 include_videos=true 時）"
+    )
+    next_cursor: Optional[str] = Field(
+        None, description="下一頁的 cursor，可用於 /videos（僅當 include_videos=true 時）"
+    )
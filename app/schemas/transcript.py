@@ -10,6 +10,10 @@ class TranscriptRequest(BaseModel):
         default=False,
         description="是否包含章節標題（如有）。啟用時回傳 Markdown 格式，包含 H1（影片標題）和 H2（章節標題）"
     )
+    async_fallback: bool = Field(
+        default=False,
+        description="需要 Whisper 轉錄時改為回傳 202 與工作 ID，不等待轉錄完成"
+    )
 
 class TranscriptItem(BaseModel):
     """單條字幕模型"""
@@ -44,3 +48,34 @@ class AvailableLanguagesResponse(BaseResponse):
     """可用語言列表回應模型"""
     video_id: str = Field(..., description="YouTube 影片 ID")
     languages: List[LanguageItem] = Field(..., description="可用語言列表")
+
+class TranscribeJobResponse(BaseResponse):
+    """Whisper 轉錄工作回應模型"""
+    job_id: str = Field(..., description="工作 ID")
+    status: str = Field(..., description="工作狀態 (queued, running, done, failed)")
+    video_id: str = Field(..., description="YouTube 影片 ID")
+    language: str = Field(..., description="轉錄語言")
+    created_at: float = Field(..., description="建立時間（Unix timestamp）")
+    updated_at: float = Field(..., description="最後更新時間（Unix timestamp）")
+    transcript: Optional[List[TranscriptItem]] = Field(None, description="字幕列表（完成時）")
+
+class BatchTranscriptItem(BaseModel):
+    """批次字幕請求項目"""
+    youtube_url: str = Field(..., description="YouTube 影片網址")
+    language: Optional[str] = Field(None, description="指定語言代碼 (例如: zh-Hant, en)")
+
+class BatchTranscriptRequest(BaseModel):
+    """批次字幕請求模型"""
+    items: List[BatchTranscriptItem] = Field(..., min_length=1, description="影片列表")
+
+class BatchTranscriptResult(BaseResponse):
+    """批次字幕單筆結果（NDJSON 每行一筆）"""
+    indices: List[int] = Field(..., description="對應的請求項目索引（重複的影片會合併）")
+    youtube_url: str = Field(..., description="YouTube 影片網址")
+    video_id: Optional[str] = Field(None, description="YouTube 影片 ID")
+    language: Optional[str] = Field(None, description="字幕語言")
+    transcript: Optional[List[TranscriptItem]] = Field(None, description="字幕列表")
+    total_items: Optional[int] = Field(None, description="字幕總條數")
+    duration: Optional[float] = Field(None, description="影片總長度")
+    error_type: Optional[str] = Field(None, description="錯誤類型")
+    status_code: int = Field(200, description="此項目的狀態碼")
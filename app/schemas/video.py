@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from .base import BaseResponse
+from .transcript import LanguageItem, TranscriptItem
 
 class ChapterInfo(BaseModel):
     """章節資訊"""
@@ -17,3 +18,25 @@ class VideoInfoResponse(BaseResponse):
     publish_date: Optional[str] = Field(None, description="發布日期")
     chapters: List[ChapterInfo] = Field(default=[], description="章節列表")
     thumbnail_url: Optional[str] = Field(None, description="縮圖網址")
+
+class VideoBundleResponse(BaseResponse):
+    """影片組合資訊回應（只包含 parts 指定的部分）"""
+    video_id: str = Field(..., description="YouTube 影片 ID")
+    parts: List[str] = Field(..., description="回應包含的部分")
+    title: Optional[str] = Field(None, description="影片標題（metadata）")
+    channel_id: Optional[str] = Field(None, description="頻道 ID（metadata）")
+    channel_name: Optional[str] = Field(None, description="頻道名稱（metadata）")
+    duration: Optional[int] = Field(None, description="影片長度（秒，metadata）")
+    publish_date: Optional[str] = Field(None, description="發布日期（metadata）")
+    thumbnail_url: Optional[str] = Field(None, description="縮圖網址（metadata）")
+    chapters: Optional[List[ChapterInfo]] = Field(None, description="章節列表（chapters）")
+    languages: Optional[List[LanguageItem]] = Field(None, description="可用字幕語言（languages）")
+    language: Optional[str] = Field(None, description="字幕語言（transcript）")
+    transcript: Optional[List[TranscriptItem]] = Field(None, description="字幕列表（transcript）")
+    transcript_duration: Optional[float] = Field(None, description="字幕總長度（transcript）")
+    transcript_error: Optional[str] = Field(
+        None, description="無法取得字幕時的原因（transcript）"
+    )
+    transcript_job_id: Optional[str] = Field(
+        None, description="需要 Whisper 轉錄時建立的背景工作 ID（transcript）"
+    )
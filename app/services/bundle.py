@@ -0,0 +1,121 @@
+"""影片頁面組合資訊服務
+
+一個影片頁面通常需要 metadata、可用語言、章節與字幕，分別呼叫
+/video/{id}/info、/transcript/languages/{id} 與 /transcript 會對同一支影片做多次 extract。
+這裡只做一次 yt-dlp extract（結果寫入共用快取），其餘部分都從同一份 info_dict 組合；
+字幕下載也沿用快取中的 info_dict，不會重新 extract。
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from ..exceptions import VideoNotFoundError, YouTubeTranscriptError
+from .cache import get_negative_cache
+from .circuit_breaker import CircuitOpenError
+from .transcribe_jobs import TranscriptionDeferred
+from .transcript import classify_failure, get_transcript_with_fallback, process_transcript_data
+from .video import _info_from_ytdlp
+from .yt_dlp_wrapper import YtDlpWrapper, get_info_dict_async, get_wrapper
+
+logger = logging.getLogger(__name__)
+
+# 可選擇的組合部分
+BUNDLE_PARTS = ["metadata", "languages", "chapters", "transcript"]
+
+
+def parse_bundle_parts(value: Optional[str]) -> List[str]:
+    """
+    解析逗號分隔的組合部分
+
+    Returns:
+        不重複的部分列表（依 BUNDLE_PARTS 排序），未指定時為全部
+
+    Raises:
+        ValueError: 包含不支援的部分
+    """
+    if not value:
+        return list(BUNDLE_PARTS)
+    parts = set()
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if item not in BUNDLE_PARTS:
+            raise ValueError(f"無效的 parts: {item}，有效值為: {BUNDLE_PARTS}")
+        parts.add(item)
+    return [part for part in BUNDLE_PARTS if part in parts]
+
+
+async def get_video_bundle(
+    video_id: str,
+    parts: List[str],
+    language: str,
+    fallback_languages: List[str]
+) -> Dict[str, Any]:
+    """
+    以一次 extract 組合影片頁面所需的資訊
+
+    取得字幕失敗（沒有字幕、字幕已停用、服務忙碌等）時不影響其他部分，改以 transcript_error 回報；
+    需要 Whisper 轉錄時不等待，建立背景工作並回傳 transcript_job_id。
+
+    Args:
+        video_id: YouTube 影片 ID
+        parts: 要組合的部分（見 BUNDLE_PARTS）
+        language: 偏好的字幕語言
+        fallback_languages: 回退語言代碼列表
+
+    Returns:
+        {"video_id", "parts", ...各部分欄位}
+
+    Raises:
+        VideoNotFoundError: 影片不存在或無法存取
+    """
+    if get_negative_cache().get(video_id) is VideoNotFoundError:
+        raise VideoNotFoundError(video_id)
+
+    wrapper = get_wrapper()
+    try:
+        info = await get_info_dict_async(wrapper, video_id)
+    except YouTubeTranscriptError:
+        raise
+    except Exception as e:
+        if classify_failure(e) is VideoNotFoundError:
+            get_negative_cache().set(
+                video_id, VideoNotFoundError, ttl=settings.negative_cache_ttl_video_not_found
+            )
+            raise VideoNotFoundError(video_id)
+        raise
+
+    bundle: Dict[str, Any] = {"video_id": video_id, "parts": parts}
+
+    metadata = _info_from_ytdlp(info)
+    if "metadata" in parts:
+        bundle.update({key: value for key, value in metadata.items() if key != "chapters"})
+
+    if "chapters" in parts:
+        bundle["chapters"] = metadata["chapters"]
+
+    if "languages" in parts:
+        bundle["languages"] = YtDlpWrapper.languages_from_info(info)
+
+    if "transcript" in parts:
+        try:
+            transcript_data, actual_language = await get_transcript_with_fallback(
+                video_id, language, fallback_languages, defer_fallback=True
+            )
+        except TranscriptionDeferred as deferred:
+            bundle["transcript_job_id"] = deferred.job.id
+            bundle["transcript_error"] = "需要 Whisper 轉錄，已建立背景工作"
+        except YouTubeTranscriptError as e:
+            logger.info(f"No transcript in bundle for {video_id}: {e.message}")
+            bundle["transcript_error"] = e.message
+        except CircuitOpenError as e:
+            logger.info(f"No transcript in bundle for {video_id}: {e}")
+            bundle["transcript_error"] = "Whisper 轉錄服務暫時無法使用，請稍後再試"
+        else:
+            transcript, duration = process_transcript_data(transcript_data)
+            bundle["transcript"], bundle["transcript_duration"] = transcript, duration
+            bundle["language"] = actual_language
+
+    return bundle
@@ -0,0 +1,125 @@
+"""快取服務模組
+
+提供行程內的 TTL + LRU 快取，用來在多個服務之間共用 yt-dlp 的 info_dict。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from ..config import settings
+
+
+class TTLCache:
+    """具有 TTL 與 LRU 淘汰機制的執行緒安全快取"""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 600.0):
+        """
+        初始化快取
+
+        Args:
+            max_entries: 最大項目數，超過時淘汰最久未使用的項目
+            ttl: 預設存活時間（秒）
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """取得快取值，過期或不存在時回傳 None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """寫入快取值，可針對單一項目指定 TTL"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """移除快取值"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空快取"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """取得快取統計"""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+# info_dict 共用快取
+_info_cache: Optional[TTLCache] = None
+
+
+def get_info_cache() -> TTLCache:
+    """獲取共用的 info_dict 快取實例"""
+    global _info_cache
+    if _info_cache is None:
+        _info_cache = TTLCache(
+            max_entries=settings.info_cache_max_entries,
+            ttl=settings.info_cache_ttl
+        )
+    return _info_cache
+
+
+# 頻道與播放清單資訊快取
+_metadata_cache: Optional[TTLCache] = None
+
+
+def get_metadata_cache() -> TTLCache:
+    """獲取共用的頻道／播放清單資訊快取實例"""
+    global _metadata_cache
+    if _metadata_cache is None:
+        _metadata_cache = TTLCache(
+            max_entries=settings.metadata_cache_max_entries,
+            ttl=settings.metadata_cache_ttl
+        )
+    return _metadata_cache
+
+
+# 負面結果（影片不存在、字幕停用、沒有字幕）快取
+_negative_cache: Optional[TTLCache] = None
+
+
+def get_negative_cache() -> TTLCache:
+    """獲取共用的負面結果快取實例"""
+    global _negative_cache
+    if _negative_cache is None:
+        _negative_cache = TTLCache(
+            max_entries=settings.negative_cache_max_entries,
+            ttl=settings.negative_cache_ttl_not_found
+        )
+    return _negative_cache
@@ -1,10 +1,18 @@
 """頻道服務模組"""
 
+import asyncio
+import logging
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-import scrapetube
+from typing import Optional, List, Dict, Any, AsyncIterator
 from pytubefix import Channel
 
+from ..exceptions import ChannelNotFoundError
+from .cache import get_metadata_cache
+from .governor import YOUTUBE_HOST, get_governor
+from .innertube import KIND_CHANNEL, ListingPager, fetch_initial_data, parse_count, text_of
+
+logger = logging.getLogger(__name__)
+
 # 輔助函數保持私有
 def _parse_duration(duration_text: str) -> Optional[int]:
     """解析時長文字為秒數"""
@@ -88,16 +96,46 @@ def _parse_view_count(view_text: str) -> Optional[int]:
         pass
     return None
 
-def get_channel_videos_generator(channel_id: str, limit: int = 20, content_type: str = "videos") -> Any:
+async def iter_channel_videos(
+    channel_id: str, limit: Optional[int] = 20, content_type: str = "videos"
+) -> AsyncIterator[dict]:
     """
-    獲取頻道影片生成器
-    
+    逐筆產生頻道影片的原始項目
+
+    以非同步的 innertube 分頁器抓取，產生的項目格式與 scrapetube 相同，
+    可直接交給 extract_video_info。
+
     Args:
         channel_id: 頻道 ID
-        limit: 回傳數量上限
+        limit: 回傳數量上限（None 表示不限）
         content_type: 內容類型 (videos, shorts, streams)
     """
-    return scrapetube.get_channel(channel_id, limit=limit, content_type=content_type)
+    if limit is not None and limit <= 0:
+        return
+    count = 0
+    async for video_data in open_channel_pager(channel_id, content_type, wanted=limit):
+        yield video_data
+        count += 1
+        if limit is not None and count >= limit:
+            break
+
+
+def open_channel_pager(
+    channel_id: str,
+    content_type: str = "videos",
+    cursor: Optional[str] = None,
+    wanted: Optional[int] = None
+) -> ListingPager:
+    """
+    建立可從 cursor 繼續的頻道影片分頁器
+
+    Args:
+        wanted: 預計取用的項目數（None 表示全部），用於決定是否預先抓取下一頁
+
+    Raises:
+        InvalidCursorError: cursor 無效或不屬於此頻道
+    """
+    return ListingPager(KIND_CHANNEL, channel_id, content_type, cursor, wanted)
 
 
 def extract_video_info(video_data: dict) -> dict:
@@ -134,6 +172,144 @@ def extract_video_info(video_data: dict) -> dict:
         "view_count": view_count
     }
 
+def published_before(info: dict, since: datetime) -> bool:
+    """
+    判斷影片是否早於指定時間發佈
+
+    publish_date 是相對時間文字（例如 "3 days ago"），無法解析時視為不早於 since。
+
+    Args:
+        info: extract_video_info 的回傳值
+        since: 時間下限（有時區時忽略時區，與推算出的本地時間比較）
+    """
+    publish_time = _parse_relative_time(info.get('publish_date'))
+    if not publish_time:
+        return False
+    return publish_time < since.replace(tzinfo=None)
+
+
+CONTENT_TYPES = ["videos", "shorts", "streams"]
+
+# 合併多個內容類型時，每個 feed 預先抓取的項目數（約一頁）
+_MERGE_PREFETCH = 30
+
+_FEED_END = object()
+
+
+async def _feed_producer(
+    channel_id: str,
+    content_type: str,
+    queue: asyncio.Queue,
+    since: Optional[datetime]
+) -> None:
+    """將單一 feed 的影片資訊放入佇列，結束時放入 _FEED_END，錯誤時放入例外"""
+    try:
+        videos = iter_channel_videos(channel_id, limit=None, content_type=content_type)
+        async for video_data in videos:
+            info = extract_video_info(video_data)
+            if not info:
+                continue
+            # 各 feed 由新到舊，遇到較舊的影片即可停止
+            if since and published_before(info, since):
+                break
+            info["content_type"] = content_type
+            await queue.put(info)
+        await queue.put(_FEED_END)
+    except Exception as e:
+        await queue.put(e)
+
+
+def _merge_time(info: dict) -> Optional[datetime]:
+    """合併排序用的發佈時間（shorts 等沒有發佈時間的項目回傳 None）"""
+    return _parse_relative_time(info.get('publish_date'))
+
+
+async def iter_merged_channel_videos(
+    channel_id: str,
+    content_types: List[str],
+    since: Optional[datetime] = None
+) -> AsyncIterator[dict]:
+    """
+    同時抓取多個內容類型的 feed，依發佈時間由新到舊合併產出
+
+    shorts 等沒有發佈時間的項目無法比較時間，依 feed 原本的順序與有時間的項目交錯產出
+    （每產出一個有時間的項目就產出一個沒有時間的項目），不會被排到最後。
+    每個項目帶有 content_type 欄位。各 feed 在背景並行抓取，
+    最多預先抓取約一頁，呼叫端停止迭代時會取消其餘抓取。
+
+    Args:
+        channel_id: 頻道 ID
+        content_types: 內容類型列表
+        since: 只產生此時間之後發佈的影片（沒有發佈時間的項目不受限制）
+    """
+    queues = {
+        content_type: asyncio.Queue(maxsize=_MERGE_PREFETCH) for content_type in content_types
+    }
+    tasks = [
+        asyncio.create_task(_feed_producer(channel_id, content_type, queue, since))
+        for content_type, queue in queues.items()
+    ]
+    try:
+        heads: Dict[str, Any] = {}
+        for content_type, queue in queues.items():
+            heads[content_type] = await queue.get()
+
+        undated_turn = False
+        undated_rotation = 0
+        while True:
+            for head in heads.values():
+                if isinstance(head, Exception):
+                    raise head
+            live = [content_type for content_type, head in heads.items() if head is not _FEED_END]
+            if not live:
+                return
+
+            times = {content_type: _merge_time(heads[content_type]) for content_type in live}
+            dated = [content_type for content_type in live if times[content_type] is not None]
+            undated = [content_type for content_type in live if times[content_type] is None]
+            if undated and (undated_turn or not dated):
+                # 多個沒有時間的 feed 輪流產出
+                content_type = undated[undated_rotation % len(undated)]
+                undated_rotation += 1
+                undated_turn = False
+            else:
+                # 同時間的項目依 content_types 的順序產出
+                content_type = max(dated, key=lambda ct: times[ct])
+                undated_turn = True
+            yield heads[content_type]
+            heads[content_type] = await queues[content_type].get()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def stream_channel_videos(
+    channel_id: str,
+    limit: Optional[int] = None,
+    content_types: Optional[List[str]] = None,
+    since: Optional[datetime] = None
+) -> AsyncIterator[dict]:
+    """
+    逐筆產生頻道影片資訊，每取得一頁就立即產出
+
+    Args:
+        channel_id: 頻道 ID
+        limit: 回傳數量上限（None 表示不限）
+        content_types: 內容類型列表 (videos, shorts, streams)，多個時並行抓取並依時間合併
+        since: 只產生此時間之後發佈的影片（遇到第一支較舊的影片即停止）
+    """
+    if limit is not None and limit <= 0:
+        return
+    content_types = content_types or ["videos"]
+    count = 0
+    async for info in iter_merged_channel_videos(channel_id, content_types, since):
+        yield info
+        count += 1
+        if limit is not None and count >= limit:
+            break
+
+
 def get_channel_basic_info(channel_id: str) -> dict:
     """獲取頻道基本資訊"""
     channel_url = f"https://www.youtube.com/channel/{channel_id}"
@@ -159,3 +335,110 @@ def get_channel_basic_info(channel_id: str) -> dict:
         # video_count 在這裡獲取代價太高，暫回傳 None 或需另行處理
         "video_count": None 
     }
+
+
+def _largest_image_url(images: List[dict]) -> Optional[str]:
+    """從縮圖列表取出最大的一張"""
+    if not images:
+        return None
+    url = max(images, key=lambda image: image.get("width") or 0).get("url")
+    if url and url.startswith("//"):
+        url = "https:" + url
+    return url
+
+
+def parse_channel_page(channel_id: str, data: dict) -> dict:
+    """
+    從頻道頁面的 ytInitialData 解析頻道資訊
+
+    名稱、描述、頭像與 handle 取自 channelMetadataRenderer；
+    訂閱數與影片數取自頁首
+    （新版 pageHeaderViewModel 的 metadata 列，或舊版 c4TabbedHeaderRenderer）。
+
+    Raises:
+        ValueError: 頁面中沒有頻道資訊
+    """
+    metadata = data.get("metadata", {}).get("channelMetadataRenderer")
+    if not metadata:
+        raise ValueError(f"channelMetadataRenderer not found for {channel_id}")
+
+    handle = None
+    vanity_url = metadata.get("vanityChannelUrl") or ""
+    if "/@" in vanity_url:
+        handle = "@" + vanity_url.split("/@", 1)[1]
+
+    info = {
+        "channel_id": metadata.get("externalId") or channel_id,
+        "name": metadata.get("title"),
+        "handle": handle,
+        "description": metadata.get("description") or None,
+        "subscriber_count": None,
+        "video_count": None,
+        "thumbnail_url": _largest_image_url(metadata.get("avatar", {}).get("thumbnails", [])),
+    }
+
+    header = data.get("header", {})
+    legacy = header.get("c4TabbedHeaderRenderer")
+    if legacy:
+        info["subscriber_count"] = parse_count(text_of(legacy.get("subscriberCountText")))
+        info["video_count"] = parse_count(text_of(legacy.get("videosCountText")))
+        info["handle"] = info["handle"] or text_of(legacy.get("channelHandleText"))
+        return info
+
+    view_model = (
+        header.get("pageHeaderRenderer", {}).get("content", {}).get("pageHeaderViewModel", {})
+    )
+    rows = (
+        view_model.get("metadata", {}).get("contentMetadataViewModel", {}).get("metadataRows", [])
+    )
+    for row in rows:
+        for part in row.get("metadataParts", []):
+            text = text_of(part.get("text")) or ""
+            lowered = text.lower()
+            if text.startswith("@"):
+                info["handle"] = info["handle"] or text
+            elif "subscriber" in lowered:
+                info["subscriber_count"] = parse_count(text)
+            elif "video" in lowered:
+                info["video_count"] = parse_count(text)
+
+    if not info["thumbnail_url"]:
+        avatar = (
+            view_model.get("image", {}).get("decoratedAvatarViewModel", {})
+            .get("avatar", {}).get("avatarViewModel", {}).get("image", {})
+        )
+        info["thumbnail_url"] = _largest_image_url(avatar.get("sources", []))
+    return info
+
+
+async def get_channel_basic_info_async(channel_id: str) -> dict:
+    """
+    獲取頻道基本資訊（含訂閱數、影片數與頭像）
+
+    只抓取一次頻道頁面並解析 ytInitialData，不需要走訪影片；結果會快取。
+    頁面解析失敗時改用 pytubefix（只有名稱）。
+
+    Raises:
+        ChannelNotFoundError: 頻道不存在
+    """
+    cache = get_metadata_cache()
+    cache_key = ("channel", channel_id)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        data = await fetch_initial_data(f"https://www.youtube.com/channel/{channel_id}")
+        if data is None:
+            raise ChannelNotFoundError(channel_id)
+        info = parse_channel_page(channel_id, data)
+    except ChannelNotFoundError:
+        raise
+    except Exception as e:
+        logger.warning(
+            f"Channel page parsing failed for {channel_id}, falling back to pytubefix: {e}"
+        )
+        info = await get_governor().run(YOUTUBE_HOST, get_channel_basic_info, channel_id)
+
+    cache.set(cache_key, info)
+    return info
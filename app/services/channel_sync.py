@@ -0,0 +1,313 @@
+"""頻道增量同步模組
+
+輪詢大量頻道時，每次都列出最新 N 支影片再逐一比對很浪費。
+這裡為每個頻道保存水位線（最近看過的影片 ID 與時間），
+同步時依頻道由新到舊的順序走訪，遇到第一支已知的影片就停止，只回傳新增的部分。
+一般情況下每次輪詢只需要抓取一頁。
+
+水位線保留最近數支影片 ID 而不只是最新一支，避免最新影片被刪除或設為私人後
+找不到停止點而走訪整個頻道。
+
+新增影片超過 channel_sync_max_items 時，不會直接把水位線移到最新的影片而略過中間的部分：
+舊水位線保留不動，並記錄停下來的 cursor，之後的同步從該處繼續走訪，
+直到遇到舊水位線才改以最新的影片作為停止點。
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from ..exceptions import InvalidCursorError
+from .channel import extract_video_info, open_channel_pager
+from .executor import run_blocking
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_watermarks (
+    channel_id TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    recent_ids TEXT NOT NULL,
+    latest_video_id TEXT,
+    backfill_cursor TEXT,
+    head_ids TEXT,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (channel_id, content_type)
+);
+"""
+
+# 舊版水位線檔案缺少的欄位
+_MIGRATIONS = {
+    "backfill_cursor": "TEXT",
+    "head_ids": "TEXT",
+}
+
+
+class WatermarkStore:
+    """
+    以 SQLite 保存各頻道的同步水位線
+
+    方法都是同步的阻塞呼叫，請透過 run_blocking 在執行器中呼叫。
+    """
+
+    def __init__(self, path: str, recent_ids: int = 20):
+        """
+        初始化水位線儲存
+
+        Args:
+            path: SQLite 檔案路徑
+            recent_ids: 每個頻道保留的最近影片 ID 數
+        """
+        self.path = path
+        self.recent_ids = recent_ids
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(channel_watermarks)")}
+        for column, definition in _MIGRATIONS.items():
+            if column not in existing:
+                with conn:
+                    conn.execute(
+                        f"ALTER TABLE channel_watermarks ADD COLUMN {column} {definition}"
+                    )
+
+    def _connect(self) -> sqlite3.Connection:
+        """取得目前執行緒的連線（sqlite3 連線不可跨執行緒共用）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, channel_id: str, content_type: str) -> Optional[Dict[str, Any]]:
+        """
+        讀取水位線
+
+        Returns:
+            {"recent_ids", "latest_video_id", "backfill_cursor", "head_ids", "synced_at"}，
+            尚未同步過時回傳 None
+        """
+        row = self._connect().execute(
+            "SELECT * FROM channel_watermarks WHERE channel_id = ? AND content_type = ?",
+            (channel_id, content_type)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "recent_ids": json.loads(row["recent_ids"]),
+            "latest_video_id": row["latest_video_id"],
+            "backfill_cursor": row["backfill_cursor"],
+            "head_ids": json.loads(row["head_ids"]) if row["head_ids"] else None,
+            "synced_at": row["synced_at"],
+        }
+
+    def advance(
+        self,
+        channel_id: str,
+        content_type: str,
+        new_videos: List[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]] = None,
+        backfill_cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        以新增的影片推進水位線
+
+        Args:
+            channel_id: 頻道 ID
+            content_type: 內容類型
+            new_videos: 新增的影片（由新到舊）
+            previous: 推進前的水位線
+            backfill_cursor: 走訪在遇到舊水位線之前停止時，下次繼續走訪的 cursor
+
+        Returns:
+            推進後的水位線
+        """
+        if previous and previous["backfill_cursor"]:
+            # 補齊缺口中：最新的影片在開始補齊時就已記錄
+            head_ids = previous["head_ids"] or previous["recent_ids"]
+            latest_video_id = previous["latest_video_id"]
+        else:
+            head_ids = [video["video_id"] for video in new_videos]
+            if previous:
+                head_ids += [
+                    video_id for video_id in previous["recent_ids"] if video_id not in head_ids
+                ]
+            head_ids = head_ids[:self.recent_ids]
+            if new_videos:
+                latest_video_id = new_videos[0]["video_id"]
+            else:
+                latest_video_id = previous["latest_video_id"] if previous else None
+
+        if previous and backfill_cursor:
+            # 還沒走訪到舊水位線，保留它作為停止點
+            recent_ids = previous["recent_ids"]
+        else:
+            recent_ids, head_ids, backfill_cursor = head_ids, None, None
+
+        mark = {
+            "recent_ids": recent_ids,
+            "latest_video_id": latest_video_id,
+            "backfill_cursor": backfill_cursor,
+            "head_ids": head_ids,
+            "synced_at": time.time(),
+        }
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO channel_watermarks "
+                "(channel_id, content_type, recent_ids, latest_video_id, backfill_cursor, "
+                "head_ids, synced_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    channel_id, content_type, json.dumps(recent_ids), latest_video_id,
+                    backfill_cursor, json.dumps(head_ids) if head_ids else None,
+                    mark["synced_at"]
+                )
+            )
+        return mark
+
+    def reset(self, channel_id: str, content_type: str) -> bool:
+        """
+        清除水位線，下次同步會視為第一次同步
+
+        Returns:
+            是否有水位線被清除
+        """
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM channel_watermarks WHERE channel_id = ? AND content_type = ?",
+                (channel_id, content_type)
+            )
+        return cursor.rowcount > 0
+
+
+# 同一頻道的並行同步共用同一次走訪，避免重複回傳或水位線互相覆蓋
+_inflight = SingleFlight()
+
+
+async def sync_channel(
+    channel_id: str,
+    content_type: str = "videos",
+    limit: int = 20
+) -> Dict[str, Any]:
+    """
+    增量同步頻道影片
+
+    Args:
+        channel_id: 頻道 ID
+        content_type: 內容類型 (videos, shorts, streams)
+        limit: 第一次同步（尚無水位線）時回傳的影片數
+
+    Returns:
+        {"videos", "initial", "truncated", "watermark"}
+        - videos: 上次同步之後新增的影片（由新到舊）；補齊缺口時是上次停止處之後較舊的影片
+        - initial: 是否為第一次同步
+        - truncated: 還沒走訪到舊水位線，下次同步會繼續補齊
+
+    Raises:
+        ServiceOverloadedError: 執行器已滿
+    """
+    return await _inflight.do(
+        (channel_id, content_type),
+        lambda: _sync_channel(channel_id, content_type, limit)
+    )
+
+
+async def _sync_channel(channel_id: str, content_type: str, limit: int) -> Dict[str, Any]:
+    """實際執行同步"""
+    store = get_watermark_store()
+    previous = await run_blocking(store.get, channel_id, content_type)
+    max_items = settings.channel_sync_max_items if previous else limit
+    # 之後的同步通常在第一頁就遇到已知影片，不預先抓取下一頁
+    wanted = limit if previous is None else 0
+
+    cursor = previous["backfill_cursor"] if previous else None
+    try:
+        pager = open_channel_pager(channel_id, content_type, cursor=cursor, wanted=wanted)
+    except InvalidCursorError:
+        # 無法從停止處繼續，放棄補齊，改以開始補齊時最新的影片作為停止點
+        logger.warning(f"Channel {channel_id} backfill cursor is no longer valid, skipping the gap")
+        previous = {
+            **previous,
+            "recent_ids": previous["head_ids"] or previous["recent_ids"],
+            "backfill_cursor": None,
+            "head_ids": None,
+        }
+        pager = open_channel_pager(channel_id, content_type, wanted=wanted)
+    known = set(previous["recent_ids"]) if previous else set()
+
+    new_videos: List[Dict[str, Any]] = []
+    resume_cursor = None
+    backfill_cursor = None
+    async for video_data in pager:
+        info = extract_video_info(video_data)
+        if not info:
+            continue
+        if info["video_id"] in known:
+            break
+        if len(new_videos) >= max_items:
+            backfill_cursor = resume_cursor
+            break
+        new_videos.append(info)
+        # 第一次同步本來就只取最新的部分，取滿即停止，不算截斷
+        if previous is None and len(new_videos) >= limit:
+            break
+        if len(new_videos) == max_items:
+            resume_cursor = pager.next_cursor()
+
+    mark = await run_blocking(
+        store.advance, channel_id, content_type, new_videos, previous, backfill_cursor
+    )
+    if backfill_cursor:
+        logger.warning(
+            f"Channel {channel_id} sync stopped after {max_items} new videos "
+            "without reaching the watermark, the next sync continues from there"
+        )
+    return {
+        "videos": new_videos,
+        "initial": previous is None,
+        "truncated": backfill_cursor is not None,
+        "watermark": mark,
+    }
+
+
+async def reset_sync(channel_id: str, content_type: str = "videos") -> bool:
+    """
+    清除頻道的水位線，下次同步會視為第一次同步
+
+    Returns:
+        是否有水位線被清除
+
+    Raises:
+        ServiceOverloadedError: 執行器已滿
+    """
+    return await run_blocking(get_watermark_store().reset, channel_id, content_type)
+
+
+# 模組級別的預設實例
+_store: Optional[WatermarkStore] = None
+
+
+def get_watermark_store() -> WatermarkStore:
+    """獲取預設的 WatermarkStore 實例"""
+    global _store
+    if _store is None:
+        _store = WatermarkStore(
+            os.path.join(settings.data_dir, "channel_sync.sqlite3"),
+            recent_ids=settings.channel_sync_recent_ids
+        )
+    return _store
@@ -0,0 +1,174 @@
+"""斷路器模組
+
+追蹤上游服務的錯誤率與延遲，上游故障時快速失敗，而不是讓每個請求都等到逾時。
+
+- closed: 正常呼叫，於滑動視窗內統計失敗與慢呼叫比例
+- open: 直接拒絕呼叫，經過 open_seconds 後轉為 half_open
+- half_open: 允許少量探測呼叫，成功則恢復 closed，失敗則再次 open
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """斷路器開啟中，呼叫被拒絕"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit '{name}' is open, retry after {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    """以錯誤率與慢呼叫比例判斷的斷路器"""
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 60.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        is_failure: Optional[Callable[[Exception], bool]] = None
+    ):
+        """
+        初始化斷路器
+
+        Args:
+            name: 名稱（用於狀態顯示）
+            window_size: 滑動視窗大小（最近 N 次呼叫）
+            min_calls: 視窗內至少有幾次呼叫才進行判斷
+            failure_rate_threshold: 失敗比例達到此值時開啟
+            slow_call_seconds: 超過此秒數視為慢呼叫
+            slow_call_rate_threshold: 慢呼叫比例達到此值時開啟
+            open_seconds: 開啟後多久進入 half_open
+            half_open_max_calls: half_open 時允許的探測呼叫數
+            is_failure: 判斷例外是否代表上游故障，其他例外直接拋出而不計入統計；
+                None 時所有例外都計為失敗
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.is_failure = is_failure
+
+        # (是否失敗, 是否為慢呼叫)
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._rejected = 0
+        self._last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        """目前狀態（open 超過 open_seconds 後自動轉為 half_open）"""
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = STATE_HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def _open(self) -> None:
+        self._state = STATE_OPEN
+        self._opened_at = time.monotonic()
+
+    def _close(self) -> None:
+        self._state = STATE_CLOSED
+        self._window.clear()
+
+    def _before_call(self) -> None:
+        """呼叫前檢查是否允許"""
+        state = self.state
+        if state == STATE_OPEN:
+            self._rejected += 1
+            retry_after = self.open_seconds - (time.monotonic() - self._opened_at)
+            raise CircuitOpenError(self.name, max(retry_after, 0.0))
+        if state == STATE_HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self._rejected += 1
+                raise CircuitOpenError(self.name, 0.0)
+            self._half_open_calls += 1
+
+    def _record(self, failed: bool, duration: float) -> None:
+        """記錄呼叫結果並更新狀態"""
+        slow = duration >= self.slow_call_seconds
+
+        if self._state == STATE_HALF_OPEN:
+            if failed or slow:
+                self._open()
+            else:
+                self._close()
+            return
+
+        self._window.append((failed, slow))
+        if len(self._window) < self.min_calls:
+            return
+
+        total = len(self._window)
+        failure_rate = sum(1 for f, _ in self._window if f) / total
+        slow_rate = sum(1 for _, s in self._window if s) / total
+        if (
+            failure_rate >= self.failure_rate_threshold
+            or slow_rate >= self.slow_call_rate_threshold
+        ):
+            self._open()
+
+    def _release_probe(self) -> None:
+        """呼叫結果不計入統計時歸還 half_open 的探測名額"""
+        if self._state == STATE_HALF_OPEN:
+            self._half_open_calls -= 1
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        透過斷路器呼叫協程函數
+
+        Raises:
+            CircuitOpenError: 斷路器開啟中
+        """
+        self._before_call()
+        started = time.monotonic()
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # 呼叫被取消不代表上游狀態，歸還探測名額
+            self._release_probe()
+            raise
+        except Exception as e:
+            if self.is_failure is not None and not self.is_failure(e):
+                # 例如請求本身無效（4xx），不代表上游故障
+                self._release_probe()
+                raise
+            self._last_error = str(e) or type(e).__name__
+            self._record(True, time.monotonic() - started)
+            raise
+        self._record(False, time.monotonic() - started)
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        """取得斷路器狀態"""
+        state = self.state
+        total = len(self._window)
+        failures = sum(1 for f, _ in self._window if f)
+        slow = sum(1 for _, s in self._window if s)
+        return {
+            "name": self.name,
+            "state": state,
+            "window_calls": total,
+            "failure_rate": failures / total if total else 0.0,
+            "slow_call_rate": slow / total if total else 0.0,
+            "rejected": self._rejected,
+            "last_error": self._last_error,
+        }
@@ -0,0 +1,148 @@
+"""列表項目補充資訊模組
+
+頻道與播放清單列表只帶有相對發布時間（例如 "3 days ago"），沒有確切日期、字幕與章節資訊。
+這裡依照請求指定的欄位，以有上限的並行度為每支影片取得 yt-dlp info_dict，
+並在整個請求的時間預算內盡量補齊；已在共用快取中的影片不會再佔用執行器。
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from .cache import get_info_cache
+from .yt_dlp_wrapper import format_upload_date, get_info_dict_async, get_wrapper
+
+logger = logging.getLogger(__name__)
+
+# 可補充的欄位
+ENRICH_FIELDS = ["publish_date", "captions", "chapters"]
+
+
+def parse_enrich_fields(value: Optional[str]) -> List[str]:
+    """
+    解析逗號分隔的補充欄位
+
+    Returns:
+        不重複的欄位列表（保留指定的順序），未指定時為空列表
+
+    Raises:
+        ValueError: 包含不支援的欄位
+    """
+    fields: List[str] = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if item not in ENRICH_FIELDS:
+            raise ValueError(f"無效的 enrich 欄位: {item}，有效值為: {ENRICH_FIELDS}")
+        if item not in fields:
+            fields.append(item)
+    return fields
+
+
+def published_before_date(item: Dict[str, Any], since: datetime) -> bool:
+    """
+    以補充後的確切發布日期判斷影片是否早於 since
+
+    只有日期精度，同一天發布的影片視為不早於 since；尚未補充時回傳 False。
+    """
+    if not item.get("enriched"):
+        return False
+    try:
+        publish_date = datetime.fromisoformat(item["publish_date"]).date()
+    except (KeyError, TypeError, ValueError):
+        return False
+    return publish_date < since.date()
+
+
+def apply_enrichment(item: Dict[str, Any], info: Dict[str, Any], fields: List[str]) -> None:
+    """
+    以 info_dict 補充單一列表項目（就地修改）
+
+    Args:
+        item: extract_video_info / extract_playlist_video_info 的回傳值
+        info: 精簡後的 yt-dlp info_dict
+        fields: 要補充的欄位
+    """
+    if "publish_date" in fields:
+        publish_date = format_upload_date(info.get("upload_date"))
+        item["publish_date"] = publish_date or item.get("publish_date")
+    if "captions" in fields:
+        subtitles = info.get("subtitles") or {}
+        item["has_captions"] = bool(subtitles or info.get("automatic_captions"))
+        item["caption_languages"] = sorted(subtitles)
+    if "chapters" in fields:
+        item["chapter_count"] = len(info.get("chapters") or [])
+    item["enriched"] = True
+
+
+async def enrich_videos(
+    items: List[Dict[str, Any]],
+    fields: List[str],
+    budget: Optional[float] = None,
+    max_concurrency: Optional[int] = None
+) -> int:
+    """
+    並行補充列表項目的詳細資訊（就地修改）
+
+    時間預算用完時尚未完成的項目標記為 enriched=False 並照常回傳；
+    已在執行緒中開始的 extract 仍會完成並寫入快取，之後的請求可直接使用。
+
+    Args:
+        items: 列表項目
+        fields: 要補充的欄位（見 ENRICH_FIELDS）
+        budget: 整個請求的時間預算（秒），預設為 enrich_time_budget
+        max_concurrency: 同時進行的抓取數上限，預設為 enrich_max_concurrency
+
+    Returns:
+        成功補充的項目數
+    """
+    if not items or not fields:
+        return 0
+    if budget is None:
+        budget = settings.enrich_time_budget
+    if max_concurrency is None:
+        max_concurrency = settings.enrich_max_concurrency
+
+    cache = get_info_cache()
+    wrapper = get_wrapper()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    enriched = 0
+
+    async def fetch(item: Dict[str, Any]) -> None:
+        async with semaphore:
+            info = await get_info_dict_async(wrapper, item["video_id"])
+        apply_enrichment(item, info, fields)
+
+    tasks = {}
+    for item in items:
+        item["enriched"] = False
+        info = cache.get(item["video_id"])
+        if info is not None:
+            apply_enrichment(item, info, fields)
+            enriched += 1
+        else:
+            tasks[asyncio.ensure_future(fetch(item))] = item
+
+    if not tasks:
+        return enriched
+
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=budget)
+    finally:
+        # 逾時或用戶端中斷連線時取消尚未完成的抓取
+        for task in tasks:
+            task.cancel()
+    for task in done:
+        error = task.exception()
+        if error is None:
+            enriched += 1
+        else:
+            logger.warning(f"Failed to enrich video {tasks[task]['video_id']}: {error}")
+    if pending:
+        logger.info(
+            f"Enrichment budget of {budget}s exhausted, {len(pending)} videos left unenriched"
+        )
+    return enriched
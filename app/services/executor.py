@@ -0,0 +1,112 @@
+"""阻塞工作執行器模組
+
+yt-dlp 與 pytubefix 皆為同步程式庫，這裡提供有上限的執行緒池，
+讓 async 路由能在不阻塞 event loop 的情況下呼叫它們。
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from ..config import settings
+from ..exceptions import ServiceOverloadedError
+
+
+class BlockingExecutor:
+    """有並行上限與佇列上限的阻塞工作執行器"""
+
+    def __init__(self, max_in_flight: int = 8, max_queue: int = 64):
+        """
+        初始化執行器
+
+        Args:
+            max_in_flight: 同時執行的阻塞工作數上限（執行緒數）
+            max_queue: 等待中的工作數上限，超過時直接拒絕
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_in_flight,
+            thread_name_prefix="yt-blocking"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._rejected = 0
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在執行緒池中執行阻塞函數
+
+        Raises:
+            ServiceOverloadedError: 等待佇列已滿時
+        """
+        with self._lock:
+            if self._pending >= self.max_in_flight + self.max_queue:
+                self._rejected += 1
+                raise ServiceOverloadedError()
+            self._pending += 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._pool, functools.partial(self._call, func, *args, **kwargs)
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """在工作執行緒中呼叫函數並統計執行中數量"""
+        with self._lock:
+            self._running += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """取得執行器狀態"""
+        with self._lock:
+            return {
+                "in_flight": self._running,
+                "queued": self._pending - self._running,
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        """關閉執行緒池"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# 模組級別的預設實例
+_executor: Optional[BlockingExecutor] = None
+
+
+def get_executor() -> BlockingExecutor:
+    """獲取預設的 BlockingExecutor 實例"""
+    global _executor
+    if _executor is None:
+        _executor = BlockingExecutor(
+            max_in_flight=settings.blocking_max_in_flight,
+            max_queue=settings.blocking_max_queue
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """關閉預設執行器"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """在預設執行器中執行阻塞函數"""
+    return await get_executor().run(func, *args, **kwargs)
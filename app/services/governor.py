@@ -0,0 +1,386 @@
+"""上游速率調節模組
+
+YouTube 開始回應 429 或「Sign in to confirm you're not a bot」時若繼續全速請求，
+IP 可能被標記數小時。所有 yt-dlp、pytubefix 與 innertube 請求都經過這裡：
+
+- 每個上游主機一個 token bucket，目前速率以 AIMD 調整：
+  成功時加法增加，遇到節流訊號時乘法減少
+- 遇到節流訊號時以 full jitter 的指數退避重試，重試次數受重試預算限制
+  （每個請求存入 retry_budget_ratio 個額度，每次重試花費一個），避免重試風暴
+- 等待 token 與退避都在 event loop 中進行，取得 token 後才把阻塞函數交給執行器，
+  不會讓執行緒在等待中被佔住；需要等待超過 max_wait 時回應服務忙碌，預支的額度因此有上限
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from ..config import settings
+from ..exceptions import ServiceOverloadedError
+from .executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+YOUTUBE_HOST = "www.youtube.com"
+
+# 表示被 YouTube 節流的錯誤訊息（小寫比對）
+_THROTTLE_MARKERS = (
+    "too many requests",
+    "confirm you're not a bot",
+    "confirm you’re not a bot",
+    "confirm that you're not a bot",
+    "unusual traffic",
+)
+
+
+class UpstreamThrottledError(Exception):
+    """上游回應節流訊號（例如 HTTP 429）"""
+
+
+def host_of(url: str) -> str:
+    """取得網址的主機名稱"""
+    return urlparse(url).hostname or url
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """
+    判斷錯誤是否為上游節流訊號
+
+    包含 HTTP 429、yt-dlp / pytubefix 的機器人驗證訊息與 pytubefix 的 BotDetection。
+    """
+    if isinstance(error, UpstreamThrottledError):
+        return True
+    if type(error).__name__ == "BotDetection":
+        return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in _THROTTLE_MARKERS)
+
+
+class HostGovernor:
+    """單一上游主機的 AIMD token bucket"""
+
+    def __init__(
+        self,
+        host: str,
+        rate: float = 5.0,
+        min_rate: float = 0.2,
+        max_rate: float = 20.0,
+        increase: float = 0.1,
+        decrease_factor: float = 0.5,
+        burst: float = 5.0
+    ):
+        """
+        初始化主機速率調節
+
+        Args:
+            host: 主機名稱
+            rate: 初始速率（每秒請求數）
+            min_rate: 速率下限
+            max_rate: 速率上限
+            increase: 每次成功增加的速率
+            decrease_factor: 遇到節流訊號時速率乘上的係數
+            burst: token bucket 容量（允許的瞬間請求數）
+        """
+        self.host = host
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.burst = burst
+
+        self._lock = threading.Lock()
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._requests = 0
+        self._throttled = 0
+        self._rejected = 0
+
+    def _reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        預約一個 token
+
+        Args:
+            max_wait: 最多等待的秒數，None 表示不限
+
+        Returns:
+            取得 token 前需要等待的秒數（token 不足時先預支，之後的請求會排在後面）；
+            需要等待超過 max_wait 時不預約並回傳 None
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            tokens = self._tokens - 1
+            delay = 0.0 if tokens >= 0 else -tokens / self.rate
+            if max_wait is not None and delay > max_wait:
+                self._rejected += 1
+                return None
+            self._tokens = tokens
+            self._requests += 1
+            return delay
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        """
+        在 event loop 中等待 token
+
+        Raises:
+            ServiceOverloadedError: 需要等待超過 max_wait
+        """
+        delay = self._reserve(max_wait)
+        if delay is None:
+            logger.warning(
+                f"Upstream {self.host} rate limited beyond {max_wait}s, rejecting request"
+            )
+            raise ServiceOverloadedError()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_success(self) -> None:
+        """成功時加法增加速率"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttled(self) -> None:
+        """
+        遇到節流訊號時乘法減少速率
+
+        同一波並行請求通常會一起被節流，一個速率週期內只減少一次。
+        """
+        with self._lock:
+            self._throttled += 1
+            now = time.monotonic()
+            if now - self._last_decrease < max(1.0, 1.0 / self.rate):
+                return
+            self._last_decrease = now
+            previous = self.rate
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = min(self._tokens, 0.0)
+        logger.warning(
+            f"Upstream {self.host} throttled, rate {previous:.2f}/s -> {self.rate:.2f}/s"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """取得主機速率狀態"""
+        with self._lock:
+            return {
+                "rate_per_second": round(self.rate, 3),
+                "tokens": round(self._tokens, 3),
+                "requests": self._requests,
+                "throttled": self._throttled,
+                "rejected": self._rejected,
+            }
+
+
+class RetryBudget:
+    """重試預算：每個請求存入 ratio 個額度，每次重試花費一個"""
+
+    def __init__(self, ratio: float = 0.1, max_balance: float = 10.0):
+        """
+        初始化重試預算
+
+        Args:
+            ratio: 每個請求存入的額度
+            max_balance: 額度上限（也是初始額度）
+        """
+        self.ratio = ratio
+        self.max_balance = max_balance
+        self._balance = max_balance
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        """每個請求存入額度"""
+        with self._lock:
+            self._balance = min(self.max_balance, self._balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        """嘗試花費一次重試額度"""
+        with self._lock:
+            if self._balance >= 1.0:
+                self._balance -= 1.0
+                self.retries += 1
+                return True
+            self.exhausted += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """取得重試預算狀態"""
+        with self._lock:
+            return {
+                "balance": round(self._balance, 3),
+                "retries": self.retries,
+                "exhausted": self.exhausted,
+            }
+
+
+class UpstreamGovernor:
+    """所有上游請求共用的速率調節器"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 30.0,
+        retry_budget_ratio: float = 0.1,
+        max_wait: Optional[float] = 30.0,
+        host_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        初始化速率調節器
+
+        Args:
+            enabled: 停用時直接呼叫，不限速也不重試
+            max_retries: 單一請求遇到節流訊號時最多重試次數
+            retry_base_delay: 退避基準秒數（第 n 次重試最多等待 base * 2^n 秒）
+            retry_max_delay: 單次退避上限秒數
+            retry_budget_ratio: 每個請求存入的重試額度
+            max_wait: 等待 token 的上限秒數，超過時拋出 ServiceOverloadedError，None 表示不限
+            host_options: 建立 HostGovernor 的參數
+        """
+        self.enabled = enabled
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.budget = RetryBudget(retry_budget_ratio)
+        self.max_wait = max_wait
+        self._host_options = host_options or {}
+        self._hosts: Dict[str, HostGovernor] = {}
+        self._lock = threading.Lock()
+
+    def host(self, host: str) -> HostGovernor:
+        """取得主機的速率調節（不存在時建立）"""
+        with self._lock:
+            governor = self._hosts.get(host)
+            if governor is None:
+                governor = HostGovernor(host, **self._host_options)
+                self._hosts[host] = governor
+            return governor
+
+    def _backoff(self, attempt: int) -> float:
+        """full jitter 指數退避"""
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+
+    def _should_retry(self, host: HostGovernor, error: Exception, attempt: int) -> bool:
+        """記錄節流訊號並判斷是否重試"""
+        if not is_throttling_error(error):
+            return False
+        host.on_throttled()
+        return attempt < self.max_retries and self.budget.withdraw()
+
+    async def call(self, host: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        在 event loop 中經過速率調節呼叫協程（innertube）
+
+        Args:
+            host: 上游主機
+            func: 每次嘗試都會重新呼叫以建立新的協程
+
+        Raises:
+            ServiceOverloadedError: 等待 token 需要超過 max_wait
+            協程本身的例外（節流訊號重試用盡時拋出最後一次的例外）
+        """
+        if not self.enabled:
+            return await func()
+        governor = self.host(host)
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            await governor.acquire(self.max_wait)
+            try:
+                result = await func()
+            except Exception as e:
+                if not self._should_retry(governor, e, attempt):
+                    raise
+                delay = self._backoff(attempt)
+                attempt += 1
+                logger.info(
+                    f"Retrying throttled request to {host} in {delay:.1f}s (attempt {attempt})"
+                )
+                await asyncio.sleep(delay)
+                continue
+            governor.on_success()
+            return result
+
+    async def run(self, host: str, func: Callable[..., Any], *args) -> Any:
+        """
+        經過速率調節在執行器中呼叫阻塞函數（yt-dlp、pytubefix）
+
+        token 在 event loop 中取得，退避也在 event loop 中等待，執行緒只用於實際的請求。
+
+        Raises:
+            ServiceOverloadedError: 等待 token 需要超過 max_wait，或執行器已滿
+            函數本身的例外（節流訊號重試用盡時拋出最後一次的例外）
+        """
+        return await self.call(host, lambda: run_blocking(func, *args))
+
+    async def admit(self, host: str) -> None:
+        """
+        只取得 token、不重試（呼叫端自行處理失敗，例如避險改用另一個後端）
+
+        之後以 report 回報結果。
+
+        Raises:
+            ServiceOverloadedError: 等待 token 需要超過 max_wait
+        """
+        if not self.enabled:
+            return
+        self.budget.deposit()
+        await self.host(host).acquire(self.max_wait)
+
+    def report(self, host: str, error: Optional[BaseException] = None) -> None:
+        """回報以 admit 放行的請求結果，用於調整速率"""
+        if not self.enabled:
+            return
+        governor = self.host(host)
+        if error is None:
+            governor.on_success()
+        elif is_throttling_error(error):
+            governor.on_throttled()
+
+    def stats(self) -> Dict[str, Any]:
+        """取得各主機速率與重試預算狀態"""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            "enabled": self.enabled,
+            "hosts": {host: governor.stats() for host, governor in hosts.items()},
+            "retry_budget": self.budget.stats(),
+        }
+
+
+# 模組級別的預設實例
+_governor: Optional[UpstreamGovernor] = None
+
+
+def get_governor() -> UpstreamGovernor:
+    """獲取預設的 UpstreamGovernor 實例"""
+    global _governor
+    if _governor is None:
+        _governor = UpstreamGovernor(
+            enabled=settings.upstream_governor_enabled,
+            max_retries=settings.upstream_max_retries,
+            retry_base_delay=settings.upstream_retry_base_delay,
+            retry_max_delay=settings.upstream_retry_max_delay,
+            retry_budget_ratio=settings.upstream_retry_budget_ratio,
+            max_wait=settings.upstream_max_wait,
+            host_options={
+                "rate": settings.upstream_rate_per_second,
+                "min_rate": settings.upstream_min_rate,
+                "max_rate": settings.upstream_max_rate,
+                "increase": settings.upstream_rate_increase,
+                "decrease_factor": settings.upstream_rate_decrease,
+                "burst": settings.upstream_burst,
+            }
+        )
+    return _governor
@@ -0,0 +1,619 @@
+"""批量字幕收集工作模組
+
+收集整個頻道或播放清單的字幕。工作與每支影片的任務都記錄在本機 SQLite 佇列中，
+服務重新啟動後會從中斷處繼續，而不是從頭開始。
+
+流程：
+1. 列出來源（頻道或播放清單）的所有影片，寫入任務佇列；每寫入一批就記錄列表的 cursor，
+   中斷後從記錄的 cursor 繼續列出
+2. 以有速率上限的 worker 逐一抓取字幕（字幕服務會以實際語言寫入字幕持久化儲存，
+   包含 Whisper 轉錄的結果；儲存未啟用時只記錄實際語言）
+3. 每完成一個任務就更新進度；暫時性失敗以指數退避延後重試
+
+佇列的讀寫都在執行器中進行，不會阻塞 event loop。
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..exceptions import InvalidCursorError, ServiceOverloadedError, YouTubeTranscriptError
+from .executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+SOURCE_CHANNEL = "channel"
+SOURCE_PLAYLIST = "playlist"
+
+HARVEST_PENDING = "pending"
+HARVEST_LISTING = "listing"
+HARVEST_RUNNING = "running"
+HARVEST_DONE = "done"
+HARVEST_CANCELLED = "cancelled"
+HARVEST_FAILED = "failed"
+
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+
+# 列出來源時每批寫入佇列（並記錄 cursor）的影片數
+_LIST_BATCH = 100
+
+# 背景工作存取佇列時執行器已滿，等待多久後重試（秒）
+_DB_RETRY_DELAY = 1.0
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS harvest_jobs (
+    id TEXT PRIMARY KEY,
+    source_type TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    max_videos INTEGER,
+    status TEXT NOT NULL,
+    listed INTEGER NOT NULL DEFAULT 0,
+    list_cursor TEXT,
+    list_position INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS harvest_tasks (
+    job_id TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    language TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, video_id)
+);
+CREATE INDEX IF NOT EXISTS idx_harvest_tasks_status ON harvest_tasks (job_id, status, position);
+"""
+
+# 舊版佇列檔案缺少的欄位
+_MIGRATIONS = {
+    "harvest_jobs": {
+        "list_cursor": "TEXT",
+        "list_position": "INTEGER NOT NULL DEFAULT 0",
+    },
+    "harvest_tasks": {
+        "next_attempt_at": "REAL NOT NULL DEFAULT 0",
+    },
+}
+
+
+class HarvestManager:
+    """批量字幕收集工作管理器"""
+
+    def __init__(
+        self,
+        path: str,
+        concurrency: int = 2,
+        rate_per_second: float = 0.5,
+        max_attempts: int = 3,
+        retry_base_delay: float = 60.0,
+        retry_max_delay: float = 3600.0
+    ):
+        """
+        初始化管理器
+
+        Args:
+            path: SQLite 佇列檔案路徑
+            concurrency: 每個工作同時處理的影片數
+            rate_per_second: 每個工作每秒最多開始幾支影片
+            max_attempts: 單支影片最多嘗試次數
+            retry_base_delay: 第一次重試前等待的秒數，之後每次加倍
+            retry_max_delay: 重試前等待的秒數上限
+        """
+        self.path = path
+        self.concurrency = concurrency
+        self.rate_per_second = rate_per_second
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        self._migrate(conn)
+
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # 本次執行期間的進度，用於計算處理速度
+        self._run_started: Dict[str, float] = {}
+        self._run_processed: Dict[str, int] = {}
+
+    # ---- 佇列存取（在執行器的工作執行緒中執行） ----
+
+    def _connect(self) -> sqlite3.Connection:
+        """取得目前執行緒的連線（sqlite3 連線不可跨執行緒共用）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        """為舊版佇列檔案補上新增的欄位"""
+        for table, columns in _MIGRATIONS.items():
+            existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for column, definition in columns.items():
+                if column not in existing:
+                    with conn:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def _insert_job(
+        self,
+        job_id: str,
+        source_type: str,
+        source_id: str,
+        language: str,
+        max_videos: Optional[int]
+    ) -> None:
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO harvest_jobs (id, source_type, source_id, language, "
+                "max_videos, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, source_type, source_id, language, max_videos, HARVEST_PENDING, now, now)
+            )
+
+    def _update_job(self, job_id: str, **fields: Any) -> None:
+        """更新工作（已取消的工作不會被背景工作改回其他狀態）"""
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                f"UPDATE harvest_jobs SET {assignments} WHERE id = ? AND status != ?",
+                (*fields.values(), job_id, HARVEST_CANCELLED)
+            )
+
+    def _get_job_row(self, job_id: str) -> Optional[sqlite3.Row]:
+        return self._connect().execute(
+            "SELECT * FROM harvest_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+
+    def _enqueue(
+        self,
+        job_id: str,
+        video_ids: List[str],
+        start_position: int,
+        cursor: Optional[str]
+    ) -> None:
+        """寫入一批任務，並在同一個交易中記錄列表的繼續位置"""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO harvest_tasks "
+                "(job_id, video_id, position, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (job_id, video_id, start_position + offset, TASK_PENDING, now)
+                    for offset, video_id in enumerate(video_ids)
+                ]
+            )
+            conn.execute(
+                "UPDATE harvest_jobs SET list_cursor = ?, list_position = ?, updated_at = ? "
+                "WHERE id = ?",
+                (cursor, start_position + len(video_ids), now, job_id)
+            )
+
+    def _claim_next_task(self, job_id: str) -> Tuple[Optional[str], Optional[float]]:
+        """
+        取出下一個可以開始的任務
+
+        Returns:
+            (影片 ID, None)；沒有可以開始的任務時為 (None, 距離最早一個等待重試的任務的秒數)，
+            佇列已清空時為 (None, None)
+        """
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            row = conn.execute(
+                "SELECT video_id FROM harvest_tasks "
+                "WHERE job_id = ? AND status = ? AND next_attempt_at <= ? "
+                "ORDER BY position LIMIT 1",
+                (job_id, TASK_PENDING, now)
+            ).fetchone()
+            if row is None:
+                next_attempt = conn.execute(
+                    "SELECT MIN(next_attempt_at) FROM harvest_tasks "
+                    "WHERE job_id = ? AND status = ?",
+                    (job_id, TASK_PENDING)
+                ).fetchone()[0]
+                if next_attempt is None:
+                    return None, None
+                return None, max(0.0, next_attempt - now)
+            conn.execute(
+                "UPDATE harvest_tasks SET status = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE job_id = ? AND video_id = ?",
+                (TASK_RUNNING, now, job_id, row["video_id"])
+            )
+        return row["video_id"], None
+
+    def _retry_delay(self, attempts: int) -> float:
+        """第 attempts 次嘗試失敗後，重試前等待的秒數（指數退避）"""
+        return min(self.retry_max_delay, self.retry_base_delay * 2 ** max(0, attempts - 1))
+
+    def _finish_task(
+        self,
+        job_id: str,
+        video_id: str,
+        language: Optional[str] = None,
+        error: Optional[str] = None,
+        retry: bool = False
+    ) -> None:
+        now = time.time()
+        next_attempt_at = 0.0
+        conn = self._connect()
+        if error is None:
+            status = TASK_DONE
+        else:
+            attempts = conn.execute(
+                "SELECT attempts FROM harvest_tasks WHERE job_id = ? AND video_id = ?",
+                (job_id, video_id)
+            ).fetchone()[0]
+            status = TASK_PENDING if retry and attempts < self.max_attempts else TASK_FAILED
+            if status == TASK_PENDING:
+                next_attempt_at = now + self._retry_delay(attempts)
+        with conn:
+            conn.execute(
+                "UPDATE harvest_tasks SET status = ?, language = ?, error = ?, "
+                "next_attempt_at = ?, updated_at = ? "
+                "WHERE job_id = ? AND video_id = ?",
+                (status, language, error, next_attempt_at, now, job_id, video_id)
+            )
+
+    def _requeue_interrupted(self) -> List[str]:
+        """將上次中斷時執行中的任務重新排入佇列，回傳未完成的工作 ID"""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "UPDATE harvest_tasks SET status = ? WHERE status = ?",
+                (TASK_PENDING, TASK_RUNNING)
+            )
+        rows = conn.execute(
+            "SELECT id FROM harvest_jobs WHERE status IN (?, ?, ?)",
+            (HARVEST_PENDING, HARVEST_LISTING, HARVEST_RUNNING)
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def _mark_cancelled(self, job_id: str) -> None:
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            # 被中斷的任務重新排入佇列，不會一直顯示為處理中
+            conn.execute(
+                "UPDATE harvest_tasks SET status = ?, updated_at = ? "
+                "WHERE job_id = ? AND status = ?",
+                (TASK_PENDING, now, job_id, TASK_RUNNING)
+            )
+            conn.execute(
+                "UPDATE harvest_jobs SET status = ?, finished_at = ?, updated_at = ? "
+                "WHERE id = ?",
+                (HARVEST_CANCELLED, now, now, job_id)
+            )
+
+    def _read_jobs(self, job_ids: List[str]) -> List[Tuple[sqlite3.Row, Dict[str, int]]]:
+        """讀取工作與各狀態的任務數"""
+        conn = self._connect()
+        result = []
+        for job_id in job_ids:
+            job = conn.execute("SELECT * FROM harvest_jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                continue
+            counts = {TASK_PENDING: 0, TASK_RUNNING: 0, TASK_DONE: 0, TASK_FAILED: 0}
+            for row in conn.execute(
+                "SELECT status, COUNT(*) AS n FROM harvest_tasks "
+                "WHERE job_id = ? GROUP BY status",
+                (job_id,)
+            ):
+                counts[row["status"]] = row["n"]
+            result.append((job, counts))
+        return result
+
+    def _recent_job_ids(self, limit: int) -> List[str]:
+        rows = self._connect().execute(
+            "SELECT id FROM harvest_jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    async def _db(self, func, *args, **kwargs) -> Any:
+        """背景工作存取佇列：執行器已滿時稍後重試，不讓整個工作失敗"""
+        while True:
+            try:
+                return await run_blocking(func, *args, **kwargs)
+            except ServiceOverloadedError:
+                await asyncio.sleep(_DB_RETRY_DELAY)
+
+    # ---- 工作執行 ----
+
+    async def create_job(
+        self,
+        source_type: str,
+        source_id: str,
+        language: str,
+        max_videos: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        建立並啟動收集工作
+
+        Raises:
+            ServiceOverloadedError: 執行器已滿
+        """
+        job_id = uuid.uuid4().hex
+        await run_blocking(
+            self._insert_job, job_id, source_type, source_id, language, max_videos
+        )
+        self._start(job_id)
+        return await self.get_job(job_id)
+
+    async def resume(self) -> int:
+        """
+        重新啟動未完成的工作（服務啟動時呼叫）
+
+        Returns:
+            重新啟動的工作數
+        """
+        job_ids = await self._db(self._requeue_interrupted)
+        for job_id in job_ids:
+            self._start(job_id)
+        return len(job_ids)
+
+    async def cancel_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        取消工作（已結束的工作維持原狀態）
+
+        Raises:
+            ServiceOverloadedError: 執行器已滿
+        """
+        job = await run_blocking(self._get_job_row, job_id)
+        if job is None:
+            return None
+        if job["status"] not in (HARVEST_PENDING, HARVEST_LISTING, HARVEST_RUNNING):
+            return await self.get_job(job_id)
+
+        task = self._tasks.pop(job_id, None)
+        if task is not None:
+            task.cancel()
+        await run_blocking(self._mark_cancelled, job_id)
+        return await self.get_job(job_id)
+
+    def _start(self, job_id: str) -> None:
+        if job_id in self._tasks and not self._tasks[job_id].done():
+            return
+        self._run_started[job_id] = time.time()
+        self._run_processed[job_id] = 0
+        self._tasks[job_id] = asyncio.get_running_loop().create_task(self._run(job_id))
+
+    async def _run(self, job_id: str) -> None:
+        """執行工作：列出來源後處理任務佇列"""
+        try:
+            job = await self._db(self._get_job_row, job_id)
+            if not job["listed"]:
+                await self._db(self._update_job, job_id, status=HARVEST_LISTING)
+                await self._list_source(job)
+                await self._db(self._update_job, job_id, listed=1)
+
+            await self._db(self._update_job, job_id, status=HARVEST_RUNNING)
+            await self._process_tasks(job)
+            await self._db(
+                self._update_job, job_id, status=HARVEST_DONE, finished_at=time.time()
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Harvest job {job_id} failed: {e}")
+            await self._db(
+                self._update_job, job_id,
+                status=HARVEST_FAILED, error=str(e), finished_at=time.time()
+            )
+        finally:
+            if self._tasks.get(job_id) is asyncio.current_task():
+                del self._tasks[job_id]
+
+    @staticmethod
+    def _open_pager(job: sqlite3.Row, cursor: Optional[str], wanted: Optional[int]):
+        """建立來源的列表分頁器"""
+        from . import channel, playlist
+
+        if job["source_type"] == SOURCE_CHANNEL:
+            return channel.open_channel_pager(job["source_id"], cursor=cursor, wanted=wanted)
+        return playlist.open_playlist_pager(job["source_id"], cursor=cursor, wanted=wanted)
+
+    async def _list_source(self, job: sqlite3.Row) -> None:
+        """
+        列出來源的影片並寫入任務佇列
+
+        從上次記錄的 cursor 繼續；已寫入的影片會略過，重跑同一段也不會重複。
+        """
+        job_id = job["id"]
+        position = job["list_position"]
+        limit = job["max_videos"]
+        if position and job["list_cursor"] is None:
+            # 上次已列到最後一頁，只差標記完成
+            return
+        wanted = None if limit is None else limit - position
+        if wanted is not None and wanted <= 0:
+            return
+
+        try:
+            pager = self._open_pager(job, job["list_cursor"], wanted)
+        except InvalidCursorError:
+            logger.warning(f"Harvest job {job_id} has an invalid listing cursor, listing again")
+            position, wanted = 0, limit
+            pager = self._open_pager(job, None, wanted)
+
+        batch: List[str] = []
+        count = 0
+        async for video_data in pager:
+            count += 1
+            video_id = video_data.get("videoId")
+            if video_id:
+                batch.append(video_id)
+            if len(batch) >= _LIST_BATCH:
+                await self._db(self._enqueue, job_id, batch, position, pager.next_cursor())
+                position += len(batch)
+                batch = []
+            if wanted is not None and count >= wanted:
+                break
+        if batch:
+            await self._db(self._enqueue, job_id, batch, position, pager.next_cursor())
+
+    async def _process_tasks(self, job: sqlite3.Row) -> None:
+        """以 worker 處理任務佇列，並限制開始新任務的速率"""
+        from .transcript import get_transcript_with_fallback
+
+        job_id = job["id"]
+        interval = 1.0 / self.rate_per_second if self.rate_per_second > 0 else 0.0
+        next_start = 0.0
+        rate_lock = asyncio.Lock()
+
+        async def worker():
+            nonlocal next_start
+            while True:
+                async with rate_lock:
+                    wait = next_start - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    video_id, retry_in = await self._db(self._claim_next_task, job_id)
+                    if video_id is not None:
+                        next_start = time.monotonic() + interval
+                if video_id is None:
+                    if retry_in is None:
+                        return
+                    # 只剩等待重試的任務
+                    await asyncio.sleep(retry_in)
+                    continue
+
+                try:
+                    # 字幕服務取得字幕時已寫入持久化儲存
+                    _, language = await get_transcript_with_fallback(
+                        video_id, job["language"], settings.fallback_languages
+                    )
+                    await self._db(self._finish_task, job_id, video_id, language=language)
+                except Exception as e:
+                    # 已判定的失敗（影片不存在、沒有字幕）不重試
+                    retry = (
+                        not isinstance(e, YouTubeTranscriptError)
+                        or getattr(e, "status_code", 500) >= 500
+                    )
+                    await self._db(
+                        self._finish_task, job_id, video_id,
+                        error=str(e) or type(e).__name__, retry=retry
+                    )
+                self._run_processed[job_id] = self._run_processed.get(job_id, 0) + 1
+
+        await asyncio.gather(*[worker() for _ in range(self.concurrency)])
+
+    # ---- 進度查詢 ----
+
+    def _progress(self, job: sqlite3.Row, counts: Dict[str, int]) -> Dict[str, Any]:
+        """組合工作進度（含處理速度與預估剩餘時間）"""
+        job_id = job["id"]
+        total = sum(counts.values())
+        remaining = counts[TASK_PENDING] + counts[TASK_RUNNING]
+
+        throughput = None
+        eta_seconds = None
+        processed = self._run_processed.get(job_id, 0)
+        elapsed = time.time() - self._run_started.get(job_id, time.time())
+        if processed and elapsed > 0:
+            throughput = processed / elapsed
+            if job["listed"]:
+                eta_seconds = remaining / throughput
+
+        return {
+            "job_id": job["id"],
+            "source_type": job["source_type"],
+            "source_id": job["source_id"],
+            "language": job["language"],
+            "status": job["status"],
+            "listed": bool(job["listed"]),
+            "total": total,
+            "pending": counts[TASK_PENDING],
+            "running": counts[TASK_RUNNING],
+            "done": counts[TASK_DONE],
+            "failed": counts[TASK_FAILED],
+            "throughput": throughput,
+            "eta_seconds": eta_seconds,
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+            "finished_at": job["finished_at"],
+        }
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        取得工作進度（含處理速度與預估剩餘時間）
+
+        Raises:
+            ServiceOverloadedError: 執行器已滿
+        """
+        rows = await run_blocking(self._read_jobs, [job_id])
+        return self._progress(*rows[0]) if rows else None
+
+    async def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        列出最近的工作
+
+        Raises:
+            ServiceOverloadedError: 執行器已滿
+        """
+        job_ids = await run_blocking(self._recent_job_ids, limit)
+        rows = await run_blocking(self._read_jobs, job_ids)
+        return [self._progress(job, counts) for job, counts in rows]
+
+    async def shutdown(self) -> None:
+        """停止所有執行中的工作（狀態保留，下次啟動時繼續）"""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# 模組級別的預設實例
+_manager: Optional[HarvestManager] = None
+
+
+def get_harvest_manager() -> HarvestManager:
+    """獲取預設的 HarvestManager 實例"""
+    global _manager
+    if _manager is None:
+        _manager = HarvestManager(
+            os.path.join(settings.data_dir, "harvest.sqlite3"),
+            concurrency=settings.harvest_concurrency,
+            rate_per_second=settings.harvest_rate_per_second,
+            max_attempts=settings.harvest_max_attempts,
+            retry_base_delay=settings.harvest_retry_base_delay,
+            retry_max_delay=settings.harvest_retry_max_delay
+        )
+    return _manager
+
+
+async def shutdown_harvest_manager() -> None:
+    """停止預設實例的所有工作"""
+    if _manager is not None:
+        await _manager.shutdown()
@@ -0,0 +1,254 @@
+"""避險請求模組
+
+pytubefix 與 yt-dlp 都會因為 YouTube 改版而突然變慢或失效。
+這裡同時持有多個 metadata 後端：先呼叫評分最好的後端，若在它的 p95 延遲內沒有回應，
+就啟動下一個後端，採用最先成功的結果；後端失敗時立即改用下一個。
+
+每個後端以滑動視窗統計延遲與錯誤率來評分，並記錄被呼叫、避險啟動與勝出的次數。
+輸給其他後端而被取消的呼叫仍會在執行緒中完成，完成時以實際延遲記錄；
+有呼叫超過避險延遲仍未完成（可能卡住）的後端排在其他後端之後。
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from ..exceptions import VideoNotFoundError
+from .executor import run_blocking
+from .governor import YOUTUBE_HOST, get_governor
+
+logger = logging.getLogger(__name__)
+
+
+class BackendStats:
+    """單一後端的滑動視窗統計"""
+
+    def __init__(self, name: str, window_size: int = 50, min_samples: int = 5):
+        """
+        初始化統計
+
+        Args:
+            name: 後端名稱
+            window_size: 滑動視窗大小（最近 N 次完成的呼叫）
+            min_samples: 視窗內至少幾次呼叫才以統計評分與計算避險延遲
+        """
+        self.name = name
+        self.min_samples = min_samples
+        # (延遲秒數, 是否失敗)
+        self._window: Deque[Tuple[float, bool]] = deque(maxlen=window_size)
+        self.calls = 0
+        self.errors = 0
+        self.wins = 0
+        self.hedges = 0
+        self._last_error: Optional[str] = None
+        # 進行中的呼叫：編號 -> 開始時間
+        self._inflight: Dict[int, float] = {}
+        self._ids = itertools.count()
+
+    def start(self) -> int:
+        """記錄一次呼叫開始，回傳呼叫編號"""
+        call_id = next(self._ids)
+        self._inflight[call_id] = time.monotonic()
+        return call_id
+
+    def finish(self, call_id: int) -> float:
+        """記錄一次呼叫結束，回傳經過的秒數"""
+        return time.monotonic() - self._inflight.pop(call_id)
+
+    def oldest_inflight_age(self) -> Optional[float]:
+        """最久的進行中呼叫已經過的秒數（沒有進行中的呼叫時回傳 None）"""
+        if not self._inflight:
+            return None
+        return time.monotonic() - min(self._inflight.values())
+
+    def record(self, duration: float, failed: bool, error: Optional[Exception] = None) -> None:
+        """記錄一次完成的呼叫"""
+        self._window.append((duration, failed))
+        if failed:
+            self.errors += 1
+            self._last_error = (str(error) or type(error).__name__) if error else None
+
+    @property
+    def warmed_up(self) -> bool:
+        return len(self._window) >= self.min_samples
+
+    def error_rate(self) -> float:
+        if not self._window:
+            return 0.0
+        return sum(1 for _, failed in self._window if failed) / len(self._window)
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        """成功呼叫的延遲百分位數（沒有樣本時回傳 None）"""
+        latencies = sorted(duration for duration, failed in self._window if not failed)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, max(0, math.ceil(q * len(latencies)) - 1))
+        return latencies[index]
+
+    def score(self) -> float:
+        """
+        評分（越低越好）：成功呼叫的中位延遲除以成功率
+
+        樣本不足的後端評分為 0，讓它優先取得樣本。
+        """
+        if not self.warmed_up:
+            return 0.0
+        median = self.latency_percentile(0.5)
+        success_rate = 1.0 - self.error_rate()
+        if median is None or success_rate <= 0:
+            return math.inf
+        return median / success_rate
+
+    def status(self) -> Dict[str, Any]:
+        """取得統計狀態"""
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "wins": self.wins,
+            "hedges": self.hedges,
+            "window_calls": len(self._window),
+            "in_flight": len(self._inflight),
+            "error_rate": self.error_rate(),
+            "p50_seconds": self.latency_percentile(0.5),
+            "p95_seconds": self.latency_percentile(0.95),
+            "last_error": self._last_error,
+        }
+
+
+class HedgedMetadataProvider:
+    """在多個 metadata 後端之間避險的提供者"""
+
+    def __init__(
+        self,
+        backends: List[Any],
+        window_size: int = 50,
+        default_delay: float = 3.0,
+        min_delay: float = 0.5,
+        max_delay: float = 10.0
+    ):
+        """
+        初始化提供者
+
+        Args:
+            backends: metadata 後端（需有 name 與 fetch(video_id, fields)），順序為評分相同時的偏好
+            window_size: 每個後端統計的滑動視窗大小
+            default_delay: 樣本不足時的避險延遲（秒）
+            min_delay: 避險延遲下限（秒）
+            max_delay: 避險延遲上限（秒）
+        """
+        self.backends = backends
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._stats = {
+            backend.name: BackendStats(backend.name, window_size) for backend in backends
+        }
+
+    def ranked(self) -> List[Any]:
+        """依評分排序的後端（卡住的後端排在最後，評分相同時保留設定順序）"""
+        return sorted(
+            self.backends,
+            key=lambda backend: (self.stalled(backend), self._stats[backend.name].score())
+        )
+
+    def stalled(self, backend: Any) -> bool:
+        """後端是否有呼叫已超過避險延遲仍未完成"""
+        age = self._stats[backend.name].oldest_inflight_age()
+        return age is not None and age > self.hedge_delay(backend)
+
+    def hedge_delay(self, backend: Any) -> float:
+        """啟動下一個後端前等待的秒數：該後端的 p95 延遲"""
+        stats = self._stats[backend.name]
+        p95 = stats.latency_percentile(0.95) if stats.warmed_up else None
+        if p95 is None:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, p95))
+
+    async def _call(self, backend: Any, video_id: str, fields: List[str]) -> Dict[str, Any]:
+        """
+        呼叫單一後端並記錄統計
+
+        執行緒中的呼叫無法中斷，被取消時仍會在背景完成並以實際延遲記錄。
+        呼叫前在 event loop 中取得上游速率調節的 token；節流時不重試，由避險改用其他後端。
+        """
+        await get_governor().admit(YOUTUBE_HOST)
+        stats = self._stats[backend.name]
+        stats.calls += 1
+        call_id = stats.start()
+        call = asyncio.ensure_future(run_blocking(backend.fetch, video_id, fields))
+        call.add_done_callback(lambda future: self._record(stats, call_id, future))
+        return await asyncio.shield(call)
+
+    @staticmethod
+    def _record(stats: BackendStats, call_id: int, future: asyncio.Future) -> None:
+        """呼叫完成（包含輸給其他後端後才完成）時記錄延遲與結果"""
+        duration = stats.finish(call_id)
+        if future.cancelled():
+            return
+        error = future.exception()
+        # 影片不存在是確定的答案，不算後端錯誤
+        if error is None or isinstance(error, VideoNotFoundError):
+            stats.record(duration, False)
+            get_governor().report(YOUTUBE_HOST)
+        else:
+            stats.record(duration, True, error)
+            get_governor().report(YOUTUBE_HOST, error)
+
+    async def fetch(self, video_id: str, fields: Iterable[str]) -> Dict[str, Any]:
+        """
+        取得影片 metadata，採用最先成功的後端結果
+
+        Raises:
+            VideoNotFoundError: 影片不存在（任一後端確定時）
+            Exception: 所有後端都失敗時，拋出最後一個錯誤
+        """
+        fields = list(fields)
+        candidates = self.ranked()
+        running: Dict[asyncio.Task, Any] = {}
+        last_error: Optional[Exception] = None
+
+        def launch() -> None:
+            backend = candidates.pop(0)
+            if running:
+                self._stats[backend.name].hedges += 1
+            running[asyncio.ensure_future(self._call(backend, video_id, fields))] = backend
+
+        launch()
+        try:
+            while running:
+                # 目前最後啟動的後端超過 p95 仍未回應時啟動下一個
+                timeout = self.hedge_delay(list(running.values())[-1]) if candidates else None
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    launch()
+                    continue
+                for task in done:
+                    backend = running.pop(task)
+                    error = task.exception()
+                    if error is None or isinstance(error, VideoNotFoundError):
+                        self._stats[backend.name].wins += 1
+                        return task.result()
+                    logger.warning(
+                        f"Metadata backend {backend.name} failed for {video_id}: {error}"
+                    )
+                    last_error = error
+                if candidates:
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+        raise last_error
+
+    def stats(self) -> Dict[str, Any]:
+        """取得各後端統計"""
+        return {
+            "backends": [self._stats[backend.name].status() for backend in self.backends],
+            "ranking": [backend.name for backend in self.ranked()],
+        }
@@ -0,0 +1,192 @@
+"""上游 HTTP 客戶端模組
+
+全應用程式共用的 httpx.AsyncClient 登錄表，每個上游主機一個連線池，
+保持 keep-alive 連線，避免每次呼叫都重新進行 TCP/TLS 交握。
+由 app.main.lifespan 建立與關閉。
+
+執行器中的同步程式碼（例如 yt-dlp 的字幕取回）可透過 request_sync
+把請求交給 event loop，與非同步呼叫共用同一組連線池。
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 需要額外安裝 h2 套件"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class UpstreamClients:
+    """以主機區分連線池的 httpx.AsyncClient 登錄表"""
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        timeout: float = 30.0
+    ):
+        """
+        初始化登錄表
+
+        Args:
+            max_connections: 每個主機的最大連線數
+            max_keepalive_connections: 每個主機保留的閒置連線數
+            keepalive_expiry: 閒置連線保留秒數
+            http2: 是否啟用 HTTP/2（需安裝 h2）
+            timeout: 預設逾時秒數（個別請求可覆寫）
+        """
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+            http2 = False
+
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2
+        self.timeout = timeout
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        # 客戶端所屬的 event loop，供 request_sync 從其他執行緒提交請求
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        """以 scheme://host:port 作為連線池的 key"""
+        parsed = httpx.URL(url)
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        return f"{parsed.scheme}://{parsed.host}:{port}"
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        """
+        取得指定上游主機的共用客戶端
+
+        Args:
+            url: 上游網址（只會使用 scheme、host 與 port）
+        """
+        self._loop = asyncio.get_running_loop()
+        key = self._host_key(url)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                http2=self.http2,
+                timeout=self.timeout,
+                follow_redirects=True
+            )
+            self._clients[key] = client
+        return client
+
+    @property
+    def bound(self) -> bool:
+        """是否已在 event loop 中使用過（request_sync 需要可提交請求的 event loop）"""
+        return self._loop is not None and not self._loop.is_closed()
+
+    def request_sync(
+        self,
+        method: str,
+        url: str,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """
+        從執行器的工作執行緒以共用連線池送出請求，阻塞直到完成
+
+        Args:
+            method: HTTP 方法
+            url: 請求網址
+            timeout: 逾時秒數（預設使用登錄表的逾時）
+            **kwargs: 傳給 httpx.AsyncClient.request 的其他參數
+
+        Returns:
+            已讀取完內容的回應
+
+        Raises:
+            RuntimeError: 尚未綁定 event loop，或在 event loop 執行緒中呼叫
+            httpx.TimeoutException: 請求逾時
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            raise RuntimeError("Upstream clients are not bound to an event loop")
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            raise RuntimeError("request_sync must not be called from the event loop thread")
+
+        timeout = self.timeout if timeout is None else timeout
+
+        async def send() -> httpx.Response:
+            return await self.get(url).request(method, url, timeout=timeout, **kwargs)
+
+        future = asyncio.run_coroutine_threadsafe(send(), loop)
+        try:
+            # 連線池滿載時請求可能先排隊，多留一些等待時間
+            return future.result(timeout * 2)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise httpx.TimeoutException(f"Request to {url} timed out")
+
+    def stats(self) -> Dict[str, Any]:
+        """取得各主機連線池的使用狀況"""
+        hosts = {}
+        for key, client in self._clients.items():
+            # httpcore 連線池未提供公開的統計介面，這裡盡力讀取
+            connections = getattr(getattr(client._transport, "_pool", None), "connections", [])
+            idle = sum(1 for conn in connections if conn.is_idle())
+            hosts[key] = {
+                "connections": len(connections),
+                "idle": idle,
+                "active": len(connections) - idle,
+                "max_connections": self.limits.max_connections,
+            }
+        return {"http2": self.http2, "hosts": hosts}
+
+    async def aclose(self) -> None:
+        """關閉所有客戶端"""
+        clients, self._clients = self._clients, {}
+        self._loop = None
+        for client in clients.values():
+            await client.aclose()
+
+
+# 模組級別的預設實例
+_clients: Optional[UpstreamClients] = None
+
+
+def get_upstream_clients() -> UpstreamClients:
+    """獲取共用的 UpstreamClients 實例（未經 lifespan 建立時會自動建立）"""
+    global _clients
+    if _clients is None:
+        _clients = UpstreamClients(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+            http2=settings.http2_enabled,
+            timeout=settings.http_timeout
+        )
+    return _clients
+
+
+async def close_upstream_clients() -> None:
+    """關閉共用的 UpstreamClients 實例"""
+    global _clients
+    if _clients is not None:
+        await _clients.aclose()
+        _clients = None
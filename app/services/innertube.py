@@ -0,0 +1,445 @@
+"""YouTube innertube 分頁與頁面解析模組
+
+scrapetube 使用同步的 requests、每頁之間固定 sleep，且生成器只能從第一頁開始走。
+這裡重用 scrapetube 的解析函數，但以共用的 httpx 連線池非同步呼叫 browse API，
+保留每一頁的 continuation 狀態，並將「下一筆在哪一頁的第幾個」編碼成不透明的 cursor，
+讓用戶端可以從上次停下的位置繼續。
+
+cursor 內容（base64url 編碼的 JSON）：
+- kind / id / content_type：來源，避免把 A 頻道的 cursor 用在 B 頻道
+- token / click：目前這一頁的 continuation（None 表示第一頁）
+- skip：這一頁已經回傳過的項目數
+
+innertube 呼叫所需的 api_key 與 client 取自第一頁 HTML，只保存在伺服器端的
+metadata 快取中（以來源為鍵），不放進 cursor；快取過期時重新抓取第一頁取得。
+"""
+
+import asyncio
+import base64
+import binascii
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import scrapetube.scrapetube as _scrapetube
+
+from ..config import settings
+from ..exceptions import (
+    ChannelNotFoundError,
+    InvalidCursorError,
+    PlaylistNotFoundError,
+    YouTubeTranscriptError,
+)
+from .cache import get_metadata_cache
+from .governor import get_governor, host_of
+from .http_client import get_upstream_clients
+
+BROWSE_ENDPOINT = "https://www.youtube.com/youtubei/v1/browse"
+
+KIND_CHANNEL = "channel"
+KIND_PLAYLIST = "playlist"
+
+# 各來源的列表容器與項目 key（與 scrapetube 相同）
+_CHANNEL_ITEM_KEYS = {
+    "videos": "videoRenderer",
+    "streams": "videoRenderer",
+    "shorts": "reelWatchEndpoint",
+}
+
+# innertube 呼叫只需要 client 中的這幾個欄位，其餘不保存
+_CLIENT_KEYS = ("clientName", "clientVersion", "hl", "gl")
+
+# 頁面請求標頭：固定英文介面以便解析數量文字，並略過 cookie 同意頁
+PAGE_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en",
+    "Cookie": "CONSENT=YES+cb",
+}
+
+_INITIAL_DATA_MARKERS = ("var ytInitialData = ", 'window["ytInitialData"] = ')
+
+
+def extract_initial_data(html: str) -> Optional[Dict[str, Any]]:
+    """
+    從頁面 HTML 取出 ytInitialData
+
+    Returns:
+        ytInitialData，找不到時回傳 None
+    """
+    decoder = json.JSONDecoder()
+    for marker in _INITIAL_DATA_MARKERS:
+        start = html.find(marker)
+        if start < 0:
+            continue
+        try:
+            data, _ = decoder.raw_decode(html, start + len(marker))
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+async def fetch_page(url: str) -> Optional[str]:
+    """
+    以共用的 httpx 連線池抓取 YouTube 頁面（單一請求）
+
+    Returns:
+        頁面 HTML，頁面不存在（404）時回傳 None
+
+    Raises:
+        httpx.HTTPError: 其他 HTTP 錯誤
+    """
+    async def request() -> Optional[str]:
+        client = get_upstream_clients().get(url)
+        response = await client.get(url, params={"ucbcb": 1}, headers=PAGE_HEADERS)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.text
+
+    return await get_governor().call(host_of(url), request)
+
+
+async def fetch_initial_data(url: str) -> Optional[Dict[str, Any]]:
+    """
+    抓取頁面並取出 ytInitialData
+
+    Returns:
+        ytInitialData，頁面不存在（404）時回傳 None
+
+    Raises:
+        httpx.HTTPError: 其他 HTTP 錯誤
+        ValueError: 頁面中找不到 ytInitialData
+    """
+    html = await fetch_page(url)
+    if html is None:
+        return None
+
+    data = extract_initial_data(html)
+    if data is None:
+        raise ValueError(f"ytInitialData not found in {url}")
+    return data
+
+
+def parse_count(text: Optional[str]) -> Optional[int]:
+    """
+    解析數量文字，例如 "1.23M subscribers"、"1,234 videos"、"No videos"
+
+    Returns:
+        數量，無法解析時回傳 None
+    """
+    if not text:
+        return None
+    text = text.strip().lower()
+    if text.startswith("no "):
+        return 0
+    match = re.match(r"([\d.,]+)\s*([kmb]?)", text)
+    if not match:
+        return None
+    number = match.group(1).replace(",", "")
+    multiplier = {"": 1, "k": 1_000, "m": 1_000_000, "b": 1_000_000_000}[match.group(2)]
+    try:
+        return int(round(float(number) * multiplier))
+    except ValueError:
+        return None
+
+
+def text_of(node: Any) -> Optional[str]:
+    """取出 YouTube 文字節點（simpleText、runs 或 content）的內容"""
+    if isinstance(node, str):
+        return node
+    if not isinstance(node, dict):
+        return None
+    if "simpleText" in node:
+        return node["simpleText"]
+    if "content" in node:
+        return node["content"]
+    if "runs" in node:
+        return "".join(run.get("text", "") for run in node["runs"])
+    return None
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """將分頁狀態編碼為不透明的 cursor"""
+    raw = json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(
+    cursor: str,
+    kind: str,
+    source_id: str,
+    content_type: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    解碼 cursor 並檢查是否屬於指定來源
+
+    Raises:
+        InvalidCursorError: cursor 格式錯誤或不屬於此來源
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError, binascii.Error):
+        raise InvalidCursorError()
+
+    if not isinstance(state, dict):
+        raise InvalidCursorError()
+    if (
+        state.get("kind") != kind
+        or state.get("id") != source_id
+        or state.get("content_type") != content_type
+    ):
+        raise InvalidCursorError()
+    skip = state.get("skip")
+    if not isinstance(skip, int) or isinstance(skip, bool) or skip < 0:
+        raise InvalidCursorError()
+    token = state.get("token")
+    if token is not None and (not isinstance(token, str) or not token):
+        raise InvalidCursorError()
+    if state.get("click") is not None and not isinstance(state["click"], dict):
+        raise InvalidCursorError()
+    return state
+
+
+class ListingPager:
+    """
+    可從 cursor 繼續的頻道／播放清單列表分頁器
+
+    以共用的 httpx 連線池直接呼叫 innertube browse API（不經過 scrapetube 的同步 requests）。
+    目前這一頁的項目還在被處理時，會在背景預先抓取下一頁；
+    每次請求之間至少間隔 listing_page_delay 秒。
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        source_id: str,
+        content_type: Optional[str] = None,
+        cursor: Optional[str] = None,
+        wanted: Optional[int] = None
+    ):
+        """
+        初始化分頁器
+
+        Args:
+            kind: 來源類型 (channel, playlist)
+            source_id: 頻道 ID 或播放清單 ID
+            content_type: 頻道內容類型 (videos, shorts, streams)，播放清單為 None
+            cursor: 上一次回傳的 cursor，None 表示從頭開始
+            wanted: 呼叫端預計取用的項目數，用於判斷是否需要預先抓取下一頁（None 表示全部）
+        """
+        self.kind = kind
+        self.source_id = source_id
+        self.content_type = content_type
+        self.wanted = wanted
+
+        # innertube 參數（快取過期時 _fetch 會重新抓取第一頁取得）
+        self._api_key: Optional[str] = None
+        self._client: Optional[Dict[str, Any]] = None
+        if cursor:
+            state = decode_cursor(cursor, kind, source_id, content_type)
+            self._page: Optional[Dict[str, Any]] = (
+                {"token": state["token"], "click_params": state.get("click") or {}}
+                if state.get("token") else None
+            )
+            self._skip = state["skip"]
+            params = get_metadata_cache().get(self._params_key())
+            if params is not None:
+                self._api_key, self._client = params
+        else:
+            self._page = None
+            self._skip = 0
+
+        self._primed: Optional[Tuple[List[dict], Optional[Dict[str, Any]]]] = None
+        self._page_size = 0
+        self._next: Optional[Dict[str, Any]] = None
+        self._exhausted = False
+        self._yielded = 0
+        self._last_request = 0.0
+
+    def _params_key(self) -> Tuple[str, str, str, Optional[str]]:
+        return ("innertube", self.kind, self.source_id, self.content_type)
+
+    def _set_params(self, api_key: Optional[str], client: Dict[str, Any]) -> None:
+        """記錄 innertube 參數，並保存在伺服器端供之後以 cursor 繼續的請求使用"""
+        self._api_key = api_key
+        self._client = client
+        get_metadata_cache().set(self._params_key(), (api_key, client))
+
+    def _url(self) -> str:
+        if self.kind == KIND_CHANNEL:
+            return f"https://www.youtube.com/channel/{self.source_id}/{self.content_type}?view=0&flow=grid"
+        return f"https://www.youtube.com/playlist?list={self.source_id}"
+
+    def _not_found(self) -> YouTubeTranscriptError:
+        """來源頁面不存在（404）時的例外"""
+        if self.kind == KIND_CHANNEL:
+            return ChannelNotFoundError(self.source_id)
+        return PlaylistNotFoundError(self.source_id)
+
+    def _selectors(self) -> Tuple[str, str]:
+        if self.kind == KIND_CHANNEL:
+            return "contents", _CHANNEL_ITEM_KEYS[self.content_type]
+        return "playlistVideoListRenderer", "playlistVideoRenderer"
+
+    def _parse_first_page(self, html: str) -> Tuple[List[dict], Optional[Dict[str, Any]]]:
+        """從第一頁 HTML 取出 innertube 參數與這一頁的項目"""
+        selector_list, selector_item = self._selectors()
+        client = json.loads(
+            _scrapetube.get_json_from_html(html, "INNERTUBE_CONTEXT", 2, '"}},') + '"}}'
+        )["client"]
+        self._set_params(
+            _scrapetube.get_json_from_html(html, "innertubeApiKey", 3),
+            {key: client[key] for key in _CLIENT_KEYS if key in client}
+        )
+
+        data = extract_initial_data(html)
+        data = next(_scrapetube.search_dict(data, selector_list), None) if data else None
+        items = list(_scrapetube.get_videos_items(data, selector_item))
+        return items, _scrapetube.get_next_data(data)
+
+    def prime(self, html: str) -> List[dict]:
+        """
+        以已經抓取的第一頁 HTML 作為第一頁，迭代時不再重新抓取
+
+        只能用於從頭開始（沒有 cursor）的分頁器。
+
+        Returns:
+            第一頁的項目
+        """
+        self._primed = self._parse_first_page(html)
+        return self._primed[0]
+
+    async def _wait_politely(self) -> None:
+        """與上一次請求至少間隔 listing_page_delay 秒"""
+        if self._last_request:
+            delay = settings.listing_page_delay - (time.monotonic() - self._last_request)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        self._last_request = time.monotonic()
+
+    async def _fetch(
+        self,
+        page: Optional[Dict[str, Any]]
+    ) -> Tuple[List[dict], Optional[Dict[str, Any]]]:
+        """
+        抓取一頁
+
+        Args:
+            page: continuation（None 表示第一頁）
+
+        Returns:
+            (這一頁的項目, 下一頁的 continuation)
+
+        Raises:
+            ChannelNotFoundError: 頻道頁面不存在
+            PlaylistNotFoundError: 播放清單頁面不存在
+        """
+        if page is None and self._primed is not None:
+            primed, self._primed = self._primed, None
+            return primed
+
+        if page is None or self._client is None:
+            await self._wait_politely()
+            html = await fetch_page(self._url())
+            if html is None:
+                raise self._not_found()
+            first_page = self._parse_first_page(html)
+            if page is None:
+                return first_page
+
+        await self._wait_politely()
+
+        async def request() -> Dict[str, Any]:
+            client = get_upstream_clients().get(BROWSE_ENDPOINT)
+            response = await client.post(
+                BROWSE_ENDPOINT,
+                params={"key": self._api_key},
+                json={
+                    "context": {
+                        "clickTracking": page.get("click_params") or {},
+                        "client": self._client,
+                    },
+                    "continuation": page["token"],
+                },
+                headers={
+                    **PAGE_HEADERS,
+                    "X-YouTube-Client-Name": "1",
+                    "X-YouTube-Client-Version": self._client.get("clientVersion", ""),
+                },
+            )
+            response.raise_for_status()
+            return response.json()
+
+        data = await get_governor().call(host_of(BROWSE_ENDPOINT), request)
+        items = list(_scrapetube.get_videos_items(data, self._selectors()[1]))
+        return items, _scrapetube.get_next_data(data)
+
+    def _should_prefetch(self, items_left_on_page: int) -> bool:
+        """呼叫端預計取用的數量超過這一頁剩下的項目時才預先抓取下一頁"""
+        if not settings.listing_prefetch:
+            return False
+        return self.wanted is None or self.wanted - self._yielded > items_left_on_page
+
+    async def __aiter__(self) -> AsyncIterator[dict]:
+        """逐筆產生項目，每產生一筆就更新目前位置"""
+        next_task: Optional[asyncio.Task] = None
+        try:
+            items, self._next = await self._fetch(self._page)
+            while True:
+                self._page_size = len(items)
+                if self._next and self._should_prefetch(len(items) - self._skip):
+                    next_task = asyncio.create_task(self._fetch(self._next))
+
+                while self._skip < len(items):
+                    item = items[self._skip]
+                    self._skip += 1
+                    self._yielded += 1
+                    yield item
+
+                if not self._next:
+                    self._exhausted = True
+                    return
+
+                if next_task is None:
+                    next_task = asyncio.create_task(self._fetch(self._next))
+                items, following = await next_task
+                next_task = None
+                self._page, self._skip, self._next = self._next, 0, following
+        finally:
+            if next_task is not None:
+                next_task.cancel()
+                # 避免預先抓取失敗時出現 "exception was never retrieved" 警告
+                next_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    def next_cursor(self) -> Optional[str]:
+        """
+        取得指向下一筆項目的 cursor
+
+        Returns:
+            cursor，已經沒有更多項目時回傳 None
+        """
+        if self._exhausted:
+            return None
+
+        page, skip = self._page, self._skip
+        if self._page_size and skip >= self._page_size:
+            # 這一頁已經全部回傳，直接指向下一頁
+            if not self._next:
+                return None
+            page, skip = self._next, 0
+
+        return encode_cursor({
+            "kind": self.kind,
+            "id": self.source_id,
+            "content_type": self.content_type,
+            "token": page["token"] if page else None,
+            "click": page.get("click_params") if page else None,
+            "skip": skip,
+        })
@@ -1,13 +1,70 @@
 """播放清單服務模組"""
 
-from typing import Optional, List, Dict, Any
-import scrapetube
+import logging
+from typing import Optional, List, Dict, Any, AsyncIterator
 from pytubefix import Playlist
-from .channel import _parse_duration  # 復用 duraion 解析邏輯
+from ..exceptions import PlaylistNotFoundError
+from .cache import get_metadata_cache
+from .channel import _parse_duration, _largest_image_url  # 復用 duraion 解析邏輯
+from .governor import YOUTUBE_HOST, get_governor
+from .innertube import (
+    KIND_PLAYLIST,
+    ListingPager,
+    extract_initial_data,
+    fetch_page,
+    parse_count,
+    text_of,
+)
 
-def get_playlist_videos_generator(playlist_id: str, limit: int = 50) -> Any:
-    """獲取播放清單影片生成器"""
-    return scrapetube.get_playlist(playlist_id, limit=limit)
+logger = logging.getLogger(__name__)
+
+async def iter_playlist_videos(playlist_id: str, limit: Optional[int] = 50) -> AsyncIterator[dict]:
+    """
+    逐筆產生播放清單影片的原始項目（limit 為 None 表示不限）
+
+    以非同步的 innertube 分頁器抓取，產生的項目格式與 scrapetube 相同，
+    可直接交給 extract_playlist_video_info。
+    """
+    if limit is not None and limit <= 0:
+        return
+    count = 0
+    async for video_data in open_playlist_pager(playlist_id, wanted=limit):
+        yield video_data
+        count += 1
+        if limit is not None and count >= limit:
+            break
+
+async def stream_playlist_videos(
+    playlist_id: str, limit: Optional[int] = None
+) -> AsyncIterator[dict]:
+    """
+    逐筆產生播放清單影片資訊，每取得一頁就立即產出
+
+    Args:
+        playlist_id: 播放清單 ID
+        limit: 回傳數量上限（None 表示不限）
+    """
+    position = 1
+    async for video_data in iter_playlist_videos(playlist_id, limit=limit):
+        info = extract_playlist_video_info(video_data, position)
+        if not info:
+            continue
+        yield info
+        position += 1
+
+def open_playlist_pager(
+    playlist_id: str, cursor: Optional[str] = None, wanted: Optional[int] = None
+) -> ListingPager:
+    """
+    建立可從 cursor 繼續的播放清單影片分頁器
+
+    Args:
+        wanted: 預計取用的項目數（None 表示全部），用於決定是否預先抓取下一頁
+
+    Raises:
+        InvalidCursorError: cursor 無效或不屬於此播放清單
+    """
+    return ListingPager(KIND_PLAYLIST, playlist_id, cursor=cursor, wanted=wanted)
 
 def extract_playlist_video_info(video_data: dict, position: int) -> dict:
     """從 scrapetube 數據中提取播放清單影片資訊"""
@@ -15,6 +72,11 @@ def extract_playlist_video_info(video_data: dict, position: int) -> dict:
     if not video_id:
         return None
     
+    # 以 YouTube 提供的索引為準（從 cursor 繼續時不會從 1 開始）
+    index_text = video_data.get('index', {}).get('simpleText', '')
+    if index_text.isdigit():
+        position = int(index_text)
+    
     # 取得縮圖
     thumbnails = video_data.get('thumbnail', {}).get('thumbnails', [])
     thumbnail_url = thumbnails[-1].get('url') if thumbnails else None
@@ -57,3 +119,161 @@ def get_playlist_basic_info(playlist_id: str) -> dict:
         "video_count": playlist.length,
         "thumbnail_url": None
     }
+
+def _owner_from_runs(node: Any) -> Dict[str, Optional[str]]:
+    """從含有頻道連結的文字節點取出建立者名稱與頻道 ID"""
+    runs = node.get("runs", []) if isinstance(node, dict) else []
+    for run in runs:
+        browse_id = run.get("navigationEndpoint", {}).get("browseEndpoint", {}).get("browseId")
+        if browse_id:
+            return {"channel_id": browse_id, "channel_name": run.get("text")}
+    return {"channel_id": None, "channel_name": text_of(node)}
+
+
+def parse_playlist_page(playlist_id: str, data: dict) -> dict:
+    """
+    從播放清單第一頁的 ytInitialData 解析頁首資訊
+
+    依序嘗試 playlistHeaderRenderer、側欄 playlistSidebarRenderer 與新版 pageHeaderViewModel，
+    不需要載入其他頁面。
+
+    Raises:
+        PlaylistNotFoundError: 播放清單不存在或不公開
+        ValueError: 頁面中沒有播放清單資訊
+    """
+    metadata = data.get("metadata", {}).get("playlistMetadataRenderer")
+    if not metadata:
+        if data.get("alerts"):
+            raise PlaylistNotFoundError(playlist_id)
+        raise ValueError(f"playlistMetadataRenderer not found for {playlist_id}")
+
+    microformat = data.get("microformat", {}).get("microformatDataRenderer", {})
+    info = {
+        "playlist_id": playlist_id,
+        "title": metadata.get("title"),
+        "description": metadata.get("description") or None,
+        "channel_id": None,
+        "channel_name": None,
+        "video_count": None,
+        "thumbnail_url": _largest_image_url(microformat.get("thumbnail", {}).get("thumbnails", [])),
+    }
+
+    header = data.get("header", {})
+    legacy = header.get("playlistHeaderRenderer")
+    if legacy:
+        info["video_count"] = parse_count(text_of(legacy.get("numVideosText")))
+        info.update(_owner_from_runs(legacy.get("ownerText")))
+        return info
+
+    sidebar_items = data.get("sidebar", {}).get("playlistSidebarRenderer", {}).get("items", [])
+    for item in sidebar_items:
+        primary = item.get("playlistSidebarPrimaryInfoRenderer")
+        if primary:
+            stats = primary.get("stats", [])
+            if stats:
+                info["video_count"] = parse_count(text_of(stats[0]))
+        secondary = item.get("playlistSidebarSecondaryInfoRenderer")
+        if secondary:
+            owner = secondary.get("videoOwner", {}).get("videoOwnerRenderer", {})
+            info.update(_owner_from_runs(owner.get("title")))
+    if sidebar_items:
+        return info
+
+    view_model = (
+        header.get("pageHeaderRenderer", {}).get("content", {}).get("pageHeaderViewModel", {})
+    )
+    rows = (
+        view_model.get("metadata", {}).get("contentMetadataViewModel", {}).get("metadataRows", [])
+    )
+    for row in rows:
+        for part in row.get("metadataParts", []):
+            text_node = part.get("text", {})
+            text = text_of(text_node) or ""
+            if "video" in text.lower():
+                info["video_count"] = parse_count(text)
+            for command_run in text_node.get("commandRuns", []):
+                browse_id = (
+                    command_run.get("onTap", {}).get("innertubeCommand", {})
+                    .get("browseEndpoint", {}).get("browseId")
+                )
+                if browse_id and browse_id.startswith("UC"):
+                    info["channel_id"] = browse_id
+                    info["channel_name"] = text.removeprefix("by ").strip()
+    return info
+
+
+async def get_playlist_overview(
+    playlist_id: str,
+    include_videos: bool = False,
+    limit: int = 100
+) -> dict:
+    """
+    獲取播放清單資訊，可一併回傳第一頁影片
+
+    只抓取一次播放清單第一頁：頁首資訊與第一頁影片都來自同一個回應。
+    頁首資訊會快取；include_videos 時一律重新抓取。頁面解析失敗時改用 pytubefix。
+
+    Args:
+        playlist_id: 播放清單 ID
+        include_videos: 是否一併回傳第一頁影片與下一頁的 cursor
+        limit: 回傳的影片數上限（不會超過第一頁）
+
+    Returns:
+        播放清單資訊；include_videos 時另含 videos 與 next_cursor
+
+    Raises:
+        PlaylistNotFoundError: 播放清單不存在
+    """
+    cache = get_metadata_cache()
+    cache_key = ("playlist", playlist_id)
+    if not include_videos:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        html = await fetch_page(f"https://www.youtube.com/playlist?list={playlist_id}")
+        if html is None:
+            raise PlaylistNotFoundError(playlist_id)
+        data = extract_initial_data(html)
+        if data is None:
+            raise ValueError(f"ytInitialData not found for {playlist_id}")
+        info = parse_playlist_page(playlist_id, data)
+    except PlaylistNotFoundError:
+        raise
+    except Exception as e:
+        logger.warning(
+            f"Playlist page parsing failed for {playlist_id}, falling back to pytubefix: {e}"
+        )
+        info = await get_governor().run(YOUTUBE_HOST, get_playlist_basic_info, playlist_id)
+        html = None
+    cache.set(cache_key, info)
+
+    if not include_videos:
+        return info
+
+    videos = []
+    next_cursor = None
+    if html is not None:
+        pager = open_playlist_pager(playlist_id)
+        first_page = pager.prime(html)
+        # 只取第一頁的內容，不預先抓取下一頁
+        pager.wanted = min(limit, len(first_page))
+        taken = 0
+        position = 1
+        if pager.wanted:
+            async for video_data in pager:
+                taken += 1
+                video = extract_playlist_video_info(video_data, position)
+                if video:
+                    videos.append(video)
+                    position += 1
+                if taken >= pager.wanted:
+                    break
+        next_cursor = pager.next_cursor()
+    return {**info, "videos": videos, "next_cursor": next_cursor}
+
+
+async def get_playlist_basic_info_async(playlist_id: str) -> dict:
+    """獲取播放清單基本資訊（單一請求，含快取）"""
+    return await get_playlist_overview(playlist_id)
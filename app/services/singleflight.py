@@ -0,0 +1,46 @@
+"""請求合併（singleflight）模組
+
+同一個 key 的並行呼叫只會觸發一次上游請求，所有呼叫者共享同一個結果或錯誤。
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """以 key 合併進行中的非同步呼叫"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        執行或加入進行中的呼叫
+
+        Args:
+            key: 合併用的 key
+            func: 回傳 awaitable 的函數，只有第一個呼叫者會執行
+
+        Returns:
+            共享的執行結果（錯誤也會拋給所有呼叫者）
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+
+        # shield: 單一呼叫者取消時不影響其他等待中的呼叫者
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        """呼叫完成後移除 key"""
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # 避免所有呼叫者都已取消時出現 "exception was never retrieved" 警告
+        if not future.cancelled():
+            future.exception()
+
+    def in_flight(self) -> int:
+        """目前進行中的呼叫數"""
+        return len(self._calls)
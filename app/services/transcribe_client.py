@@ -2,11 +2,52 @@
 
 import httpx
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.config import settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.http_client import get_upstream_clients
 
 logger = logging.getLogger(__name__)
 
+# 未設定慢呼叫秒數時，超過轉錄逾時的這個比例即視為慢呼叫
+# （以逾時為門檻時，慢呼叫實際上都已逾時失敗，慢呼叫比例永遠不會單獨觸發）
+SLOW_CALL_TIMEOUT_FRACTION = 0.5
+
+# Whisper 後端斷路器
+_breaker: Optional[CircuitBreaker] = None
+
+
+def get_transcribe_breaker() -> CircuitBreaker:
+    """獲取 Whisper 後端的斷路器實例"""
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(
+            "transcribe",
+            window_size=settings.transcribe_breaker_window,
+            min_calls=settings.transcribe_breaker_min_calls,
+            failure_rate_threshold=settings.transcribe_breaker_failure_rate,
+            slow_call_seconds=(
+                settings.transcribe_breaker_slow_seconds
+                or settings.transcribe_timeout * SLOW_CALL_TIMEOUT_FRACTION
+            ),
+            slow_call_rate_threshold=settings.transcribe_breaker_slow_rate,
+            open_seconds=settings.transcribe_breaker_open_seconds,
+            is_failure=is_upstream_failure
+        )
+    return _breaker
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """
+    判斷錯誤是否代表 Whisper 後端故障
+    
+    只有 5xx、逾時與連線錯誤計入斷路器；4xx（例如影片無法轉錄）是請求本身的問題。
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
 async def transcribe_video(video_id: str, language: str) -> List[Dict[str, Any]]:
     """
     呼叫 Whisper transcribe API 取得字幕
@@ -19,6 +60,7 @@ async def transcribe_video(video_id: str, language: str) -> List[Dict[str, Any]]
         字幕列表 [{"text": str, "start": float, "duration": float}, ...]
         
     Raises:
+        CircuitOpenError: Whisper 後端近期持續失敗，斷路器開啟中
         Exception: 當 API 呼叫失敗或設定無效時
     """
     if not settings.transcribe_api_url:
@@ -32,12 +74,7 @@ async def transcribe_video(video_id: str, language: str) -> List[Dict[str, Any]]
     }
     
     try:
-        async with httpx.AsyncClient() as client:
-            logger.info(f"Calling Transcribe API for video {video_id} with language {language}")
-            response = await client.post(url, json=payload, timeout=300.0) # 轉錄可能需要較長時間，設定較長 timeout
-            response.raise_for_status()
-            
-            return response.json()
+        return await get_transcribe_breaker().call(_post_transcribe, url, payload)
             
     except httpx.HTTPError as e:
         logger.error(f"Transcribe API request failed: {e}")
@@ -45,3 +82,17 @@ async def transcribe_video(video_id: str, language: str) -> List[Dict[str, Any]]
     except Exception as e:
         logger.error(f"Unexpected error calling Transcribe API: {e}")
         raise
+
+
+async def _post_transcribe(url: str, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """送出轉錄請求"""
+    client = get_upstream_clients().get(url)
+    logger.info(
+        f"Calling Transcribe API for video {payload['video_id']} "
+        f"with language {payload['language']}"
+    )
+    # 轉錄可能需要較長時間，設定較長 timeout
+    response = await client.post(url, json=payload, timeout=settings.transcribe_timeout)
+    response.raise_for_status()
+    
+    return response.json()
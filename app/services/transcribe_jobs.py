@@ -0,0 +1,189 @@
+"""Whisper 非同步轉錄工作模組
+
+Whisper 轉錄可能需要數分鐘，非同步模式下請求會立即回傳工作 ID，
+由背景工作執行轉錄，用戶端再透過輪詢或 SSE 取得結果。
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED)
+
+
+@dataclass
+class TranscribeJob:
+    """轉錄工作"""
+    id: str
+    video_id: str
+    language: str
+    status: str = JOB_QUEUED
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    result: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        """工作是否已結束"""
+        return self.status in FINISHED_STATES
+
+    def _set_status(self, status: str) -> None:
+        """更新狀態並喚醒等待中的 SSE 連線"""
+        self.status = status
+        self.updated_at = time.time()
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_change(self, timeout: float) -> bool:
+        """
+        等待狀態改變
+
+        Returns:
+            是否在逾時前發生改變
+        """
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """轉換為回應用的字典"""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "video_id": self.video_id,
+            "language": self.language,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "transcript": self.result,
+            "error": self.error,
+        }
+
+
+class TranscriptionDeferred(Exception):
+    """字幕需要 Whisper 轉錄，已建立背景工作"""
+
+    def __init__(self, job: TranscribeJob):
+        self.job = job
+        super().__init__(f"Transcription deferred to job {job.id}")
+
+
+class TranscribeJobRegistry:
+    """轉錄工作登錄表"""
+
+    def __init__(self, max_concurrent: int = 2, retention: float = 3600.0):
+        """
+        初始化登錄表
+
+        Args:
+            max_concurrent: 同時執行的轉錄工作數上限
+            retention: 已結束工作保留秒數
+        """
+        self.max_concurrent = max_concurrent
+        self.retention = retention
+        self._jobs: Dict[str, TranscribeJob] = {}
+        self._active: Dict[Tuple[str, str], TranscribeJob] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def get(self, job_id: str) -> Optional[TranscribeJob]:
+        """依 ID 取得工作"""
+        return self._jobs.get(job_id)
+
+    def submit(
+        self,
+        video_id: str,
+        language: str,
+        runner: Callable[[str, str], Awaitable[List[Dict[str, Any]]]]
+    ) -> TranscribeJob:
+        """
+        建立轉錄工作；同一影片與語言已有進行中的工作時直接回傳該工作
+
+        Args:
+            video_id: YouTube 影片 ID
+            language: 轉錄語言
+            runner: 實際執行轉錄的協程函數
+        """
+        self._purge()
+
+        key = (video_id, language)
+        job = self._active.get(key)
+        if job is not None and not job.finished:
+            return job
+
+        job = TranscribeJob(id=uuid.uuid4().hex, video_id=video_id, language=language)
+        self._jobs[job.id] = job
+        self._active[key] = job
+        job._task = asyncio.get_running_loop().create_task(self._run(job, runner))
+        return job
+
+    async def _run(
+        self,
+        job: TranscribeJob,
+        runner: Callable[[str, str], Awaitable[List[Dict[str, Any]]]]
+    ) -> None:
+        """在並行上限內執行工作"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        try:
+            async with self._semaphore:
+                job._set_status(JOB_RUNNING)
+                job.result = await runner(job.video_id, job.language)
+                job._set_status(JOB_DONE)
+        except Exception as e:
+            logger.error(f"Transcribe job {job.id} for {job.video_id} failed: {e}")
+            job.error = str(e) or type(e).__name__
+            job._set_status(JOB_FAILED)
+        finally:
+            key = (job.video_id, job.language)
+            if self._active.get(key) is job:
+                del self._active[key]
+
+    def _purge(self) -> None:
+        """移除超過保留時間的已結束工作"""
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.updated_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, int]:
+        """取得各狀態的工作數"""
+        counts = {JOB_QUEUED: 0, JOB_RUNNING: 0, JOB_DONE: 0, JOB_FAILED: 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+
+# 模組級別的預設實例
+_registry: Optional[TranscribeJobRegistry] = None
+
+
+def get_job_registry() -> TranscribeJobRegistry:
+    """獲取預設的 TranscribeJobRegistry 實例"""
+    global _registry
+    if _registry is None:
+        _registry = TranscribeJobRegistry(
+            max_concurrent=settings.transcribe_max_concurrent_jobs,
+            retention=settings.transcribe_job_retention
+        )
+    return _registry
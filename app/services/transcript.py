@@ -4,15 +4,27 @@
 yt-dlp 內建模擬瀏覽器行為，較不易被 YouTube 封鎖。
 """
 
-from typing import List, Tuple, Any, Dict
+import asyncio
+import httpx
+from typing import List, Tuple, Any, AsyncIterator, Dict, Optional, Type
+from yt_dlp.utils import DownloadError, ExtractorError
 from ..exceptions import (
+    YouTubeTranscriptError,
     TranscriptNotFoundError,
     TranscriptDisabledError,
-    VideoNotFoundError
+    VideoNotFoundError,
+    ServiceOverloadedError
 )
-from .video import get_video_info, generate_markdown
-from .yt_dlp_wrapper import get_wrapper, YtDlpWrapper
+from .video import get_video_info, get_video_info_async, generate_markdown
+from .yt_dlp_wrapper import get_wrapper, get_info_dict_async, YtDlpWrapper, NoSubtitlesError
+from .cache import get_info_cache, get_negative_cache
 from .transcribe_client import transcribe_video
+from .singleflight import SingleFlight
+from .executor import run_blocking
+from .governor import YOUTUBE_HOST, get_governor
+from .transcript_store import get_transcript_store
+from .whisper_store import get_whisper_store
+from .transcribe_jobs import get_job_registry, TranscriptionDeferred
 from ..config import settings
 import logging
 
@@ -21,6 +33,18 @@ logger = logging.getLogger(__name__)
 # 獲取 yt-dlp wrapper 實例
 _wrapper: YtDlpWrapper = None
 
+# 合併同一影片、同一語言偏好的並行請求
+_inflight = SingleFlight()
+
+# 表示影片本身無法存取的錯誤訊息
+_VIDEO_UNAVAILABLE_MARKERS = (
+    'private video',
+    'video unavailable',
+    'this video is unavailable',
+    'has been removed',
+    'this video has been terminated',
+)
+
 
 def _get_wrapper() -> YtDlpWrapper:
     """獲取 YtDlpWrapper 實例"""
@@ -33,7 +57,8 @@ def _get_wrapper() -> YtDlpWrapper:
 async def get_transcript_with_fallback(
     video_id: str, 
     preferred_language: str, 
-    fallback_languages: List[str]
+    fallback_languages: List[str],
+    defer_fallback: bool = False
 ) -> Tuple[List[Dict[str, Any]], str]:
     """
     嘗試獲取字幕，包含語言回退機制
@@ -42,52 +67,330 @@ async def get_transcript_with_fallback(
         video_id: YouTube 影片 ID
         preferred_language: 偏好語言代碼
         fallback_languages: 回退語言代碼列表
+        defer_fallback: 需要 Whisper 轉錄時改為建立背景工作
         
     Returns:
         (字幕列表, 實際使用的語言代碼)
+        
+    Raises:
+        TranscriptionDeferred: defer_fallback=True 且需要 Whisper 轉錄時
+    """
+    # 已知無法取得字幕的影片直接回應
+    failure = get_negative_cache().get(video_id)
+    if failure is not None:
+        raise _build_failure(failure, video_id, preferred_language)
+    
+    # 並行請求共用同一次上游抓取
+    key = (video_id, preferred_language, tuple(fallback_languages), defer_fallback)
+    return await _inflight.do(
+        key,
+        lambda: _fetch_transcript(
+            video_id, preferred_language, fallback_languages, defer_fallback
+        )
+    )
+
+
+async def iter_transcripts_concurrently(
+    targets: List[Tuple[str, str]],
+    fallback_languages: List[str],
+    max_concurrency: int
+) -> AsyncIterator[
+    Tuple[str, str, Optional[Tuple[List[Dict[str, Any]], str]], Optional[Exception]]
+]:
     """
+    以有上限的並行度抓取多支影片的字幕，依完成順序回傳
+    
+    Args:
+        targets: (影片 ID, 偏好語言) 列表
+        fallback_languages: 回退語言代碼列表
+        max_concurrency: 同時進行的抓取數上限
+        
+    Yields:
+        (影片 ID, 偏好語言, (字幕列表, 實際語言) 或 None, 例外或 None)
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def fetch(video_id: str, language: str):
+        async with semaphore:
+            try:
+                result = await get_transcript_with_fallback(video_id, language, fallback_languages)
+                return video_id, language, result, None
+            except Exception as e:
+                return video_id, language, None, e
+    
+    tasks = [asyncio.ensure_future(fetch(video_id, language)) for video_id, language in targets]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # 用戶端中斷連線時取消尚未完成的抓取
+        for task in tasks:
+            task.cancel()
+
+
+async def _fetch_transcript(
+    video_id: str, 
+    preferred_language: str, 
+    fallback_languages: List[str],
+    defer_fallback: bool = False
+) -> Tuple[List[Dict[str, Any]], str]:
+    """實際向 yt-dlp / Whisper 取得字幕"""
     wrapper = _get_wrapper()
     
+    # 偏好語言的字幕已保存時完全略過 yt-dlp
+    stored = await _read_stored(video_id, preferred_language)
+    if stored is not None:
+        return stored['items'], stored['language']
+    
     try:
-        transcript_data, actual_language = wrapper.get_subtitles(
-            video_id, preferred_language, fallback_languages
+        # extract 與字幕下載各自經過上游速率調節（info_dict 取得後寫入快取，不會重新 extract）
+        info = await get_info_dict_async(wrapper, video_id)
+        
+        # 偏好語言確定不存在時，yt-dlp 會改用的回退語言字幕若已保存就直接回傳
+        fallback_language = _select_fallback_language(
+            info, video_id, preferred_language, fallback_languages
         )
-        return transcript_data, actual_language
+        if fallback_language is not None:
+            stored = await _read_stored(video_id, fallback_language)
+            if stored is not None:
+                return stored['items'], stored['language']
         
+        transcript_data, actual_language = await get_governor().run(
+            YOUTUBE_HOST, wrapper.get_subtitles, video_id, preferred_language, fallback_languages
+        )
+    except ServiceOverloadedError:
+        raise
     except Exception as e:
-        # 嘗試使用 fallback API
-        if settings.transcribe_api_url:
+        failure = classify_failure(e)
+        # Whisper 暫時無法使用時不寫入負面快取，之後的請求仍可再試 Whisper
+        fallback_unavailable = False
+        
+        # 嘗試使用 fallback API（影片本身不存在時 Whisper 也無法處理，直接略過）
+        if settings.transcribe_api_url and failure is not VideoNotFoundError:
             try:
                 logger.info(f"yt-dlp failed ({e}), trying Whisper fallback for {video_id}")
                 
-                # 嘗試從 yt-dlp 獲取影片語言資訊
+                # 嘗試從 yt-dlp 獲取影片語言資訊（通常已在快取中，不會重新 extract）
                 detected_language = preferred_language  # 預設使用 preferred_language
                 try:
-                    video_info = wrapper.get_video_info(video_id)
-                    detected_language = video_info.get('language') or preferred_language
+                    video_info = await get_info_dict_async(wrapper, video_id)
+                    language = video_info.get('language')
+                    if isinstance(language, str) and language:
+                        detected_language = language
                     logger.info(f"Detected video language: {detected_language}")
                 except Exception as info_error:
                     logger.warning(f"Could not get video info for language detection: {info_error}")
                 
+                # 先查詢本機保存的 Whisper 結果，避免重複消耗 GPU 時間
+                whisper_store = get_whisper_store()
+                if whisper_store is not None:
+                    stored = await run_blocking(whisper_store.get, video_id, detected_language)
+                    if stored is not None:
+                        return stored, detected_language
+                
+                # 非同步模式：建立背景工作後立即回傳工作 ID
+                if defer_fallback:
+                    job = get_job_registry().submit(
+                        video_id, detected_language, _transcribe_and_store
+                    )
+                    raise TranscriptionDeferred(job)
+                
                 # 使用偵測到的語言呼叫 Whisper API
-                transcript_data = await transcribe_video(video_id, detected_language)
+                transcript_data = await _transcribe_and_store(video_id, detected_language)
                 return transcript_data, detected_language
+            except TranscriptionDeferred:
+                raise
             except Exception as fallback_error:
                 logger.error(f"Fallback also failed: {fallback_error}")
+                fallback_unavailable = not _is_definitive_fallback_failure(fallback_error)
                 # 繼續拋出原始錯誤，讓後續邏輯處理
         
-        error_msg = str(e).lower()
-        
-        # 根據錯誤訊息分類
-        if 'private' in error_msg or 'unavailable' in error_msg:
-            raise VideoNotFoundError(video_id)
-        elif 'no subtitles' in error_msg or 'no subtitle' in error_msg:
-            raise TranscriptNotFoundError(video_id, preferred_language)
-        elif 'disabled' in error_msg:
-            raise TranscriptDisabledError(video_id)
-        else:
+        if failure is None:
+            # 無法判定的錯誤（網路、被擋等）可能是暫時性的，不寫入負面快取
             logger.error(f"Failed to get transcript for {video_id}: {e}")
             raise TranscriptNotFoundError(video_id, preferred_language)
+        
+        if fallback_unavailable:
+            logger.info(f"Not caching failure for {video_id}: Whisper fallback was unavailable")
+        else:
+            _remember_failure(video_id, failure)
+        raise _build_failure(failure, video_id, preferred_language)
+    
+    await save_transcript(video_id, actual_language, transcript_data)
+    return transcript_data, actual_language
+
+
+async def save_transcript(
+    video_id: str,
+    language: str,
+    transcript_data: List[Dict[str, Any]],
+    is_generated: Optional[bool] = None
+) -> None:
+    """
+    將字幕寫入持久化儲存（以實際語言為鍵）
+    
+    寫入只是盡力而為，失敗（包含執行器滿載）只記錄警告，不影響已取得的字幕。
+    
+    Args:
+        is_generated: 是否為自動產生的字幕；None 表示依快取中的 info_dict 判斷
+    """
+    if get_transcript_store() is None:
+        return
+    try:
+        await run_blocking(_save_transcript, video_id, language, transcript_data, is_generated)
+    except Exception as store_error:
+        logger.warning(f"Skipped saving transcript for {video_id}: {store_error}")
+
+
+async def _transcribe_and_store(video_id: str, language: str) -> List[Dict[str, Any]]:
+    """呼叫 Whisper API 並將結果寫入本機儲存與字幕持久化儲存"""
+    transcript_data = await transcribe_video(video_id, language)
+    
+    whisper_store = get_whisper_store()
+    if whisper_store is not None:
+        try:
+            await run_blocking(whisper_store.put, video_id, language, transcript_data)
+        except Exception as store_error:
+            logger.warning(f"Failed to save Whisper result for {video_id}: {store_error}")
+    
+    await save_transcript(video_id, language, transcript_data, is_generated=True)
+    return transcript_data
+
+
+def _is_definitive_fallback_failure(error: Exception) -> bool:
+    """
+    判斷 Whisper fallback 的失敗是否為確定性的結果
+    
+    只有 Whisper API 明確拒絕（4xx，429 除外）才算確定；斷路器開啟、執行器滿載、
+    逾時、連線錯誤與 5xx 都是暫時性的。
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return 400 <= status_code < 500 and status_code not in (408, 429)
+    return False
+
+
+def classify_failure(error: Exception) -> Optional[Type[YouTubeTranscriptError]]:
+    """
+    將 yt-dlp 的失敗分類為確定性的結果
+    
+    Args:
+        error: yt-dlp 或 wrapper 拋出的例外
+        
+    Returns:
+        VideoNotFoundError、TranscriptDisabledError、TranscriptNotFoundError 之一；
+        無法判定（可能是暫時性錯誤）時回傳 None
+    """
+    if isinstance(error, (VideoNotFoundError, TranscriptDisabledError, TranscriptNotFoundError)):
+        return type(error)
+    if isinstance(error, NoSubtitlesError):
+        return TranscriptNotFoundError
+    
+    # DownloadError 會包住原始的 ExtractorError
+    cause = error
+    if isinstance(error, DownloadError) and error.exc_info and error.exc_info[1] is not None:
+        cause = error.exc_info[1]
+    if isinstance(cause, ExtractorError) and not cause.expected:
+        return None
+    
+    error_msg = str(error).lower()
+    if any(marker in error_msg for marker in _VIDEO_UNAVAILABLE_MARKERS):
+        return VideoNotFoundError
+    if 'no subtitles' in error_msg or 'no subtitle' in error_msg:
+        return TranscriptNotFoundError
+    if 'disabled' in error_msg:
+        return TranscriptDisabledError
+    return None
+
+
+def _build_failure(
+    failure: Type[YouTubeTranscriptError], video_id: str, language: str
+) -> YouTubeTranscriptError:
+    """依失敗類別建立對應的例外"""
+    if failure is TranscriptNotFoundError:
+        return TranscriptNotFoundError(video_id, language)
+    return failure(video_id)
+
+
+def _negative_ttl(failure: Type[YouTubeTranscriptError]) -> int:
+    """各失敗類別的負面快取 TTL"""
+    if failure is VideoNotFoundError:
+        return settings.negative_cache_ttl_video_not_found
+    if failure is TranscriptDisabledError:
+        return settings.negative_cache_ttl_disabled
+    return settings.negative_cache_ttl_not_found
+
+
+def _remember_failure(video_id: str, failure: Type[YouTubeTranscriptError]) -> None:
+    """寫入負面快取"""
+    get_negative_cache().set(video_id, failure, ttl=_negative_ttl(failure))
+
+
+async def _read_stored(video_id: str, language: str) -> Optional[Dict[str, Any]]:
+    """
+    查詢持久化儲存（查詢失敗只記錄警告）
+    
+    Raises:
+        ServiceOverloadedError: 執行器已滿
+    """
+    store = get_transcript_store()
+    if store is None:
+        return None
+    try:
+        return await run_blocking(store.get, video_id, language)
+    except ServiceOverloadedError:
+        raise
+    except Exception as store_error:
+        logger.warning(f"Transcript store lookup failed for {video_id}: {store_error}")
+        return None
+
+
+def _select_fallback_language(
+    info: Dict[str, Any],
+    video_id: str,
+    preferred_language: str,
+    fallback_languages: List[str]
+) -> Optional[str]:
+    """
+    影片沒有偏好語言的字幕時，回傳 yt-dlp 會改用的語言
+    
+    偏好語言存在（或影片沒有任何字幕）時回傳 None，必須向 YouTube 取得。
+    """
+    if get_transcript_store() is None:
+        return None
+    try:
+        _, language, _ = YtDlpWrapper.select_subtitle(
+            info, video_id, [preferred_language] + fallback_languages
+        )
+    except Exception:
+        return None
+    return None if language == preferred_language else language
+
+
+def _save_transcript(
+    video_id: str,
+    language: str,
+    transcript_data: List[Dict[str, Any]],
+    is_generated: Optional[bool] = None
+) -> None:
+    """將字幕寫入持久化儲存（失敗時只記錄警告）"""
+    store = get_transcript_store()
+    if store is None:
+        return
+    
+    try:
+        if is_generated is None:
+            # 只讀取快取，不為了判斷字幕類型重新 extract；
+            # 快取已過期時視為自動字幕（較短的保存期限）
+            info = get_info_cache().get(video_id) or {}
+            is_generated = language not in (info.get('subtitles') or {})
+        ttl = (
+            settings.transcript_store_ttl_generated if is_generated
+            else settings.transcript_store_ttl_manual
+        )
+        store.put(video_id, language, is_generated, transcript_data, ttl)
+    except Exception as e:
+        logger.warning(f"Failed to save transcript for {video_id}: {e}")
 
 
 def get_available_languages(video_id: str) -> List[Dict[str, Any]]:
@@ -100,20 +403,41 @@ def get_available_languages(video_id: str) -> List[Dict[str, Any]]:
     Returns:
         語言列表，每個包含 code, name, is_generated, is_translatable
     """
+    failure = get_negative_cache().get(video_id)
+    if failure in (VideoNotFoundError, TranscriptDisabledError):
+        raise failure(video_id)
+    
     wrapper = _get_wrapper()
     
     try:
         return wrapper.list_available_subtitles(video_id)
     except Exception as e:
-        error_msg = str(e).lower()
-        
-        if 'private' in error_msg or 'unavailable' in error_msg:
-            raise VideoNotFoundError(video_id)
-        elif 'disabled' in error_msg:
-            raise TranscriptDisabledError(video_id)
-        else:
-            logger.error(f"Failed to list languages for {video_id}: {e}")
-            raise
+        _raise_languages_failure(video_id, e)
+
+
+async def get_available_languages_async(video_id: str) -> List[Dict[str, Any]]:
+    """get_available_languages 的非同步版本（需要 extract 時經過上游速率調節在執行器中執行）"""
+    failure = get_negative_cache().get(video_id)
+    if failure in (VideoNotFoundError, TranscriptDisabledError):
+        raise failure(video_id)
+    
+    try:
+        info = await get_info_dict_async(_get_wrapper(), video_id)
+    except ServiceOverloadedError:
+        raise
+    except Exception as e:
+        _raise_languages_failure(video_id, e)
+    return YtDlpWrapper.languages_from_info(info)
+
+
+def _raise_languages_failure(video_id: str, error: Exception) -> None:
+    """列出語言失敗時記錄確定性的結果並拋出對應的例外"""
+    failure = classify_failure(error)
+    if failure in (VideoNotFoundError, TranscriptDisabledError):
+        _remember_failure(video_id, failure)
+        raise failure(video_id)
+    logger.error(f"Failed to list languages for {video_id}: {error}")
+    raise error
 
 
 def _to_dict(item) -> Dict[str, Any]:
@@ -142,11 +466,15 @@ def process_transcript_data(transcript_data: List[Any]) -> Tuple[List[Dict[str,
 def generate_text_output(
     transcript_data: List[Dict[str, Any]], 
     video_url: str, 
-    include_chapters: bool
+    include_chapters: bool,
+    video_info: Optional[Dict[str, Any]] = None
 ) -> Tuple[str, str, bool]:
     """
     生成文字輸出（純文字或 Markdown）
     
+    Args:
+        video_info: 已取得的標題與章節（見 get_video_info），未提供時在這裡查詢
+    
     Returns:
         full_text: 內文
         title: 影片標題 (若 include_chapters=True)
@@ -157,7 +485,8 @@ def generate_text_output(
     
     if include_chapters:
         # 獲取影片資訊（標題和章節）
-        video_info = get_video_info(video_url)
+        if video_info is None:
+            video_info = get_video_info(video_url)
         title = video_info.get('title')
         chapters = video_info.get('chapters', [])
         has_chapters = len(chapters) > 0
@@ -173,3 +502,15 @@ def generate_text_output(
         full_text = " ".join(_to_dict(item)['text'] for item in transcript_data)
         
     return full_text, title, has_chapters
+
+
+async def generate_text_output_async(
+    transcript_data: List[Dict[str, Any]], 
+    video_url: str, 
+    include_chapters: bool
+) -> Tuple[str, str, bool]:
+    """generate_text_output 的非同步版本（章節查詢經過上游速率調節在執行器中執行）"""
+    if not include_chapters:
+        return generate_text_output(transcript_data, video_url, include_chapters)
+    video_info = await get_video_info_async(video_url)
+    return generate_text_output(transcript_data, video_url, include_chapters, video_info)
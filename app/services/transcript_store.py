@@ -0,0 +1,213 @@
+"""字幕持久化儲存模組
+
+以 SQLite 儲存解析後的字幕，重新啟動或重新部署後不必重新下載。
+使用 WAL 模式，多個 worker 行程可以同時讀取。
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    is_generated INTEGER NOT NULL,
+    items TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (video_id, language, is_generated)
+);
+CREATE INDEX IF NOT EXISTS idx_transcripts_last_access ON transcripts (last_access);
+CREATE INDEX IF NOT EXISTS idx_transcripts_expires_at ON transcripts (expires_at);
+CREATE TABLE IF NOT EXISTS transcript_bytes (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO transcript_bytes (id, total)
+    SELECT 0, COALESCE(SUM(size), 0) FROM transcripts;
+CREATE TRIGGER IF NOT EXISTS transcripts_bytes_insert AFTER INSERT ON transcripts BEGIN
+    UPDATE transcript_bytes SET total = total + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS transcripts_bytes_update AFTER UPDATE OF size ON transcripts BEGIN
+    UPDATE transcript_bytes SET total = total - OLD.size + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS transcripts_bytes_delete AFTER DELETE ON transcripts BEGIN
+    UPDATE transcript_bytes SET total = total - OLD.size WHERE id = 0;
+END;
+"""
+
+# 超過容量上限時每批淘汰的項目數
+_EVICT_BATCH = 64
+
+
+class TranscriptStore:
+    """
+    SQLite 字幕儲存，支援單筆 TTL 與總容量上限淘汰
+
+    總容量由觸發器維護在 transcript_bytes，寫入時不必掃描整個資料表，
+    多個 worker 行程共用同一個檔案時也保持一致。
+    """
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        初始化字幕儲存
+
+        Args:
+            path: SQLite 檔案路徑
+            max_bytes: 字幕內容總容量上限（位元組），超過時淘汰最久未讀取的項目
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """取得目前執行緒的連線（sqlite3 連線不可跨執行緒共用）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(
+        self, video_id: str, language: str, is_generated: Optional[bool] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        讀取字幕
+
+        Args:
+            video_id: YouTube 影片 ID
+            language: 語言代碼
+            is_generated: 指定是否為自動字幕，None 時優先回傳手動字幕
+
+        Returns:
+            {"items": [...], "language": str, "is_generated": bool}，不存在或已過期時回傳 None
+        """
+        now = time.time()
+        query = (
+            "SELECT items, is_generated FROM transcripts "
+            "WHERE video_id = ? AND language = ? AND expires_at > ?"
+        )
+        params: List[Any] = [video_id, language, now]
+        if is_generated is not None:
+            query += " AND is_generated = ?"
+            params.append(int(is_generated))
+        query += " ORDER BY is_generated ASC LIMIT 1"
+
+        conn = self._connect()
+        row = conn.execute(query, params).fetchone()
+        if row is None:
+            return None
+
+        items, generated = row
+        with conn:
+            conn.execute(
+                "UPDATE transcripts SET last_access = ? "
+                "WHERE video_id = ? AND language = ? AND is_generated = ?",
+                (now, video_id, language, generated)
+            )
+
+        return {
+            "items": json.loads(items),
+            "language": language,
+            "is_generated": bool(generated),
+        }
+
+    def put(
+        self,
+        video_id: str,
+        language: str,
+        is_generated: bool,
+        items: List[Dict[str, Any]],
+        ttl: float
+    ) -> None:
+        """寫入字幕並視需要淘汰舊項目"""
+        payload = json.dumps(items, ensure_ascii=False)
+        now = time.time()
+
+        conn = self._connect()
+        with conn:
+            # 以 upsert 取代 INSERT OR REPLACE：REPLACE 刪除舊列時不會觸發 DELETE 觸發器
+            conn.execute(
+                "INSERT INTO transcripts "
+                "(video_id, language, is_generated, items, size, "
+                "created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (video_id, language, is_generated) DO UPDATE SET "
+                "items = excluded.items, size = excluded.size, created_at = excluded.created_at, "
+                "expires_at = excluded.expires_at, last_access = excluded.last_access",
+                (video_id, language, int(is_generated), payload, len(payload),
+                 now, now + ttl, now)
+            )
+        self._evict()
+
+    def _evict(self) -> None:
+        """移除過期項目，並在超過容量上限時淘汰最久未讀取的項目"""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM transcripts WHERE expires_at <= ?", (time.time(),))
+            excess = self._total_bytes(conn) - self.max_bytes
+            while excess > 0:
+                # 每次只讀取最久未讀取的一批，不掃描整個資料表
+                rows = conn.execute(
+                    "SELECT rowid, size FROM transcripts ORDER BY last_access ASC LIMIT ?",
+                    (_EVICT_BATCH,)
+                ).fetchall()
+                if not rows:
+                    break
+                evicted = []
+                for rowid, size in rows:
+                    if excess <= 0:
+                        break
+                    evicted.append((rowid,))
+                    excess -= size
+                conn.executemany("DELETE FROM transcripts WHERE rowid = ?", evicted)
+
+    @staticmethod
+    def _total_bytes(conn: sqlite3.Connection) -> int:
+        """字幕內容總位元組數"""
+        return conn.execute("SELECT total FROM transcript_bytes WHERE id = 0").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """取得儲存狀態"""
+        conn = self._connect()
+        count = conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+        return {"entries": count, "bytes": self._total_bytes(conn), "max_bytes": self.max_bytes}
+
+
+# 模組級別的預設實例
+_store: Optional[TranscriptStore] = None
+
+
+def get_transcript_store() -> Optional[TranscriptStore]:
+    """獲取預設的 TranscriptStore 實例，未啟用時回傳 None"""
+    global _store
+    if _store is None and settings.transcript_store_enabled:
+        try:
+            _store = TranscriptStore(
+                os.path.join(settings.data_dir, "transcripts.sqlite3"),
+                max_bytes=settings.transcript_store_max_bytes
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open transcript store: {e}")
+            return None
+    return _store
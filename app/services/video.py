@@ -1,12 +1,25 @@
 """YouTube 影片資訊服務
 
-使用 pytubefix 獲取 YouTube 影片的標題和章節資訊。
+提供影片 metadata（標題、頻道、長度、發布日期、縮圖、章節），後端可選 pytubefix 或 yt-dlp。
+同一支影片的所有欄位都來自同一次 extract，結果依欄位存入快取；
+若 yt-dlp 已經 extract 過同一支影片，直接使用共用快取中的 info_dict。
 """
 
 from pytubefix import YouTube
-from typing import Optional, Any, Dict
+from pytubefix.exceptions import VideoUnavailable
+from typing import Optional, Any, Callable, Dict, Iterable, List, Tuple
+import logging
 import re
 
+from ..config import settings
+from ..exceptions import VideoNotFoundError
+from .cache import get_info_cache, get_metadata_cache
+from .governor import YOUTUBE_HOST, get_governor
+from .hedging import HedgedMetadataProvider
+from .yt_dlp_wrapper import format_upload_date, get_wrapper
+
+logger = logging.getLogger(__name__)
+
 
 def _to_dict(item: Any) -> Dict[str, Any]:
     """Convert transcript item to dict (handles FetchedTranscriptSnippet objects)"""
@@ -37,6 +50,227 @@ def extract_video_id(url: str) -> str:
     raise ValueError(f"無法從 URL 中提取影片 ID: {url}")
 
 
+# 影片 metadata 欄位
+METADATA_FIELDS = (
+    'title',
+    'channel_id',
+    'channel_name',
+    'duration',
+    'publish_date',
+    'thumbnail_url',
+    'chapters',
+)
+
+
+def _info_from_ytdlp(info: Dict[str, Any]) -> dict:
+    """將 yt-dlp info_dict 轉換為 metadata 欄位"""
+    chapters = [
+        {
+            'title': chapter.get('title'),
+            'start_seconds': chapter.get('start_time', 0),
+        }
+        for chapter in info.get('chapters') or []
+    ]
+    
+    return {
+        'title': info.get('title'),
+        'channel_id': info.get('channel_id'),
+        'channel_name': info.get('channel') or info.get('uploader'),
+        'duration': info.get('duration'),
+        'publish_date': format_upload_date(info.get('upload_date')),
+        'thumbnail_url': info.get('thumbnail'),
+        'chapters': chapters,
+    }
+
+
+def _pytubefix_chapters(yt: YouTube) -> List[Dict[str, Any]]:
+    """將 pytubefix 的章節轉換為 metadata 欄位"""
+    return [
+        {'title': chapter.title, 'start_seconds': chapter.start_seconds}
+        for chapter in yt.chapters or []
+    ]
+
+
+class PytubefixMetadataBackend:
+    """
+    以 pytubefix 取得 metadata
+    
+    pytubefix 的屬性是延遲載入的：標題、頻道、長度與縮圖來自 player 回應，
+    發布日期與章節來自 watch 頁面。只讀取請求的欄位，同一個 YouTube 物件中每個來源最多抓取一次。
+    """
+    
+    name = 'pytubefix'
+    
+    # 欄位 -> 讀取方式
+    FIELD_GETTERS: Dict[str, Callable[[YouTube], Any]] = {
+        'title': lambda yt: yt.title,
+        'channel_id': lambda yt: yt.channel_id,
+        'channel_name': lambda yt: yt.author,
+        'duration': lambda yt: yt.length,
+        'publish_date': lambda yt: yt.publish_date.date().isoformat() if yt.publish_date else None,
+        'thumbnail_url': lambda yt: yt.thumbnail_url,
+        'chapters': _pytubefix_chapters,
+    }
+    
+    def fetch(self, video_id: str, fields: Iterable[str]) -> Dict[str, Any]:
+        """
+        取得指定欄位
+        
+        Raises:
+            VideoNotFoundError: 影片不存在或無法存取
+        """
+        yt = YouTube(f"https://www.youtube.com/watch?v={video_id}")
+        try:
+            # YouTube 物件的網路請求在讀取屬性時才發生
+            return {field: self.FIELD_GETTERS[field](yt) for field in fields}
+        except VideoUnavailable:
+            raise VideoNotFoundError(video_id)
+
+
+class YtDlpMetadataBackend:
+    """以 yt-dlp 取得 metadata（一次 extract 取得全部欄位，並寫入共用 info_dict 快取）"""
+    
+    name = 'ytdlp'
+    
+    def fetch(self, video_id: str, fields: Iterable[str]) -> Dict[str, Any]:
+        """
+        取得指定欄位
+        
+        Raises:
+            VideoNotFoundError: 影片不存在或無法存取
+        """
+        from .transcript import classify_failure
+        
+        try:
+            info = get_wrapper().get_video_info(video_id)
+        except Exception as e:
+            if classify_failure(e) is VideoNotFoundError:
+                raise VideoNotFoundError(video_id)
+            raise
+        metadata = _info_from_ytdlp(info)
+        return {field: metadata[field] for field in fields}
+
+
+METADATA_BACKENDS = {
+    PytubefixMetadataBackend.name: PytubefixMetadataBackend,
+    YtDlpMetadataBackend.name: YtDlpMetadataBackend,
+}
+
+
+# 模組級別的預設後端
+_backend = None
+
+
+def get_metadata_backend():
+    """獲取設定指定的 metadata 後端"""
+    global _backend
+    if _backend is None:
+        backend_class = METADATA_BACKENDS.get(settings.video_metadata_backend)
+        if backend_class is None:
+            raise ValueError(
+                f"未知的 video_metadata_backend: {settings.video_metadata_backend}，"
+                f"有效值為: {list(METADATA_BACKENDS)}"
+            )
+        _backend = backend_class()
+    return _backend
+
+
+# 模組級別的避險提供者
+_provider: Optional[HedgedMetadataProvider] = None
+
+
+def get_metadata_provider() -> HedgedMetadataProvider:
+    """獲取在所有後端之間避險的提供者（設定的後端優先）"""
+    global _provider
+    if _provider is None:
+        primary = get_metadata_backend()
+        backends = [primary] + [
+            backend_class()
+            for name, backend_class in METADATA_BACKENDS.items()
+            if name != primary.name
+        ]
+        _provider = HedgedMetadataProvider(
+            backends,
+            window_size=settings.metadata_hedge_window,
+            default_delay=settings.metadata_hedge_default_delay,
+            min_delay=settings.metadata_hedge_min_delay,
+            max_delay=settings.metadata_hedge_max_delay
+        )
+    return _provider
+
+
+def _lookup_metadata(video_id: str, fields: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    從快取取得 metadata
+
+    Returns:
+        (已知的欄位, 仍缺少的欄位)
+    """
+    cached = get_metadata_cache().get(('video', video_id)) or {}
+    missing = [field for field in fields if field not in cached]
+    if missing:
+        info = get_info_cache().get(video_id)
+        if info is not None:
+            cached = {**cached, **_info_from_ytdlp(info)}
+            missing = []
+    return cached, missing
+
+
+def _remember_metadata(
+    video_id: str, cached: Dict[str, Any], fetched: Dict[str, Any], fields: List[str]
+) -> Dict[str, Any]:
+    """合併新取得的欄位並寫入快取，回傳所需欄位"""
+    metadata = {**cached, **fetched}
+    get_metadata_cache().set(('video', video_id), metadata)
+    return {field: metadata[field] for field in fields}
+
+
+def get_video_metadata(video_id: str, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    獲取影片 metadata
+    
+    依序使用：快取中已有的欄位 -> yt-dlp 共用 info_dict 快取 -> 設定的後端（只抓取缺少的欄位）。
+    
+    Args:
+        video_id: YouTube 影片 ID
+        fields: 需要的欄位（見 METADATA_FIELDS），預設為全部
+        
+    Returns:
+        包含所需欄位的字典
+        
+    Raises:
+        VideoNotFoundError: 影片不存在或無法存取
+    """
+    fields = list(METADATA_FIELDS if fields is None else fields)
+    cached, missing = _lookup_metadata(video_id, fields)
+    fetched = get_metadata_backend().fetch(video_id, missing) if missing else {}
+    return _remember_metadata(video_id, cached, fetched, fields)
+
+
+async def get_video_metadata_async(
+    video_id: str,
+    fields: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """
+    get_video_metadata 的非同步版本
+    
+    啟用 video_metadata_hedging 時，設定的後端超過其 p95 延遲仍未回應或失敗，
+    會改用另一個後端，採用最先成功的結果。
+    """
+    fields = list(METADATA_FIELDS if fields is None else fields)
+    cached, missing = _lookup_metadata(video_id, fields)
+    if not missing:
+        return _remember_metadata(video_id, cached, {}, fields)
+    
+    if settings.video_metadata_hedging:
+        fetched = await get_metadata_provider().fetch(video_id, missing)
+    else:
+        fetched = await get_governor().run(
+            YOUTUBE_HOST, get_metadata_backend().fetch, video_id, missing
+        )
+    return _remember_metadata(video_id, cached, fetched, fields)
+
+
 def get_video_info(url: str) -> dict:
     """
     獲取影片標題和章節資訊
@@ -47,24 +281,24 @@ def get_video_info(url: str) -> dict:
     Returns:
         dict: 包含 'title' 和 'chapters' 的字典
               chapters 為章節列表，每個章節包含 'title' 和 'start_seconds'
+              無法獲取時 title 為 None、chapters 為空列表
     """
     try:
-        yt = YouTube(url)
-        
-        chapters = []
-        if yt.chapters:
-            for chapter in yt.chapters:
-                chapters.append({
-                    'title': chapter.title,
-                    'start_seconds': chapter.start_seconds,
-                })
-        
+        return get_video_metadata(extract_video_id(url), ('title', 'chapters'))
+    except Exception as e:
+        logger.warning(f"Failed to get video info for {url}: {e}")
         return {
-            'title': yt.title,
-            'chapters': chapters,
+            'title': None,
+            'chapters': [],
         }
+
+
+async def get_video_info_async(url: str) -> dict:
+    """get_video_info 的非同步版本（啟用避險時在後端之間避險）"""
+    try:
+        return await get_video_metadata_async(extract_video_id(url), ('title', 'chapters'))
     except Exception as e:
-        # 如果無法獲取影片資訊，返回空的資訊
+        logger.warning(f"Failed to get video info for {url}: {e}")
         return {
             'title': None,
             'chapters': [],
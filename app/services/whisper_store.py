@@ -0,0 +1,120 @@
+"""Whisper 轉錄結果儲存模組
+
+以內容定址（content-addressed）的方式在本機保存 Whisper 轉錄結果：
+
+- objects/<sha256 前兩碼>/<sha256>：轉錄結果 JSON，檔名即內容的 SHA-256
+- refs/<sha256(video_id:language)>：指向 object 的雜湊值
+
+讀取時會重新計算內容雜湊，損毀的檔案會被移除並視為未命中。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class WhisperStore:
+    """內容定址的 Whisper 轉錄結果儲存"""
+
+    def __init__(self, root: str):
+        """
+        初始化儲存
+
+        Args:
+            root: 儲存根目錄
+        """
+        self.root = root
+        self._objects_dir = os.path.join(root, "objects")
+        self._refs_dir = os.path.join(root, "refs")
+        os.makedirs(self._objects_dir, exist_ok=True)
+        os.makedirs(self._refs_dir, exist_ok=True)
+
+    def _ref_path(self, video_id: str, language: str) -> str:
+        """取得 (video_id, language) 對應的 ref 檔案路徑"""
+        key = hashlib.sha256(f"{video_id}:{language}".encode("utf-8")).hexdigest()
+        return os.path.join(self._refs_dir, key)
+
+    def _object_path(self, digest: str) -> str:
+        """取得內容雜湊對應的 object 檔案路徑"""
+        return os.path.join(self._objects_dir, digest[:2], digest)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        """先寫入暫存檔再以 rename 取代，避免讀到寫到一半的檔案"""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def get(self, video_id: str, language: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        讀取轉錄結果
+
+        Returns:
+            字幕列表，不存在或完整性檢查失敗時回傳 None
+        """
+        ref_path = self._ref_path(video_id, language)
+        try:
+            with open(ref_path, "r", encoding="utf-8") as f:
+                digest = f.read().strip()
+            with open(self._object_path(digest), "rb") as f:
+                data = f.read()
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if hashlib.sha256(data).hexdigest() != digest:
+            logger.warning(f"Whisper store object {digest} is corrupted, discarding")
+            for path in (self._object_path(digest), ref_path):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            return None
+
+        return json.loads(data.decode("utf-8"))
+
+    def put(self, video_id: str, language: str, items: List[Dict[str, Any]]) -> str:
+        """
+        寫入轉錄結果
+
+        Returns:
+            內容的 SHA-256 雜湊值
+        """
+        data = json.dumps(items, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            self._write_atomic(object_path, data)
+        self._write_atomic(self._ref_path(video_id, language), digest.encode("utf-8"))
+        return digest
+
+
+# 模組級別的預設實例
+_store: Optional[WhisperStore] = None
+
+
+def get_whisper_store() -> Optional[WhisperStore]:
+    """獲取預設的 WhisperStore 實例，未啟用時回傳 None"""
+    global _store
+    if _store is None and settings.whisper_store_enabled:
+        try:
+            _store = WhisperStore(os.path.join(settings.data_dir, "whisper"))
+        except OSError as e:
+            logger.error(f"Failed to open Whisper store: {e}")
+            return None
+    return _store
@@ -4,26 +4,99 @@
 yt-dlp 內建模擬瀏覽器行為，較不易被 YouTube 封鎖。
 """
 
+import json
 import yt_dlp
-from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 import logging
 
+from ..config import settings
+from .cache import get_info_cache
+from .governor import YOUTUBE_HOST, get_governor
+from .http_client import get_upstream_clients
+
+if TYPE_CHECKING:
+    from .ytdlp_pool import ExtractorPool
+
 logger = logging.getLogger(__name__)
 
+# 快取時保留的 info_dict 欄位（捨棄龐大的 formats 等欄位）
+SLIM_INFO_KEYS = (
+    'id',
+    'title',
+    'chapters',
+    'language',
+    'subtitles',
+    'automatic_captions',
+    'duration',
+    'channel',
+    'channel_id',
+    'uploader',
+    'upload_date',
+    'thumbnail',
+)
+
+
+# 記憶體取回的字幕內容無法解析時才退回下載流程；
+# 節流、HTTP 與網路錯誤直接拋出，交給上游速率調節與失敗分類處理
+_SUBTITLE_FORMAT_ERRORS = (ValueError, KeyError, TypeError, IndexError)
+# 工作行程中的例外以 WorkerError 傳回，只保留原始類別名稱
+_SUBTITLE_FORMAT_ERROR_NAMES = frozenset(
+    [error_class.__name__ for error_class in _SUBTITLE_FORMAT_ERRORS]
+    + ['JSONDecodeError', 'UnicodeDecodeError']
+)
+
+
+def _is_subtitle_format_error(error: Exception) -> bool:
+    """判斷記憶體取回字幕的失敗是否為內容格式錯誤"""
+    if isinstance(error, _SUBTITLE_FORMAT_ERRORS):
+        return True
+    return getattr(error, 'type_name', None) in _SUBTITLE_FORMAT_ERROR_NAMES
+
+
+def slim_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    """只保留服務需要的 info_dict 欄位"""
+    return {key: info.get(key) for key in SLIM_INFO_KEYS}
+
+
+def format_upload_date(upload_date: Optional[str]) -> Optional[str]:
+    """將 info_dict 的 upload_date（YYYYMMDD）轉為 ISO 日期"""
+    if not upload_date:
+        return None
+    try:
+        return datetime.strptime(upload_date, "%Y%m%d").date().isoformat()
+    except ValueError:
+        return None
+
+
+class NoSubtitlesError(ValueError):
+    """影片沒有任何可用字幕"""
+
 
 class YtDlpWrapper:
     """yt-dlp 封裝類別"""
     
-    def __init__(self, proxy: Optional[str] = None, cookies_from_browser: Optional[str] = None):
+    def __init__(
+        self,
+        proxy: Optional[str] = None,
+        cookies_from_browser: Optional[str] = None,
+        in_memory_subtitles: bool = True,
+        pool: Optional["ExtractorPool"] = None
+    ):
         """
         初始化 yt-dlp 封裝
         
         Args:
             proxy: 可選的代理伺服器 (e.g., "http://proxy:8080")
             cookies_from_browser: 可選的瀏覽器名稱 (e.g., "chrome", "firefox")
+            in_memory_subtitles: 是否直接從 info_dict 的字幕 URL 取回 json3（不經過第二次
+                extract 與暫存檔）
+            pool: 可選的工作行程池，設定時 extract、字幕下載與解析都在工作行程中執行
         """
         self.proxy = proxy
         self.cookies_from_browser = cookies_from_browser
+        self.in_memory_subtitles = in_memory_subtitles
+        self.pool = pool
     
     def _get_base_opts(self) -> dict:
         """獲取基礎 yt-dlp 選項"""
@@ -45,12 +118,28 @@ class YtDlpWrapper:
         """
         獲取影片資訊（包含可用字幕列表）
         
+        結果會以精簡後的形式存入共用快取，語言列表、字幕與章節查詢都共用同一次 extract。
+        
         Args:
             video_id: YouTube 影片 ID
             
         Returns:
-            yt-dlp 的 info_dict
+            精簡後的 yt-dlp info_dict（見 SLIM_INFO_KEYS）
         """
+        cache = get_info_cache()
+        info = cache.get(video_id)
+        if info is not None:
+            return info
+        
+        if self.pool is not None:
+            info = self.pool.extract_info(video_id)
+        else:
+            info = slim_info(self._extract_info(video_id))
+        cache.set(video_id, info)
+        return info
+    
+    def _extract_info(self, video_id: str) -> Dict[str, Any]:
+        """執行 yt-dlp extract_info，回傳完整 info_dict"""
         url = f"https://www.youtube.com/watch?v={video_id}"
         
         opts = self._get_base_opts()
@@ -59,8 +148,7 @@ class YtDlpWrapper:
         })
         
         with yt_dlp.YoutubeDL(opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            return info
+            return ydl.extract_info(url, download=False)
     
     def list_available_subtitles(self, video_id: str) -> List[Dict[str, Any]]:
         """
@@ -72,12 +160,15 @@ class YtDlpWrapper:
         Returns:
             語言列表，每個包含 code, name, is_generated, is_translatable
         """
-        info = self.get_video_info(video_id)
-        
+        return self.languages_from_info(self.get_video_info(video_id))
+    
+    @staticmethod
+    def languages_from_info(info: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """從 info_dict 整理可用的字幕語言（格式同 list_available_subtitles）"""
         languages = []
         
         # 手動上傳的字幕
-        subtitles = info.get('subtitles', {})
+        subtitles = info.get('subtitles') or {}
         for lang_code, sub_list in subtitles.items():
             languages.append({
                 'code': lang_code,
@@ -87,7 +178,7 @@ class YtDlpWrapper:
             })
         
         # 自動產生的字幕
-        automatic_captions = info.get('automatic_captions', {})
+        automatic_captions = info.get('automatic_captions') or {}
         for lang_code, sub_list in automatic_captions.items():
             # 避免重複
             if not any(l['code'] == lang_code for l in languages):
@@ -119,12 +210,46 @@ class YtDlpWrapper:
             字幕列表格式: [{"text": str, "start": float, "duration": float}, ...]
         """
         info = self.get_video_info(video_id)
+        selected_sub, selected_lang, is_auto = self.select_subtitle(
+            info, video_id, [preferred_language] + fallback_languages
+        )
         
-        languages_to_try = [preferred_language] + fallback_languages
+        # 優先使用 info_dict 中的 json3 URL 直接在記憶體中取回字幕
+        transcript_items = None
+        if self.in_memory_subtitles:
+            track_url = self._find_json3_url(selected_sub)
+            if track_url:
+                try:
+                    transcript_items = self._fetch_subtitle(track_url)
+                except Exception as e:
+                    if not _is_subtitle_format_error(e):
+                        raise
+                    logger.warning(f"In-memory subtitle parse failed for {video_id}: {e}")
+        
+        # 退回原本的下載流程
+        if transcript_items is None:
+            transcript_items = self._download_subtitle(video_id, selected_lang, is_auto)
+        
+        return transcript_items, selected_lang
+    
+    @staticmethod
+    def select_subtitle(
+        info: Dict[str, Any],
+        video_id: str,
+        languages_to_try: List[str]
+    ) -> Tuple[List[Dict[str, Any]], str, bool]:
+        """
+        依語言順序選擇字幕軌，都沒有時使用第一個可用的（手動字幕優先）
         
+        Returns:
+            (字幕格式列表, 語言代碼, 是否為自動字幕)
+            
+        Raises:
+            NoSubtitlesError: 影片沒有任何字幕
+        """
         # 先嘗試手動上傳的字幕
-        subtitles = info.get('subtitles', {})
-        automatic_captions = info.get('automatic_captions', {})
+        subtitles = info.get('subtitles') or {}
+        automatic_captions = info.get('automatic_captions') or {}
         
         # 找到匹配的字幕
         selected_sub = None
@@ -152,12 +277,44 @@ class YtDlpWrapper:
                 selected_sub = automatic_captions[selected_lang]
                 is_auto = True
             else:
-                raise ValueError(f"No subtitles available for video {video_id}")
+                raise NoSubtitlesError(f"No subtitles available for video {video_id}")
         
-        # 下載字幕內容
-        transcript_items = self._download_subtitle(video_id, selected_lang, is_auto)
+        return selected_sub, selected_lang, is_auto
+    
+    @staticmethod
+    def _find_json3_url(sub_list: List[Dict[str, Any]]) -> Optional[str]:
+        """從字幕格式列表中找出 json3 格式的 URL"""
+        for sub_format in sub_list or []:
+            if sub_format.get('ext') == 'json3' and sub_format.get('url'):
+                return sub_format['url']
+        return None
+    
+    def _fetch_subtitle(self, track_url: str) -> List[Dict[str, Any]]:
+        """
+        直接取回 json3 字幕並在記憶體中解析
         
-        return transcript_items, selected_lang
+        Args:
+            track_url: info_dict 中的 json3 字幕 URL
+            
+        Returns:
+            字幕列表 [{"text": str, "start": float, "duration": float}, ...]
+        """
+        clients = get_upstream_clients()
+        if clients.bound and not (self.proxy or self.cookies_from_browser):
+            # 與其他上游呼叫共用 keep-alive 連線池，不必每次重新進行 TCP/TLS 交握
+            response = clients.request_sync("GET", track_url)
+            response.raise_for_status()
+            return self._parse_json3(response.json())
+        
+        if self.pool is not None:
+            return self.pool.fetch_subtitle(track_url)
+        
+        # 需要 proxy 或 cookies（或不在服務中執行）時透過 YoutubeDL 的網路層取回
+        with yt_dlp.YoutubeDL(self._get_base_opts()) as ydl:
+            response = ydl.urlopen(track_url)
+            json3_data = json.loads(response.read().decode('utf-8'))
+        
+        return self._parse_json3(json3_data)
     
     def _download_subtitle(
         self, 
@@ -176,9 +333,11 @@ class YtDlpWrapper:
         Returns:
             字幕列表 [{"text": str, "start": float, "duration": float}, ...]
         """
+        if self.pool is not None:
+            return self.pool.download_subtitle(video_id, lang_code, is_auto)
+        
         import tempfile
         import os
-        import json
         
         url = f"https://www.youtube.com/watch?v={video_id}"
         
@@ -251,6 +410,22 @@ class YtDlpWrapper:
         return items
 
 
+async def get_info_dict_async(wrapper: YtDlpWrapper, video_id: str) -> Dict[str, Any]:
+    """
+    wrapper.get_video_info 的非同步版本
+
+    快取命中時直接回傳；需要 extract 時先在 event loop 中取得上游速率調節的 token，
+    再於執行器中執行。
+
+    Raises:
+        ServiceOverloadedError: 上游速率調節需要等待過久，或執行器已滿
+    """
+    info = get_info_cache().get(video_id)
+    if info is not None:
+        return info
+    return await get_governor().run(YOUTUBE_HOST, wrapper.get_video_info, video_id)
+
+
 # 模組級別的預設實例
 _default_wrapper: Optional[YtDlpWrapper] = None
 
@@ -259,5 +434,22 @@ def get_wrapper() -> YtDlpWrapper:
     """獲取預設的 YtDlpWrapper 實例"""
     global _default_wrapper
     if _default_wrapper is None:
-        _default_wrapper = YtDlpWrapper()
+        pool = None
+        if settings.ytdlp_backend == "process":
+            from .ytdlp_pool import ExtractorPool
+            pool = ExtractorPool(
+                processes=settings.ytdlp_process_workers,
+                max_tasks_per_child=settings.ytdlp_process_max_tasks,
+                timeout=settings.ytdlp_process_timeout
+            )
+        _default_wrapper = YtDlpWrapper(
+            in_memory_subtitles=settings.subtitle_in_memory,
+            pool=pool
+        )
     return _default_wrapper
+
+
+def shutdown_wrapper() -> None:
+    """關閉預設實例的工作行程池（若有）"""
+    if _default_wrapper is not None and _default_wrapper.pool is not None:
+        _default_wrapper.pool.close()
@@ -0,0 +1,295 @@
+"""yt-dlp 多行程執行模組
+
+yt-dlp 的 extract 大量時間花在純 Python 的 JSON 與正則處理上，受 GIL 限制。
+此模組提供常駐的工作行程池，讓 YtDlpWrapper 可以把 extract、字幕下載與解析
+分散到多個 CPU 核心上執行。
+
+- 每個工作行程在初始化時建立一個常駐的 YoutubeDL 實例（warm instance）
+- 工作行程執行 N 個工作後自動回收，避免記憶體持續成長
+- 單一工作逾時會終止並重建整個行程池，卡住的 extractor 不會拖垮 API 行程；
+  只有逾時的工作失敗，同一個行程池上其他尚未完成的工作會重新送到新的行程池
+- 工作行程中的例外以 WorkerError 傳回，在 API 行程中還原為原本的 yt-dlp 例外類別
+  （保留 expected 旗標），失敗分類與負面快取不受影響
+"""
+
+import json
+import logging
+import multiprocessing
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import yt_dlp
+from yt_dlp.utils import DownloadError, ExtractorError, YoutubeDLError
+
+logger = logging.getLogger(__name__)
+
+
+# ---- 工作行程端 ----
+
+_worker_wrapper = None
+_worker_ydl: Optional[yt_dlp.YoutubeDL] = None
+
+
+def _init_worker(proxy: Optional[str], cookies_from_browser: Optional[str]) -> None:
+    """工作行程初始化：建立常駐的 YtDlpWrapper 與 YoutubeDL 實例"""
+    global _worker_wrapper, _worker_ydl
+    from .yt_dlp_wrapper import YtDlpWrapper
+
+    _worker_wrapper = YtDlpWrapper(proxy=proxy, cookies_from_browser=cookies_from_browser)
+    opts = _worker_wrapper._get_base_opts()
+    opts['skip_download'] = True
+    _worker_ydl = yt_dlp.YoutubeDL(opts)
+
+
+class WorkerError(Exception):
+    """
+    工作行程中的例外（可 pickle）
+
+    yt-dlp 例外帶有 traceback 與 exc_info，無法傳回 API 行程；這裡只保留類別名稱、
+    原始訊息、ExtractorError 的 expected 旗標與 DownloadError 包住的原因，
+    在 API 行程中以 rebuild 還原。
+    """
+
+    def __init__(
+        self,
+        type_name: str,
+        message: str,
+        expected: bool = False,
+        cause: Optional["WorkerError"] = None
+    ):
+        super().__init__(type_name, message, expected, cause)
+        self.type_name = type_name
+        self.message = message
+        self.expected = expected
+        self.cause = cause
+
+    def __str__(self) -> str:
+        return f"{self.type_name}: {self.message}"
+
+    @classmethod
+    def capture(cls, error: BaseException) -> "WorkerError":
+        """從工作行程中的例外建立"""
+        cause = None
+        if isinstance(error, DownloadError) and error.exc_info and error.exc_info[1] is not None:
+            if error.exc_info[1] is not error:
+                cause = cls.capture(error.exc_info[1])
+        message = error.orig_msg if isinstance(error, ExtractorError) else str(error)
+        return cls(type(error).__name__, message, bool(getattr(error, "expected", False)), cause)
+
+    def rebuild(self) -> Exception:
+        """
+        還原為原本的例外
+
+        yt-dlp 的 ExtractorError 與 DownloadError（含子類別）還原為相同類別，
+        其他例外保留為 WorkerError（訊息包含原始類別名稱）。
+        """
+        error_class = getattr(yt_dlp.utils, self.type_name, None)
+        if not (isinstance(error_class, type) and issubclass(error_class, YoutubeDLError)):
+            return self
+        if issubclass(error_class, ExtractorError):
+            # 子類別的建構參數各不相同，以 ExtractorError 的建構方式還原
+            error = error_class.__new__(error_class)
+            ExtractorError.__init__(error, self.message, expected=self.expected)
+            return error
+        if issubclass(error_class, DownloadError):
+            cause = self.cause.rebuild() if self.cause is not None else None
+            exc_info = (type(cause), cause, None) if cause is not None else None
+            return error_class(self.message, exc_info=exc_info)
+        return self
+
+
+def _run_in_worker(func: Callable[..., Any], *args) -> Any:
+    """執行工作並將例外轉為可 pickle 的 WorkerError（yt-dlp 例外帶有 traceback）"""
+    try:
+        return func(*args)
+    except Exception as e:
+        raise WorkerError.capture(e) from None
+
+
+def _extract_info_job(video_id: str) -> Dict[str, Any]:
+    """在工作行程中 extract 並回傳精簡後的 info_dict（減少行程間傳輸量）"""
+    from .yt_dlp_wrapper import slim_info
+
+    def extract():
+        url = f"https://www.youtube.com/watch?v={video_id}"
+        return slim_info(_worker_ydl.extract_info(url, download=False))
+
+    return _run_in_worker(extract)
+
+
+def _fetch_subtitle_job(track_url: str) -> List[Dict[str, Any]]:
+    """在工作行程中取回並解析 json3 字幕"""
+    def fetch():
+        response = _worker_ydl.urlopen(track_url)
+        json3_data = json.loads(response.read().decode('utf-8'))
+        return _worker_wrapper._parse_json3(json3_data)
+
+    return _run_in_worker(fetch)
+
+
+def _download_subtitle_job(video_id: str, lang_code: str, is_auto: bool) -> List[Dict[str, Any]]:
+    """在工作行程中以下載流程取得並解析字幕"""
+    return _run_in_worker(_worker_wrapper._download_subtitle, video_id, lang_code, is_auto)
+
+
+# ---- API 行程端 ----
+
+class _PendingJob:
+    """等待中的工作：完成或行程池被終止時喚醒等待的執行緒"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.done = threading.Event()
+        # 行程池因其他工作逾時而重建，需要重新送出
+        self.restarted = False
+        # 行程池已關閉
+        self.aborted = False
+
+    def wake(self, _=None) -> None:
+        self.done.set()
+
+
+class ExtractorPool:
+    """yt-dlp 工作行程池"""
+
+    def __init__(
+        self,
+        processes: int = 4,
+        max_tasks_per_child: Optional[int] = 100,
+        timeout: float = 120.0,
+        proxy: Optional[str] = None,
+        cookies_from_browser: Optional[str] = None
+    ):
+        """
+        初始化工作行程池（行程在第一次使用時才啟動）
+
+        Args:
+            processes: 工作行程數
+            max_tasks_per_child: 每個工作行程執行多少個工作後回收，None 表示不回收
+            timeout: 單一工作的逾時秒數，逾時後重建行程池
+            proxy: 傳給工作行程的代理伺服器設定
+            cookies_from_browser: 傳給工作行程的瀏覽器 cookies 設定
+        """
+        self.processes = processes
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self._initargs = (proxy, cookies_from_browser)
+        # 使用 spawn，避免在多執行緒的 API 行程中 fork
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pending: Set[_PendingJob] = set()
+        self._jobs = 0
+        self._timeouts = 0
+        self._restarts = 0
+
+    def _get_pool(self):
+        """取得（必要時建立）行程池"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._context.Pool(
+                    processes=self.processes,
+                    initializer=_init_worker,
+                    initargs=self._initargs,
+                    maxtasksperchild=self.max_tasks_per_child
+                )
+            return self._pool
+
+    def _interrupt_pending(self, pool, aborted: bool) -> None:
+        """喚醒行程池上尚未完成的工作（需持有 self._lock）"""
+        for job in self._pending:
+            if job.pool is pool and not job.done.is_set():
+                job.restarted = True
+                job.aborted = aborted
+                job.done.set()
+
+    def _restart(self, pool) -> None:
+        """終止卡住的行程池，下一次呼叫時重建；其他尚未完成的工作會重新送出"""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+            self._restarts += 1
+            self._interrupt_pending(pool, aborted=False)
+        logger.warning("Terminating yt-dlp worker pool")
+        pool.terminate()
+
+    def call(self, func: Callable[..., Any], *args) -> Any:
+        """
+        在工作行程中執行函數並等待結果
+
+        行程池因其他工作逾時而重建時，這個工作會重新送到新的行程池。
+
+        Raises:
+            TimeoutError: 工作逾時（行程池會被重建），或行程池已關閉
+            工作本身的例外（yt-dlp 例外會還原為原本的類別）
+        """
+        with self._lock:
+            self._jobs += 1
+        while True:
+            pool = self._get_pool()
+            job = _PendingJob(pool)
+            with self._lock:
+                self._pending.add(job)
+            try:
+                try:
+                    result = pool.apply_async(
+                        func, args, callback=job.wake, error_callback=job.wake
+                    )
+                except ValueError:
+                    # 取得行程池後它已被其他執行緒終止（Pool not running），改送到新的行程池
+                    continue
+                if not job.done.wait(self.timeout):
+                    with self._lock:
+                        self._timeouts += 1
+                    self._restart(pool)
+                    raise TimeoutError(f"yt-dlp worker timed out after {self.timeout}s")
+                if job.aborted:
+                    raise TimeoutError("yt-dlp worker pool was closed while the job was running")
+                if job.restarted:
+                    logger.info("Resubmitting yt-dlp job to the restarted worker pool")
+                    continue
+                try:
+                    # callback 在結果寫入後才被呼叫，這裡只會等待極短時間
+                    return result.get(timeout=self.timeout)
+                except WorkerError as e:
+                    raise e.rebuild() from None
+            finally:
+                with self._lock:
+                    self._pending.discard(job)
+
+    def extract_info(self, video_id: str) -> Dict[str, Any]:
+        """在工作行程中 extract 影片資訊"""
+        return self.call(_extract_info_job, video_id)
+
+    def fetch_subtitle(self, track_url: str) -> List[Dict[str, Any]]:
+        """在工作行程中取回並解析 json3 字幕"""
+        return self.call(_fetch_subtitle_job, track_url)
+
+    def download_subtitle(
+        self,
+        video_id: str,
+        lang_code: str,
+        is_auto: bool
+    ) -> List[Dict[str, Any]]:
+        """在工作行程中下載並解析字幕"""
+        return self.call(_download_subtitle_job, video_id, lang_code, is_auto)
+
+    def stats(self) -> Dict[str, Any]:
+        """取得行程池狀態"""
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "started": self._pool is not None,
+                "jobs": self._jobs,
+                "timeouts": self._timeouts,
+                "restarts": self._restarts,
+            }
+
+    def close(self) -> None:
+        """終止所有工作行程"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._interrupt_pending(pool, aborted=True)
+        if pool is not None:
+            pool.terminate()
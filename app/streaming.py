@@ -0,0 +1,56 @@
+"""
+串流回應模組
+提供 NDJSON（每行一個 JSON 物件）串流回應
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Union
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def _encode_lines(items: AsyncIterator[Union[BaseModel, dict]]) -> AsyncIterator[str]:
+    """
+    將每個項目編碼為一行 JSON
+    
+    回應標頭送出後無法再改變 HTTP 狀態碼，串流途中發生錯誤時
+    改以最後一行 {"success": false, "error": ...} 告知用戶端結果不完整。
+    """
+    try:
+        async for item in items:
+            if isinstance(item, BaseModel):
+                yield item.model_dump_json() + "\n"
+            else:
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+    except Exception as e:
+        logger.error(f"NDJSON stream aborted: {e}")
+        error = {
+            "success": False,
+            "error": getattr(e, "detail", None) or str(e) or type(e).__name__,
+            "error_type": type(e).__name__,
+        }
+        yield json.dumps(error, ensure_ascii=False) + "\n"
+
+
+def ndjson_response(
+    items: AsyncIterator[Union[BaseModel, dict]], **kwargs: Any
+) -> StreamingResponse:
+    """
+    建立 NDJSON 串流回應，每產生一個項目就立即送出
+    
+    Args:
+        items: Pydantic 模型或字典的非同步迭代器
+    """
+    return StreamingResponse(
+        _encode_lines(items),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"X-Accel-Buffering": "no"},
+        **kwargs
+    )
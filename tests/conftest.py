@@ -0,0 +1,9 @@
+"""
+測試共用設定
+"""
+
+import os
+import tempfile
+
+# 持久化儲存寫入暫存目錄，避免測試之間互相影響或污染專案目錄
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="yt-transcript-test-"))
@@ -0,0 +1,126 @@
+"""
+影片組合資訊 API 測試
+"""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.cache import get_info_cache, get_negative_cache
+from app.services.yt_dlp_wrapper import YtDlpWrapper
+
+client = TestClient(app)
+
+VIDEO_ID = "bundle00001"
+
+INFO = {
+    "id": VIDEO_ID,
+    "title": "Bundle video",
+    "channel": "Example",
+    "channel_id": "UCexample",
+    "duration": 125,
+    "upload_date": "20240115",
+    "thumbnail": "https://i.ytimg.com/vi/bundle00001/maxresdefault.jpg",
+    "chapters": [
+        {"title": "Intro", "start_time": 0.0},
+        {"title": "Main", "start_time": 60.0},
+    ],
+    "subtitles": {"en": [{"ext": "json3", "url": "https://example/en.json3"}]},
+    "automatic_captions": {"ja": [{"ext": "json3", "url": "https://example/ja.json3"}]},
+}
+
+TRANSCRIPT = [{"text": "hello", "start": 0.0, "duration": 2.0}]
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    for cache in (get_info_cache(), get_negative_cache()):
+        cache.delete(VIDEO_ID)
+    # 持久化儲存會讓前一個測試取得的字幕在之後的測試命中
+    with patch("app.services.transcript.get_transcript_store", return_value=None):
+        yield
+    for cache in (get_info_cache(), get_negative_cache()):
+        cache.delete(VIDEO_ID)
+
+
+def test_bundle_uses_single_extraction():
+    """測試 metadata、語言、章節與字幕只做一次 extract"""
+    with patch.object(YtDlpWrapper, "_extract_info", return_value=INFO) as mock_extract, \
+         patch.object(YtDlpWrapper, "_fetch_subtitle", return_value=TRANSCRIPT):
+        response = client.get(f"/api/v1/video/{VIDEO_ID}/bundle?language=en")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert mock_extract.call_count == 1
+    assert data["parts"] == ["metadata", "languages", "chapters", "transcript"]
+    assert data["title"] == "Bundle video"
+    assert data["channel_name"] == "Example"
+    assert data["publish_date"] == "2024-01-15"
+    assert [chapter["title"] for chapter in data["chapters"]] == ["Intro", "Main"]
+    languages = {(item["code"], item["is_generated"]) for item in data["languages"]}
+    assert languages == {("en", False), ("ja", True)}
+    assert data["language"] == "en"
+    assert data["transcript"] == TRANSCRIPT
+    assert data["transcript_error"] is None
+
+
+def test_bundle_parts_selection_and_missing_transcript():
+    """測試只組合指定部分，沒有字幕時其他部分照常回傳"""
+    info = dict(INFO, subtitles={}, automatic_captions={})
+    with patch.object(YtDlpWrapper, "_extract_info", return_value=info), \
+         patch("app.config.settings.transcribe_api_url", None):
+        response = client.get(f"/api/v1/video/{VIDEO_ID}/bundle?parts=chapters,transcript")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["parts"] == ["chapters", "transcript"]
+    assert data["title"] is None
+    assert data["languages"] is None
+    assert len(data["chapters"]) == 2
+    assert data["transcript"] is None
+    assert data["transcript_error"]
+
+
+def test_bundle_invalid_parts():
+    """測試無效的 parts 回傳 400"""
+    response = client.get(f"/api/v1/video/{VIDEO_ID}/bundle?parts=comments")
+    assert response.status_code == 400
+
+
+def test_bundle_defers_whisper_and_reports_transcript_failures():
+    """測試需要 Whisper 時回傳工作 ID，服務忙碌時以 transcript_error 回報而不是整體失敗"""
+    from types import SimpleNamespace
+
+    from app.exceptions import ServiceOverloadedError
+    from app.services.transcribe_jobs import TranscriptionDeferred
+
+    calls = []
+
+    async def deferred(video_id, language, fallback_languages, defer_fallback=False):
+        calls.append(defer_fallback)
+        raise TranscriptionDeferred(SimpleNamespace(id="job123"))
+
+    with patch.object(YtDlpWrapper, "_extract_info", return_value=INFO), \
+         patch("app.services.bundle.get_transcript_with_fallback", side_effect=deferred):
+        response = client.get(f"/api/v1/video/{VIDEO_ID}/bundle?parts=metadata,transcript")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert calls == [True]
+    assert data["title"] == "Bundle video"
+    assert data["transcript"] is None
+    assert data["transcript_job_id"] == "job123"
+    assert data["transcript_error"]
+
+    with patch.object(YtDlpWrapper, "_extract_info", return_value=INFO), \
+         patch("app.services.bundle.get_transcript_with_fallback",
+               side_effect=ServiceOverloadedError()):
+        response = client.get(f"/api/v1/video/{VIDEO_ID}/bundle?parts=chapters,transcript")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["chapters"]) == 2
+    assert data["transcript_error"] == ServiceOverloadedError().message
+    assert data["transcript_job_id"] is None
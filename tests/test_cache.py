@@ -0,0 +1,33 @@
+"""
+TTLCache 單元測試
+"""
+
+from unittest.mock import patch
+
+from app.services.cache import TTLCache
+
+
+def test_lru_eviction():
+    """測試超過容量時淘汰最久未使用的項目"""
+    cache = TTLCache(max_entries=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # a 變為最近使用
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_ttl_expiry():
+    """測試項目過期後回傳 None，且支援單一項目 TTL"""
+    cache = TTLCache(max_entries=10, ttl=60)
+
+    with patch('app.services.cache.time.monotonic', return_value=1000.0):
+        cache.set('short', 'x', ttl=5)
+        cache.set('long', 'y')
+
+    with patch('app.services.cache.time.monotonic', return_value=1010.0):
+        assert cache.get('short') is None
+        assert cache.get('long') == 'y'
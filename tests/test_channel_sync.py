@@ -0,0 +1,100 @@
+"""
+頻道增量同步單元測試
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.services import channel_sync
+from app.services.channel_sync import WatermarkStore
+
+
+class FakePager:
+    """依序產生影片並記錄走訪了幾筆"""
+
+    def __init__(self, video_ids, start=0):
+        self.video_ids = video_ids
+        self.position = start
+        self.consumed = 0
+
+    async def __aiter__(self):
+        while self.position < len(self.video_ids):
+            video_id = self.video_ids[self.position]
+            self.position += 1
+            self.consumed += 1
+            yield {"videoId": video_id, "title": {"runs": [{"text": video_id}]}}
+
+    def next_cursor(self):
+        return str(self.position) if self.position < len(self.video_ids) else None
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = WatermarkStore(str(tmp_path / "sync.sqlite3"), recent_ids=3)
+    with patch.object(channel_sync, "get_watermark_store", return_value=store):
+        yield store
+
+
+async def _sync(video_ids, limit=2):
+    pager = FakePager(video_ids)
+    with patch.object(channel_sync, "open_channel_pager", return_value=pager):
+        result = await channel_sync.sync_channel("UC1", "videos", limit)
+    return result, pager
+
+
+@pytest.mark.asyncio
+async def test_sync_returns_only_delta_and_stops_at_watermark(store):
+    """測試第一次同步取最新 limit 支，之後只回傳新增影片並在已知影片處停止"""
+    result, _ = await _sync(["v3", "v2", "v1"])
+    assert result["initial"] is True
+    assert [v["video_id"] for v in result["videos"]] == ["v3", "v2"]
+
+    result, pager = await _sync(["v5", "v4", "v3", "v2", "v1"])
+    assert result["initial"] is False
+    assert [v["video_id"] for v in result["videos"]] == ["v5", "v4"]
+    assert pager.consumed == 3
+    assert result["watermark"]["latest_video_id"] == "v5"
+
+    result, pager = await _sync(["v5", "v4", "v3"])
+    assert result["videos"] == []
+    assert pager.consumed == 1
+
+
+@pytest.mark.asyncio
+async def test_sync_survives_deleted_latest_video(store):
+    """測試最新影片被刪除後，仍能以較舊的已知影片作為停止點"""
+    await _sync(["v3", "v2", "v1"], limit=3)
+
+    result, pager = await _sync(["v4", "v2", "v1"])
+    assert [v["video_id"] for v in result["videos"]] == ["v4"]
+    assert pager.consumed == 2
+    assert store.get("UC1", "videos")["recent_ids"] == ["v4", "v3", "v2"]
+
+
+@pytest.mark.asyncio
+async def test_truncated_sync_keeps_watermark_until_gap_is_filled(store):
+    """測試新增影片超過上限時保留舊水位線，之後的同步從停止處繼續補齊"""
+    await _sync(["v3", "v2", "v1"])
+    channel = ["v8", "v7", "v6", "v5", "v4", "v3", "v2", "v1"]
+    opened = []
+
+    async def sync():
+        def open_pager(channel_id, content_type, cursor=None, wanted=None):
+            opened.append(cursor)
+            return FakePager(channel, int(cursor or 0))
+
+        with patch.object(channel_sync, "open_channel_pager", open_pager):
+            result = await channel_sync.sync_channel("UC1", "videos", 2)
+        return [v["video_id"] for v in result["videos"]], result["truncated"]
+
+    with patch.object(channel_sync.settings, "channel_sync_max_items", 2):
+        assert await sync() == (["v8", "v7"], True)
+        assert store.get("UC1", "videos")["recent_ids"] == ["v3", "v2"]
+        assert await sync() == (["v6", "v5"], True)
+        assert await sync() == (["v4"], False)
+        assert store.get("UC1", "videos")["recent_ids"] == ["v8", "v7", "v3"]
+        channel.insert(0, "v9")
+        assert await sync() == (["v9"], False)
+
+    assert opened == [None, "2", "4", None]
@@ -0,0 +1,124 @@
+"""
+斷路器單元測試
+"""
+
+import pytest
+from unittest.mock import patch
+
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+async def _fail():
+    raise RuntimeError("backend down")
+
+
+async def _ok():
+    return "ok"
+
+
+@pytest.mark.asyncio
+async def test_opens_after_failure_rate_and_recovers():
+    """測試錯誤率超過門檻後開啟、快速失敗，並經 half_open 探測後恢復"""
+    breaker = CircuitBreaker("test", window_size=4, min_calls=4, open_seconds=30)
+
+    with patch('app.services.circuit_breaker.time.monotonic', return_value=100.0):
+        for _ in range(4):
+            with pytest.raises(RuntimeError):
+                await breaker.call(_fail)
+        assert breaker.state == "open"
+
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(_ok)
+
+    with patch('app.services.circuit_breaker.time.monotonic', return_value=131.0):
+        assert breaker.state == "half_open"
+        assert await breaker.call(_ok) == "ok"
+        assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens():
+    """測試 half_open 探測失敗會再次開啟"""
+    breaker = CircuitBreaker("test", window_size=2, min_calls=2, open_seconds=10)
+
+    with patch('app.services.circuit_breaker.time.monotonic', return_value=0.0):
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await breaker.call(_fail)
+
+    with patch('app.services.circuit_breaker.time.monotonic', return_value=11.0):
+        with pytest.raises(RuntimeError):
+            await breaker.call(_fail)
+        assert breaker.state == "open"
+        assert breaker.status()["rejected"] == 0
+
+
+@pytest.mark.asyncio
+async def test_only_upstream_failures_are_counted():
+    """測試 Whisper 的 4xx 不計入失敗，5xx、逾時與連線錯誤才會開啟斷路器"""
+    import httpx
+
+    from app.services.transcribe_client import is_upstream_failure
+
+    breaker = CircuitBreaker("test", window_size=2, min_calls=2, is_failure=is_upstream_failure)
+    request = httpx.Request("POST", "http://whisper/api/v1/transcribe-youtube")
+
+    async def reject():
+        raise httpx.HTTPStatusError(
+            "Unprocessable", request=request, response=httpx.Response(422, request=request)
+        )
+
+    async def unavailable():
+        raise httpx.HTTPStatusError(
+            "Unavailable", request=request, response=httpx.Response(503, request=request)
+        )
+
+    async def timeout():
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    for _ in range(5):
+        with pytest.raises(httpx.HTTPStatusError):
+            await breaker.call(reject)
+    assert breaker.state == "closed"
+    assert breaker.status()["window_calls"] == 0
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await breaker.call(unavailable)
+    with pytest.raises(httpx.ReadTimeout):
+        await breaker.call(timeout)
+    assert breaker.state == "open"
+
+
+def test_transcribe_breaker_slow_threshold_follows_timeout():
+    """測試未設定慢呼叫秒數時以轉錄逾時的一半為準"""
+    from app.services import transcribe_client
+
+    with patch.object(transcribe_client, "_breaker", None), \
+         patch.object(transcribe_client.settings, "transcribe_breaker_slow_seconds", None), \
+         patch.object(transcribe_client.settings, "transcribe_timeout", 600.0):
+        assert transcribe_client.get_transcribe_breaker().slow_call_seconds == 300.0
+
+
+@pytest.mark.asyncio
+async def test_sustained_slow_successful_calls_open_transcribe_breaker():
+    """測試持續成功但緩慢（仍在逾時內）的轉錄會開啟斷路器"""
+    from app.services import transcribe_client
+
+    clock = [0.0]
+
+    async def slow_ok():
+        clock[0] += 200.0
+        return "ok"
+
+    with patch.object(transcribe_client, "_breaker", None), \
+         patch.object(transcribe_client.settings, "transcribe_breaker_slow_seconds", None), \
+         patch.object(transcribe_client.settings, "transcribe_timeout", 300.0), \
+         patch.object(transcribe_client.settings, "transcribe_breaker_min_calls", 5), \
+         patch('app.services.circuit_breaker.time.monotonic', side_effect=lambda: clock[0]):
+        breaker = transcribe_client.get_transcribe_breaker()
+        for _ in range(5):
+            assert await breaker.call(slow_ok) == "ok"
+
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(slow_ok)
@@ -0,0 +1,137 @@
+"""
+列表項目補充資訊測試
+"""
+
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import enrich
+from app.services.cache import get_info_cache
+
+client = TestClient(app)
+
+
+def _info(video_id, upload_date="20240115", chapters=2):
+    return {
+        "id": video_id,
+        "upload_date": upload_date,
+        "subtitles": {"en": [], "zh-Hant": []},
+        "automatic_captions": {},
+        "chapters": [{"title": f"c{i}", "start_time": i} for i in range(chapters)],
+    }
+
+
+class FakeWrapper:
+    """記錄呼叫並可讓指定影片卡住的假 wrapper"""
+
+    def __init__(self, slow=()):
+        self.calls = []
+        self.slow = set(slow)
+        self.release = threading.Event()
+
+    def get_video_info(self, video_id):
+        self.calls.append(video_id)
+        if video_id in self.slow:
+            self.release.wait(5)
+        if video_id == "broken":
+            raise RuntimeError("extract failed")
+        return _info(video_id)
+
+
+@pytest.fixture(autouse=True)
+def clear_info_cache():
+    get_info_cache().clear()
+    yield
+    get_info_cache().clear()
+
+
+def test_parse_enrich_fields():
+    """測試解析與驗證 enrich 欄位"""
+    assert enrich.parse_enrich_fields(None) == []
+    fields = enrich.parse_enrich_fields("captions, publish_date,captions")
+    assert fields == ["captions", "publish_date"]
+    with pytest.raises(ValueError):
+        enrich.parse_enrich_fields("likes")
+
+
+@pytest.mark.asyncio
+async def test_enrich_uses_cache_and_reports_failures():
+    """測試快取命中不呼叫 extract，單支影片失敗不影響其他影片"""
+    get_info_cache().set("cached", _info("cached", "20231231", chapters=0))
+    wrapper = FakeWrapper()
+    items = [{"video_id": "cached"}, {"video_id": "fresh"}, {"video_id": "broken"}]
+
+    with patch.object(enrich, "get_wrapper", return_value=wrapper):
+        count = await enrich.enrich_videos(items, ["publish_date", "captions", "chapters"])
+
+    assert count == 2
+    assert sorted(wrapper.calls) == ["broken", "fresh"]
+    assert items[0] == {
+        "video_id": "cached", "publish_date": "2023-12-31", "has_captions": True,
+        "caption_languages": ["en", "zh-Hant"], "chapter_count": 0, "enriched": True,
+    }
+    assert items[1]["chapter_count"] == 2
+    assert items[2]["enriched"] is False
+
+
+@pytest.mark.asyncio
+async def test_enrich_respects_time_budget():
+    """測試時間預算用完時未完成的項目照常回傳"""
+    wrapper = FakeWrapper(slow={"slow"})
+    items = [{"video_id": "fast"}, {"video_id": "slow", "publish_date": "2 days ago"}]
+
+    try:
+        with patch.object(enrich, "get_wrapper", return_value=wrapper):
+            count = await enrich.enrich_videos(items, ["publish_date"], budget=0.2)
+    finally:
+        wrapper.release.set()
+
+    assert count == 1
+    assert items[0]["publish_date"] == "2024-01-15"
+    assert items[1] == {"video_id": "slow", "publish_date": "2 days ago", "enriched": False}
+
+
+def test_published_before_date():
+    """測試以確切日期判斷 since，同一天不算早於"""
+    since = datetime(2024, 1, 15, 18, 0)
+    assert enrich.published_before_date({"enriched": True, "publish_date": "2024-01-14"}, since)
+    same_day = {"enriched": True, "publish_date": "2024-01-15"}
+    not_enriched = {"enriched": False, "publish_date": "2024-01-01"}
+    assert not enrich.published_before_date(same_day, since)
+    assert not enrich.published_before_date(not_enriched, since)
+
+
+def test_channel_videos_enrich_endpoint():
+    """測試頻道列表 enrich 參數"""
+    items = [
+        {"videoId": "new", "title": {"runs": [{"text": "New"}]}},
+        {"videoId": "old", "title": {"runs": [{"text": "Old"}]}},
+    ]
+
+    async def fake_fetch(self, page):
+        return items, None
+
+    class Wrapper(FakeWrapper):
+        def get_video_info(self, video_id):
+            return _info(video_id, "20240201" if video_id == "new" else "20240101")
+
+    with patch("app.services.innertube.ListingPager._fetch", fake_fetch), \
+         patch.object(enrich, "get_wrapper", return_value=Wrapper()):
+        response = client.get(
+            "/api/v1/channel/UCtest/videos",
+            params={"enrich": "publish_date,captions", "since": "2024-01-15T00:00:00"},
+        )
+        invalid = client.get("/api/v1/channel/UCtest/videos?enrich=likes")
+
+    assert response.status_code == 200
+    videos = response.json()["videos"]
+    assert [video["video_id"] for video in videos] == ["new"]
+    assert videos[0]["publish_date"] == "2024-02-01"
+    assert videos[0]["has_captions"] is True
+    assert videos[0]["chapter_count"] is None
+    assert invalid.status_code == 400
@@ -0,0 +1,42 @@
+"""
+阻塞工作執行器單元測試
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.exceptions import ServiceOverloadedError
+from app.services.executor import BlockingExecutor
+
+
+@pytest.mark.asyncio
+async def test_run_does_not_block_event_loop():
+    """測試阻塞工作在執行緒中執行"""
+    executor = BlockingExecutor(max_in_flight=2, max_queue=0)
+    main_thread = threading.get_ident()
+
+    result = await executor.run(threading.get_ident)
+
+    assert result != main_thread
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_full():
+    """測試等待佇列已滿時拋出 ServiceOverloadedError"""
+    executor = BlockingExecutor(max_in_flight=1, max_queue=0)
+    release = threading.Event()
+
+    running = asyncio.ensure_future(executor.run(release.wait, 5))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(ServiceOverloadedError):
+        await executor.run(lambda: None)
+
+    release.set()
+    assert await running is True
+    assert executor.stats()["rejected"] == 1
+    executor.shutdown()
+
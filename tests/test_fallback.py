@@ -2,6 +2,7 @@
 Fallback 機制單元測試
 """
 
+import httpx
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from app.services.transcript import get_transcript_with_fallback
@@ -95,3 +96,107 @@ async def test_fallback_failure():
             await get_transcript_with_fallback("test", "zh-Hant", [])
         
         mock_transcribe.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced():
+    """測試同一影片的並行請求只會觸發一次上游抓取"""
+    import asyncio
+
+    calls = 0
+
+    async def fake_fetch(video_id, preferred_language, fallback_languages, defer_fallback=False):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [{"text": "hi", "start": 0.0, "duration": 1.0}], preferred_language
+
+    with patch('app.services.transcript._fetch_transcript', side_effect=fake_fetch):
+        results = await asyncio.gather(*[
+            get_transcript_with_fallback("coalesced01", "en", []) for _ in range(5)
+        ])
+
+    assert calls == 1
+    assert all(result == results[0] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_negative_cache_skips_repeat_extraction():
+    """測試私人影片的失敗結果會被快取，重複請求不再呼叫 yt-dlp"""
+    from app.exceptions import VideoNotFoundError
+    from app.services.cache import get_negative_cache
+
+    get_negative_cache().delete("private0001")
+
+    with patch('app.services.transcript._get_wrapper') as mock_get_wrapper, \
+         patch('app.services.transcript.transcribe_video', new_callable=AsyncMock) as mock_transcribe, \
+         patch('app.services.transcript.get_transcript_store', return_value=None):
+
+        mock_wrapper = MagicMock()
+        mock_wrapper.get_subtitles.side_effect = Exception(
+            "ERROR: [youtube] private0001: Private video. Sign in if you've been granted access"
+        )
+        mock_get_wrapper.return_value = mock_wrapper
+
+        for _ in range(3):
+            with pytest.raises(VideoNotFoundError):
+                await get_transcript_with_fallback("private0001", "zh-Hant", [])
+
+        # 影片不存在時不嘗試 Whisper，且只 extract 一次
+        mock_transcribe.assert_not_awaited()
+        assert mock_wrapper.get_subtitles.call_count == 1
+
+    get_negative_cache().delete("private0001")
+
+
+def test_classify_failure():
+    """測試失敗分類，無法判定的錯誤回傳 None"""
+    from app.exceptions import VideoNotFoundError
+    from app.services.transcript import classify_failure
+    from app.services.yt_dlp_wrapper import NoSubtitlesError
+
+    assert classify_failure(NoSubtitlesError("No subtitles")) is TranscriptNotFoundError
+    assert classify_failure(Exception("Video unavailable")) is VideoNotFoundError
+    assert classify_failure(Exception("Connection reset by peer")) is None
+
+
+@pytest.mark.asyncio
+async def test_unavailable_fallback_is_not_negatively_cached():
+    """測試 Whisper 暫時無法使用（斷路器開啟）時不寫入負面快取，下一次請求仍會再試"""
+    from app.services.cache import get_negative_cache
+    from app.services.circuit_breaker import CircuitOpenError
+    from app.services.yt_dlp_wrapper import NoSubtitlesError
+
+    get_negative_cache().delete("nosubs00001")
+
+    with patch('app.services.transcript._get_wrapper') as mock_get_wrapper, \
+         patch('app.services.transcript.transcribe_video', new_callable=AsyncMock) as mock_transcribe, \
+         patch('app.services.transcript.get_transcript_store', return_value=None), \
+         patch('app.services.transcript.get_whisper_store', return_value=None), \
+         patch('app.services.transcript.settings') as mock_settings:
+
+        mock_wrapper = MagicMock()
+        mock_wrapper.get_subtitles.side_effect = NoSubtitlesError("No subtitles")
+        mock_wrapper.get_video_info.return_value = {}
+        mock_get_wrapper.return_value = mock_wrapper
+        mock_settings.transcribe_api_url = "http://fake-url"
+        mock_settings.negative_cache_ttl_not_found = 60
+        mock_transcribe.side_effect = CircuitOpenError("transcribe", 30.0)
+
+        for _ in range(2):
+            with pytest.raises(TranscriptNotFoundError):
+                await get_transcript_with_fallback("nosubs00001", "en", [])
+
+        assert get_negative_cache().get("nosubs00001") is None
+        assert mock_transcribe.await_count == 2
+
+        # Whisper 明確拒絕時才是確定的結果
+        mock_transcribe.side_effect = httpx.HTTPStatusError(
+            "Unprocessable", request=httpx.Request("POST", "http://fake-url"),
+            response=httpx.Response(422)
+        )
+        with pytest.raises(TranscriptNotFoundError):
+            await get_transcript_with_fallback("nosubs00001", "en", [])
+        assert get_negative_cache().get("nosubs00001") is TranscriptNotFoundError
+
+    get_negative_cache().delete("nosubs00001")
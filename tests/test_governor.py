@@ -0,0 +1,163 @@
+"""
+上游速率調節測試
+"""
+
+import time
+
+import httpx
+import pytest
+
+from app.exceptions import ServiceOverloadedError
+from app.services.governor import (
+    HostGovernor,
+    RetryBudget,
+    UpstreamGovernor,
+    UpstreamThrottledError,
+    is_throttling_error,
+)
+
+
+def _governor(**kwargs):
+    options = {
+        "retry_base_delay": 0.0,
+        "retry_max_delay": 0.0,
+        "host_options": {"rate": 100.0, "min_rate": 50.0, "burst": 10.0},
+    }
+    options.update(kwargs)
+    return UpstreamGovernor(**options)
+
+
+def test_is_throttling_error():
+    """測試辨識 429 與機器人驗證訊息"""
+    request = httpx.Request("GET", "https://www.youtube.com/")
+    response = httpx.Response(429, request=request)
+    assert is_throttling_error(httpx.HTTPStatusError("429", request=request, response=response))
+    assert is_throttling_error(
+        Exception("ERROR: [youtube] abc: Sign in to confirm you’re not a bot")
+    )
+    assert is_throttling_error(Exception("HTTP Error 429: Too Many Requests"))
+    assert not is_throttling_error(Exception("Video unavailable"))
+
+
+def test_aimd_rate_adjustment():
+    """測試成功時加法增加、節流時乘法減少，且一波節流只減少一次"""
+    host = HostGovernor(
+        "example", rate=4.0, min_rate=1.0, max_rate=5.0, increase=0.5, decrease_factor=0.5
+    )
+    host.on_success()
+    assert host.rate == 4.5
+    host.on_success()
+    host.on_success()
+    assert host.rate == 5.0
+
+    host.on_throttled()
+    host.on_throttled()
+    assert host.rate == 2.5
+    assert host.stats()["throttled"] == 2
+
+    host._last_decrease = 0.0
+    host.on_throttled()
+    host._last_decrease = 0.0
+    host.on_throttled()
+    assert host.rate == 1.0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_requests():
+    """測試 token 用完後依速率等待"""
+    host = HostGovernor("example", rate=20.0, burst=1.0)
+    started = time.monotonic()
+    for _ in range(3):
+        await host.acquire()
+    assert time.monotonic() - started >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_acquire_rejects_beyond_max_wait():
+    """測試需要等待超過 max_wait 時拋出服務忙碌，且不預支 token"""
+    host = HostGovernor("example", rate=1.0, burst=1.0)
+    await host.acquire(max_wait=0.5)
+    with pytest.raises(ServiceOverloadedError):
+        await host.acquire(max_wait=0.5)
+    stats = host.stats()
+    assert stats["requests"] == 1
+    assert stats["rejected"] == 1
+    # 被拒絕的請求沒有預支，等待時間不會累積
+    assert host._reserve() < 1.0
+
+
+@pytest.mark.asyncio
+async def test_run_waits_for_token_on_event_loop():
+    """測試阻塞函數在取得 token 後才交給執行器"""
+    governor = _governor(host_options={"rate": 1.0, "burst": 1.0}, max_wait=0.5)
+    calls = []
+    assert await governor.run("example", calls.append, 1) is None
+    with pytest.raises(ServiceOverloadedError):
+        await governor.run("example", calls.append, 2)
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_retries_throttled_calls_within_budget():
+    """測試節流時重試並降低速率，非節流錯誤不重試"""
+    governor = _governor(max_retries=3)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise UpstreamThrottledError("429")
+        return "ok"
+
+    assert await governor.run("example", flaky) == "ok"
+    assert len(attempts) == 3
+    stats = governor.stats()
+    assert stats["hosts"]["example"]["throttled"] == 2
+    assert stats["hosts"]["example"]["rate_per_second"] < 100.0
+    assert stats["retry_budget"]["retries"] == 2
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("parse error")
+
+    attempts.clear()
+    with pytest.raises(ValueError):
+        await governor.run("example", broken)
+    assert len(attempts) == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_exhaustion():
+    """測試重試預算用完時不再重試"""
+    governor = _governor(max_retries=5)
+    governor.budget = RetryBudget(ratio=0.0, max_balance=1.0)
+    attempts = []
+
+    def throttled():
+        attempts.append(1)
+        raise UpstreamThrottledError("429")
+
+    with pytest.raises(UpstreamThrottledError):
+        await governor.run("example", throttled)
+    assert len(attempts) == 2
+    assert governor.budget.stats()["exhausted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_call_and_disabled():
+    """測試非同步呼叫的重試，以及停用時直接呼叫"""
+    governor = _governor()
+    attempts = []
+
+    async def request():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise UpstreamThrottledError("429")
+        return "page"
+
+    assert await governor.call("www.youtube.com", request) == "page"
+    assert len(attempts) == 2
+
+    disabled = _governor(enabled=False)
+    assert await disabled.run("example", lambda: 42) == 42
+    assert disabled.stats()["hosts"] == {}
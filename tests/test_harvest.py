@@ -0,0 +1,214 @@
+"""
+批量字幕收集工作單元測試
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.exceptions import TranscriptNotFoundError
+from app.services.harvest import HarvestManager
+
+
+class _FakePager:
+    def __init__(self, video_ids, start, block_at=None):
+        self.video_ids = video_ids
+        self.position = start
+        self.block_at = block_at
+
+    async def __aiter__(self):
+        while self.position < len(self.video_ids):
+            if self.position == self.block_at:
+                await asyncio.Event().wait()
+            video_id = self.video_ids[self.position]
+            self.position += 1
+            yield {"videoId": video_id}
+
+    def next_cursor(self):
+        return str(self.position) if self.position < len(self.video_ids) else None
+
+
+def _fake_pager(video_ids, opened=None, block_at=None):
+    """以項目位置作為 cursor 的分頁器"""
+    def open_pager(source_id, cursor=None, wanted=None):
+        if opened is not None:
+            opened.append(cursor)
+        return _FakePager(video_ids, int(cursor or 0), block_at)
+    return open_pager
+
+
+async def _wait_finished(manager, job_id, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        job = await manager.get_job(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("harvest job did not finish")
+
+
+@pytest.mark.asyncio
+async def test_harvest_job_completes(tmp_path):
+    """測試列出播放清單、處理所有影片並記錄失敗"""
+    manager = HarvestManager(str(tmp_path / "harvest.sqlite3"), concurrency=2, rate_per_second=0)
+
+    async def fake_fetch(video_id, preferred_language, fallback_languages):
+        if video_id == "bad":
+            raise TranscriptNotFoundError(video_id, preferred_language)
+        return [], preferred_language
+
+    with patch("app.services.playlist.open_playlist_pager", _fake_pager(["a", "b", "bad"])), \
+         patch("app.services.transcript.get_transcript_with_fallback", fake_fetch):
+        job = await manager.create_job("playlist", "PL1", "en")
+        job = await _wait_finished(manager, job["job_id"])
+
+    assert job["status"] == "done"
+    assert job["total"] == 3
+    assert job["done"] == 2
+    assert job["failed"] == 1
+    assert job["throughput"] > 0
+
+
+@pytest.mark.asyncio
+async def test_harvest_job_resumes_after_restart(tmp_path):
+    """測試重新啟動後只處理尚未完成的影片"""
+    path = str(tmp_path / "harvest.sqlite3")
+    fetched = []
+    blocked = asyncio.Event()
+
+    async def blocking_fetch(video_id, preferred_language, fallback_languages):
+        if video_id == "c":
+            blocked.set()
+            await asyncio.Event().wait()
+        fetched.append(video_id)
+        return [], preferred_language
+
+    listing = _fake_pager(["a", "b", "c", "d"])
+    with patch("app.services.channel.open_channel_pager", listing), \
+         patch("app.services.transcript.get_transcript_with_fallback", blocking_fetch):
+        manager = HarvestManager(path, concurrency=1, rate_per_second=0)
+        job_id = (await manager.create_job("channel", "UC1", "en"))["job_id"]
+        await asyncio.wait_for(blocked.wait(), 5.0)
+        await manager.shutdown()
+
+    assert fetched == ["a", "b"]
+
+    async def fetch(video_id, preferred_language, fallback_languages):
+        fetched.append(video_id)
+        return [], preferred_language
+
+    with patch("app.services.channel.open_channel_pager", listing), \
+         patch("app.services.transcript.get_transcript_with_fallback", fetch):
+        manager = HarvestManager(path, concurrency=1, rate_per_second=0)
+        assert await manager.resume() == 1
+        job = await _wait_finished(manager, job_id)
+
+    assert fetched == ["a", "b", "c", "d"]
+    assert job["done"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cancel_requeues_running_tasks_and_keeps_finished_jobs(tmp_path):
+    """測試取消時處理中的影片放回佇列"""
+    blocked = asyncio.Event()
+
+    async def blocking_fetch(video_id, preferred_language, fallback_languages):
+        if video_id == "b":
+            blocked.set()
+            await asyncio.Event().wait()
+        return [], preferred_language
+
+    manager = HarvestManager(str(tmp_path / "harvest.sqlite3"), concurrency=1, rate_per_second=0)
+    with patch("app.services.playlist.open_playlist_pager", _fake_pager(["a", "b", "c"])), \
+         patch("app.services.transcript.get_transcript_with_fallback", blocking_fetch):
+        job_id = (await manager.create_job("playlist", "PL1", "en"))["job_id"]
+        await asyncio.wait_for(blocked.wait(), 5.0)
+
+        job = await manager.cancel_job(job_id)
+        assert job["status"] == "cancelled"
+        assert (job["done"], job["running"], job["pending"]) == (1, 0, 2)
+
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancel_keeps_finished_job_status(tmp_path):
+    """測試已完成的工作不會被改為取消"""
+    async def fetch(video_id, preferred_language, fallback_languages):
+        return [], preferred_language
+
+    manager = HarvestManager(str(tmp_path / "harvest.sqlite3"), concurrency=1, rate_per_second=0)
+    with patch("app.services.playlist.open_playlist_pager", _fake_pager(["a"])), \
+         patch("app.services.transcript.get_transcript_with_fallback", fetch):
+        job_id = (await manager.create_job("playlist", "PL1", "en"))["job_id"]
+        await _wait_finished(manager, job_id)
+
+    job = await manager.cancel_job(job_id)
+    assert job["status"] == "done"
+    assert job["finished_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_listing_resumes_from_saved_cursor(tmp_path):
+    """測試列表中斷後從最後寫入的 cursor 繼續，而不是從第一頁重新列出"""
+    path = str(tmp_path / "harvest.sqlite3")
+    video_ids = ["a", "b", "c", "d", "e"]
+    opened = []
+
+    async def fetch(video_id, preferred_language, fallback_languages):
+        return [], preferred_language
+
+    with patch("app.services.harvest._LIST_BATCH", 2), \
+         patch("app.services.playlist.open_playlist_pager",
+               _fake_pager(video_ids, opened, block_at=3)):
+        manager = HarvestManager(path, concurrency=1, rate_per_second=0)
+        job_id = (await manager.create_job("playlist", "PL1", "en"))["job_id"]
+        for _ in range(500):
+            job = await manager.get_job(job_id)
+            if job["total"] == 2:
+                break
+            await asyncio.sleep(0.01)
+        await manager.shutdown()
+
+    assert job["total"] == 2
+    assert not job["listed"]
+
+    with patch("app.services.harvest._LIST_BATCH", 2), \
+         patch("app.services.playlist.open_playlist_pager", _fake_pager(video_ids, opened)), \
+         patch("app.services.transcript.get_transcript_with_fallback", fetch):
+        manager = HarvestManager(path, concurrency=1, rate_per_second=0)
+        assert await manager.resume() == 1
+        job = await _wait_finished(manager, job_id)
+
+    assert opened == [None, "2"]
+    assert job["total"] == 5
+    assert job["done"] == 5
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_retry_with_backoff(tmp_path):
+    """測試暫時性失敗以指數退避重試，而不是立即重新排入佇列"""
+    loop = asyncio.get_running_loop()
+    attempts = []
+
+    async def flaky_fetch(video_id, preferred_language, fallback_languages):
+        attempts.append(loop.time())
+        if len(attempts) < 3:
+            raise RuntimeError("upstream throttled")
+        return [], preferred_language
+
+    manager = HarvestManager(
+        str(tmp_path / "harvest.sqlite3"), concurrency=1, rate_per_second=0,
+        max_attempts=3, retry_base_delay=0.1, retry_max_delay=10.0
+    )
+    with patch("app.services.playlist.open_playlist_pager", _fake_pager(["a"])), \
+         patch("app.services.transcript.get_transcript_with_fallback", flaky_fetch):
+        job_id = (await manager.create_job("playlist", "PL1", "en"))["job_id"]
+        job = await _wait_finished(manager, job_id)
+
+    assert job["done"] == 1
+    assert len(attempts) == 3
+    assert attempts[1] - attempts[0] >= 0.09
+    assert attempts[2] - attempts[1] >= 0.19
+    assert manager._retry_delay(10) == 10.0
@@ -0,0 +1,143 @@
+"""
+metadata 後端避險測試
+"""
+
+import time
+
+import pytest
+
+from app.exceptions import VideoNotFoundError
+from app.services.hedging import BackendStats, HedgedMetadataProvider
+
+
+class FakeBackend:
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def fetch(self, video_id, fields):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"title": self.name}
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_does_not_hedge():
+    """測試主要後端及時回應時不啟動另一個後端"""
+    primary, secondary = FakeBackend("primary"), FakeBackend("secondary")
+    provider = HedgedMetadataProvider([primary, secondary], default_delay=1.0)
+
+    assert await provider.fetch("vid", ["title"]) == {"title": "primary"}
+    assert secondary.calls == 0
+    assert provider.stats()["backends"][0]["wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged():
+    """測試主要後端超過避險延遲時啟動另一個後端並採用先回應者"""
+    primary, secondary = FakeBackend("primary", delay=0.5), FakeBackend("secondary")
+    provider = HedgedMetadataProvider([primary, secondary], default_delay=0.05, min_delay=0.01)
+
+    assert await provider.fetch("vid", ["title"]) == {"title": "secondary"}
+    stats = {item["name"]: item for item in provider.stats()["backends"]}
+    assert stats["secondary"]["hedges"] == 1
+    assert stats["secondary"]["wins"] == 1
+    assert stats["primary"]["wins"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failure_falls_over_immediately():
+    """測試主要後端失敗時立即改用另一個後端，錯誤計入評分"""
+    primary = FakeBackend("primary", error=RuntimeError("player changed"))
+    secondary = FakeBackend("secondary")
+    provider = HedgedMetadataProvider([primary, secondary], default_delay=10.0)
+
+    started = time.monotonic()
+    assert await provider.fetch("vid", ["title"]) == {"title": "secondary"}
+    assert time.monotonic() - started < 1.0
+    stats = provider.stats()["backends"][0]
+    assert stats["errors"] == 1
+    assert stats["last_error"] == "player changed"
+
+
+@pytest.mark.asyncio
+async def test_video_not_found_is_a_definitive_answer():
+    """測試影片不存在時不再嘗試另一個後端"""
+    primary = FakeBackend("primary", error=VideoNotFoundError("vid"))
+    secondary = FakeBackend("secondary")
+    provider = HedgedMetadataProvider([primary, secondary])
+
+    with pytest.raises(VideoNotFoundError):
+        await provider.fetch("vid", ["title"])
+    assert secondary.calls == 0
+    assert provider.stats()["backends"][0]["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_all_backends_fail():
+    """測試所有後端都失敗時拋出錯誤"""
+    provider = HedgedMetadataProvider([
+        FakeBackend("primary", error=RuntimeError("a")),
+        FakeBackend("secondary", error=RuntimeError("b")),
+    ])
+    with pytest.raises(RuntimeError):
+        await provider.fetch("vid", ["title"])
+
+
+def test_ranking_by_latency_and_errors():
+    """測試以延遲與錯誤率評分，p95 作為避險延遲"""
+    flaky = FakeBackend("flaky")
+    steady = FakeBackend("steady")
+    provider = HedgedMetadataProvider([flaky, steady], min_delay=0.1, max_delay=5.0)
+    for _ in range(5):
+        provider._stats["flaky"].record(0.2, False)
+        provider._stats["flaky"].record(0.2, True)
+        provider._stats["steady"].record(0.3, False)
+
+    assert [backend.name for backend in provider.ranked()] == ["steady", "flaky"]
+    assert provider.hedge_delay(steady) == pytest.approx(0.3)
+
+    stats = BackendStats("cold")
+    stats.record(1.0, False)
+    assert stats.score() == 0.0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_records_real_latency():
+    """測試輸給其他後端的呼叫完成後仍以實際延遲記錄，而不是不留樣本"""
+    import asyncio
+
+    primary, secondary = FakeBackend("primary", delay=0.3), FakeBackend("secondary")
+    provider = HedgedMetadataProvider([primary, secondary], default_delay=0.05, min_delay=0.01)
+
+    assert await provider.fetch("vid", ["title"]) == {"title": "secondary"}
+    assert provider.stats()["backends"][0]["in_flight"] == 1
+
+    await asyncio.sleep(0.5)
+    stats = provider.stats()["backends"][0]
+    assert stats["in_flight"] == 0
+    assert stats["window_calls"] == 1
+    assert stats["p50_seconds"] >= 0.3
+
+
+@pytest.mark.asyncio
+async def test_stalled_backend_is_not_tried_first():
+    """測試有呼叫超過避險延遲仍未完成的後端，之後的請求不再優先呼叫"""
+    import asyncio
+
+    primary, secondary = FakeBackend("primary", delay=0.5), FakeBackend("secondary")
+    provider = HedgedMetadataProvider([primary, secondary], default_delay=0.05, min_delay=0.01)
+
+    assert await provider.fetch("vid", ["title"]) == {"title": "secondary"}
+    assert provider.stalled(primary)
+    assert [backend.name for backend in provider.ranked()] == ["secondary", "primary"]
+
+    assert await provider.fetch("vid", ["title"]) == {"title": "secondary"}
+    assert primary.calls == 1
+
+    await asyncio.sleep(0.6)
+    assert not provider.stalled(primary)
@@ -0,0 +1,59 @@
+"""
+上游 HTTP 客戶端登錄表單元測試
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.http_client import UpstreamClients
+
+
+@pytest.mark.asyncio
+async def test_clients_are_shared_per_host():
+    """測試同一主機共用客戶端，不同主機各自獨立"""
+    clients = UpstreamClients()
+
+    a = clients.get("http://192.168.0.160:8001/api/v1/transcribe-youtube")
+    b = clients.get("http://192.168.0.160:8001/other")
+    c = clients.get("https://www.youtube.com/youtubei/v1/browse")
+
+    assert a is b
+    assert a is not c
+    assert set(clients.stats()["hosts"]) == {
+        "http://192.168.0.160:8001",
+        "https://www.youtube.com:443",
+    }
+
+    await clients.aclose()
+    assert a.is_closed
+
+
+@pytest.mark.asyncio
+async def test_request_sync_uses_shared_client_from_worker_thread():
+    """測試執行器中的同步程式碼透過 event loop 使用共用的客戶端"""
+    clients = UpstreamClients()
+    url = "https://www.youtube.com/api/timedtext?fmt=json3"
+    requests = []
+
+    def handler(request):
+        requests.append(request.url)
+        return httpx.Response(200, json={"events": []})
+
+    with pytest.raises(RuntimeError):
+        clients.request_sync("GET", url)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    clients._clients[clients._host_key(url)] = client
+    assert clients.get(url) is client
+
+    with pytest.raises(RuntimeError):
+        clients.request_sync("GET", url)
+
+    response = await asyncio.to_thread(clients.request_sync, "GET", url)
+    assert response.json() == {"events": []}
+    assert [str(u) for u in requests] == [url]
+
+    await clients.aclose()
+    assert not clients.bound
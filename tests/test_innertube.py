@@ -0,0 +1,149 @@
+"""
+innertube 分頁器單元測試
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.config import settings
+from app.exceptions import InvalidCursorError
+from app.services.innertube import ListingPager, decode_cursor, encode_cursor
+
+# 三頁，每頁 3 筆；page 為 None 表示第一頁
+PAGES = {
+    None: ([{"videoId": "v1"}, {"videoId": "v2"}, {"videoId": "v3"}], "t2"),
+    "t2": ([{"videoId": "v4"}, {"videoId": "v5"}, {"videoId": "v6"}], "t3"),
+    "t3": ([{"videoId": "v7"}, {"videoId": "v8"}, {"videoId": "v9"}], None),
+}
+
+
+async def _take(pager, n):
+    items = []
+    async for item in pager:
+        items.append(item["videoId"])
+        if len(items) >= n:
+            break
+    return items
+
+
+@pytest.fixture
+def fetched():
+    calls = []
+
+    async def fake_fetch(self, page):
+        token = page["token"] if page else None
+        calls.append(token)
+        if page is None:
+            self._set_params("key", {"clientVersion": "2.0"})
+        items, next_token = PAGES[token]
+        next_page = {"token": next_token, "click_params": {}} if next_token else None
+        return items, next_page
+
+    with patch.object(ListingPager, "_fetch", fake_fetch), \
+         patch.object(settings, "listing_page_delay", 0):
+        yield calls
+
+
+@pytest.mark.asyncio
+async def test_cursor_resumes_where_previous_page_stopped(fetched):
+    """測試 cursor 從上一頁停下的位置繼續，且不重走前面的頁面"""
+    pager = ListingPager("playlist", "PL1", wanted=4)
+    assert await _take(pager, 4) == ["v1", "v2", "v3", "v4"]
+    cursor = pager.next_cursor()
+
+    fetched.clear()
+    pager = ListingPager("playlist", "PL1", cursor=cursor, wanted=4)
+    assert await _take(pager, 4) == ["v5", "v6", "v7", "v8"]
+    assert fetched == ["t2", "t3"]
+
+    pager = ListingPager("playlist", "PL1", cursor=pager.next_cursor(), wanted=4)
+    assert await _take(pager, 4) == ["v9"]
+    assert pager.next_cursor() is None
+
+
+@pytest.mark.asyncio
+async def test_cursor_at_page_boundary_points_to_next_page(fetched):
+    """測試剛好取完一頁時，cursor 直接指向下一頁，且不預先抓取用不到的頁面"""
+    pager = ListingPager("channel", "UC1", "videos", wanted=3)
+    assert await _take(pager, 3) == ["v1", "v2", "v3"]
+    assert fetched == [None]
+
+    fetched.clear()
+    pager = ListingPager("channel", "UC1", "videos", cursor=pager.next_cursor(), wanted=1)
+    assert await _take(pager, 1) == ["v4"]
+    assert fetched == ["t2"]
+
+
+@pytest.mark.asyncio
+async def test_prefetches_next_page_while_consuming(fetched):
+    """測試處理目前這一頁時已開始抓取下一頁"""
+    pager = ListingPager("playlist", "PL1")
+    iterator = pager.__aiter__()
+    assert (await iterator.__anext__())["videoId"] == "v1"
+    await asyncio.sleep(0)
+    assert fetched == [None, "t2"]
+    await iterator.aclose()
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor(fetched):
+    """測試格式錯誤或不屬於此來源的 cursor"""
+    with pytest.raises(InvalidCursorError):
+        ListingPager("playlist", "PL1", cursor="not-a-cursor")
+
+    pager = ListingPager("playlist", "PL1", wanted=1)
+    await _take(pager, 1)
+    with pytest.raises(InvalidCursorError):
+        ListingPager("playlist", "PL2", cursor=pager.next_cursor())
+    with pytest.raises(InvalidCursorError):
+        ListingPager("channel", "PL1", "videos", cursor=pager.next_cursor())
+
+
+@pytest.mark.asyncio
+async def test_missing_source_raises_not_found():
+    """測試來源頁面 404 時拋出對應的不存在例外，而不是回傳空列表"""
+    from app.exceptions import ChannelNotFoundError, PlaylistNotFoundError
+
+    with patch("app.services.innertube.fetch_page", return_value=None), \
+         patch.object(settings, "listing_page_delay", 0):
+        with pytest.raises(ChannelNotFoundError):
+            await _take(ListingPager("channel", "UCmissing", "videos"), 1)
+        with pytest.raises(PlaylistNotFoundError):
+            await _take(ListingPager("playlist", "PLmissing"), 1)
+
+
+@pytest.mark.asyncio
+async def test_cursor_keeps_innertube_params_server_side(fetched):
+    """測試 cursor 不包含 api_key 與 client，以 cursor 繼續時從伺服器端快取取得"""
+    pager = ListingPager("playlist", "PLparams", wanted=2)
+    assert await _take(pager, 2) == ["v1", "v2"]
+    cursor = pager.next_cursor()
+
+    state = decode_cursor(cursor, "playlist", "PLparams")
+    assert set(state) == {"kind", "id", "content_type", "token", "click", "skip"}
+
+    resumed = ListingPager("playlist", "PLparams", cursor=cursor)
+    assert resumed._api_key == "key"
+    assert resumed._client == {"clientVersion": "2.0"}
+
+
+def test_decode_cursor_checks_field_types():
+    """測試 cursor 欄位型別錯誤時拒絕"""
+    base = {
+        "kind": "playlist", "id": "PL1", "content_type": None,
+        "token": "t2", "click": None, "skip": 1,
+    }
+    assert decode_cursor(encode_cursor(base), "playlist", "PL1")["skip"] == 1
+
+    for invalid in (
+        {"token": 123},
+        {"token": {"nested": True}},
+        {"skip": -1},
+        {"skip": "1"},
+        {"skip": True},
+        {"click": "params"},
+    ):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(encode_cursor({**base, **invalid}), "playlist", "PL1")
@@ -0,0 +1,137 @@
+"""
+頻道與播放清單列表 API 測試
+"""
+
+import json
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def _scrapetube_items(count):
+    return [
+        {"videoId": f"vid{i:08d}", "title": {"runs": [{"text": f"Video {i}"}]}}
+        for i in range(count)
+    ]
+
+
+def _single_page(items, fail_after=False):
+    """讓分頁器只回傳一頁；fail_after 時下一頁抓取失敗"""
+    async def fake_fetch(self, page):
+        if page is None:
+            return list(items), ({"token": "next", "click_params": {}} if fail_after else None)
+        raise RuntimeError("upstream reset")
+    return patch("app.services.innertube.ListingPager._fetch", fake_fetch)
+
+
+class TestListingStream:
+    """NDJSON 串流列表測試"""
+
+    def test_playlist_stream_without_limit(self):
+        """測試播放清單串流沒有數量上限，且保留位置"""
+        with _single_page(_scrapetube_items(250)):
+            response = client.get("/api/v1/playlist/PLtest/videos/stream")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 250
+        assert lines[-1]["position"] == 250
+
+    def test_channel_stream_limit_and_error_line(self):
+        """測試頻道串流的 limit，以及串流途中錯誤以最後一行回報"""
+        with _single_page(_scrapetube_items(3), fail_after=True):
+            response = client.get("/api/v1/channel/UCtest/videos/stream")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line.get("video_id") for line in lines[:3]] == [
+            "vid00000000", "vid00000001", "vid00000002"
+        ]
+        assert lines[-1]["success"] is False
+        assert "upstream reset" in lines[-1]["error"]
+
+        with _single_page(_scrapetube_items(10)):
+            response = client.get("/api/v1/channel/UCtest/videos/stream?limit=4")
+        assert len(response.text.splitlines()) == 4
+
+    def test_channel_stream_invalid_content_type(self):
+        """測試無效的 content_type 在串流開始前回傳 400"""
+        response = client.get("/api/v1/channel/UCtest/videos/stream?content_type=clips")
+        assert response.status_code == 400
+
+
+class TestListingCursor:
+    """cursor 分頁測試"""
+
+    def test_invalid_cursor(self):
+        """測試無效的 cursor 回傳 400"""
+        response = client.get("/api/v1/playlist/PLtest/videos?cursor=garbage")
+        assert response.status_code == 400
+        assert response.json()["type"] == "InvalidCursorError"
+
+
+class TestMergedContentTypes:
+    """多內容類型合併測試"""
+
+    FEEDS = {
+        "videos": [("v1", "1 day ago"), ("v2", "3 days ago"), ("v3", "2 weeks ago")],
+        "streams": [("s1", "2 days ago"), ("s2", "1 month ago")],
+        "shorts": [("r1", None), ("r2", None), ("r3", None), ("r4", None)],
+    }
+
+    @classmethod
+    def _feeds(cls):
+        async def fake_fetch(pager, page):
+            items = []
+            for video_id, published in cls.FEEDS[pager.content_type]:
+                item = {"videoId": video_id}
+                if published:
+                    item["publishedTimeText"] = {"simpleText": published}
+                items.append(item)
+            return items, None
+        return patch("app.services.innertube.ListingPager._fetch", fake_fetch)
+
+    def test_all_merges_by_time_with_type_tags(self):
+        """測試 content_type=all 依時間合併，沒有時間的 shorts 與其他項目交錯而不是排在最後"""
+        with self._feeds():
+            response = client.get("/api/v1/channel/UCtest/videos?content_type=all&limit=20")
+
+        assert response.status_code == 200
+        videos = response.json()["videos"]
+        assert [v["video_id"] for v in videos] == [
+            "v1", "r1", "s1", "r2", "v2", "r3", "v3", "r4", "s2"
+        ]
+        assert [v["content_type"] for v in videos[:3]] == ["videos", "shorts", "streams"]
+
+        # 前幾筆就包含 shorts，不會因為 limit 而被擠掉
+        with self._feeds():
+            response = client.get("/api/v1/channel/UCtest/videos?content_type=all&limit=4")
+        assert [v["video_id"] for v in response.json()["videos"]] == ["v1", "r1", "s1", "r2"]
+        assert response.json()["next_cursor"] is None
+
+    def test_list_applies_limit_and_since_across_feeds(self):
+        """測試逗號列表在合併後套用 limit 與 since"""
+        from datetime import datetime, timedelta
+        since = (datetime.now() - timedelta(days=10)).isoformat()
+
+        with self._feeds():
+            response = client.get(
+                "/api/v1/channel/UCtest/videos",
+                params={"content_type": "videos,streams", "since": since}
+            )
+            assert [v["video_id"] for v in response.json()["videos"]] == ["v1", "s1", "v2"]
+
+            response = client.get(
+                "/api/v1/channel/UCtest/videos",
+                params={"content_type": "videos,streams", "limit": 2}
+            )
+            assert [v["video_id"] for v in response.json()["videos"]] == ["v1", "s1"]
+
+    def test_invalid_type_in_list(self):
+        """測試列表中有無效的內容類型"""
+        response = client.get("/api/v1/channel/UCtest/videos?content_type=videos,clips")
+        assert response.status_code == 400
@@ -0,0 +1,122 @@
+"""
+頻道與播放清單資訊解析測試
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services import channel
+from app.services.cache import get_metadata_cache
+
+
+CHANNEL_PAGE = {
+    "metadata": {"channelMetadataRenderer": {
+        "title": "Example",
+        "description": "About",
+        "externalId": "UCexample",
+        "vanityChannelUrl": "http://www.youtube.com/@example",
+        "avatar": {"thumbnails": [
+            {"url": "https://yt3.example/s88", "width": 88},
+            {"url": "https://yt3.example/s900", "width": 900},
+        ]},
+    }},
+    "header": {"pageHeaderRenderer": {"content": {"pageHeaderViewModel": {
+        "metadata": {"contentMetadataViewModel": {"metadataRows": [
+            {"metadataParts": [{"text": {"content": "@example"}}]},
+            {"metadataParts": [
+                {"text": {"content": "1.23M subscribers"}},
+                {"text": {"content": "1,234 videos"}},
+            ]},
+        ]}},
+    }}}},
+}
+
+
+def test_parse_channel_page_header_view_model():
+    """測試從新版頁首解析訂閱數、影片數與 handle"""
+    info = channel.parse_channel_page("UCexample", CHANNEL_PAGE)
+    assert info["name"] == "Example"
+    assert info["handle"] == "@example"
+    assert info["subscriber_count"] == 1_230_000
+    assert info["video_count"] == 1234
+    assert info["thumbnail_url"] == "https://yt3.example/s900"
+
+
+def test_parse_channel_page_legacy_header():
+    """測試舊版 c4TabbedHeaderRenderer"""
+    data = {
+        "metadata": CHANNEL_PAGE["metadata"],
+        "header": {"c4TabbedHeaderRenderer": {
+            "subscriberCountText": {"simpleText": "12K subscribers"},
+            "videosCountText": {"runs": [{"text": "56"}, {"text": " videos"}]},
+        }},
+    }
+    info = channel.parse_channel_page("UCexample", data)
+    assert info["subscriber_count"] == 12_000
+    assert info["video_count"] == 56
+
+
+@pytest.mark.asyncio
+async def test_channel_info_single_request_and_cached():
+    """測試頻道資訊只抓取一次頁面，之後由快取回應"""
+    get_metadata_cache().clear()
+    fetch = AsyncMock(return_value=CHANNEL_PAGE)
+    with patch.object(channel, "fetch_initial_data", fetch):
+        first = await channel.get_channel_basic_info_async("UCexample")
+        second = await channel.get_channel_basic_info_async("UCexample")
+
+    assert fetch.await_count == 1
+    assert first == second
+    assert first["video_count"] == 1234
+
+
+def _playlist_html(data):
+    import json
+    return (
+        '<script>ytcfg.set({"INNERTUBE_CONTEXT":{"client":{"clientName":"WEB","clientVersion":"2.0"}},'
+        '"innertubeApiKey":"key"});</script>'
+        f'<script>var ytInitialData = {json.dumps(data)};</script>'
+    )
+
+
+PLAYLIST_PAGE = {
+    "metadata": {"playlistMetadataRenderer": {"title": "My list", "description": "Desc"}},
+    "sidebar": {"playlistSidebarRenderer": {"items": [
+        {"playlistSidebarPrimaryInfoRenderer": {"stats": [
+            {"runs": [{"text": "250"}, {"text": " videos"}]}
+        ]}},
+        {"playlistSidebarSecondaryInfoRenderer": {"videoOwner": {"videoOwnerRenderer": {
+            "title": {"runs": [
+                {"text": "Owner", "navigationEndpoint": {"browseEndpoint": {"browseId": "UCowner"}}}
+            ]}
+        }}}},
+    ]}},
+    "contents": {"playlistVideoListRenderer": {"contents": [
+        {"playlistVideoRenderer": {"videoId": "v1", "index": {"simpleText": "1"}}},
+        {"playlistVideoRenderer": {"videoId": "v2", "index": {"simpleText": "2"}}},
+        {"continuationItemRenderer": {"continuationEndpoint": {
+            "clickTrackingParams": "ctp", "continuationCommand": {"token": "next-token"}
+        }}},
+    ]}},
+}
+
+
+@pytest.mark.asyncio
+async def test_playlist_overview_with_first_page():
+    """測試播放清單頁首與第一頁影片來自同一次請求，並回傳下一頁 cursor"""
+    from app.services import playlist
+    from app.services.innertube import decode_cursor
+
+    fetch = AsyncMock(return_value=_playlist_html(PLAYLIST_PAGE))
+    with patch.object(playlist, "fetch_page", fetch):
+        result = await playlist.get_playlist_overview("PLx", include_videos=True)
+
+    assert fetch.await_count == 1
+    assert result["title"] == "My list"
+    assert result["video_count"] == 250
+    assert result["channel_id"] == "UCowner"
+    assert [v["video_id"] for v in result["videos"]] == ["v1", "v2"]
+    state = decode_cursor(result["next_cursor"], "playlist", "PLx")
+    assert state["token"] == "next-token"
+    assert state["skip"] == 0
@@ -0,0 +1,83 @@
+"""
+Whisper 非同步轉錄工作單元測試
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.transcribe_jobs import TranscribeJobRegistry
+
+
+@pytest.mark.asyncio
+async def test_job_lifecycle():
+    """測試工作由 queued 轉為 done，且同一影片共用進行中的工作"""
+    registry = TranscribeJobRegistry(max_concurrent=1)
+    release = asyncio.Event()
+
+    async def runner(video_id, language):
+        await release.wait()
+        return [{"text": "ok", "start": 0.0, "duration": 1.0}]
+
+    job = registry.submit("vid00000001", "en", runner)
+    assert job.status == "queued"
+    assert registry.submit("vid00000001", "en", runner) is job
+
+    await asyncio.sleep(0)
+    assert job.status == "running"
+
+    release.set()
+    assert await job.wait_for_change(1.0)
+    assert job.status == "done"
+    assert job.result[0]["text"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_job_failure():
+    """測試轉錄失敗時記錄錯誤訊息"""
+    registry = TranscribeJobRegistry()
+
+    async def runner(video_id, language):
+        raise RuntimeError("Whisper failed")
+
+    job = registry.submit("vid00000001", "en", runner)
+    await job._task
+
+    assert job.status == "failed"
+    assert job.error == "Whisper failed"
+    assert registry.stats()["failed"] == 1
+
+
+def test_accepted_location_points_to_job_endpoint():
+    """測試 202 回應的 Location 標頭包含 API 前綴，可直接查詢工作"""
+    from unittest.mock import patch
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services.transcribe_jobs import TranscriptionDeferred, get_job_registry
+
+    async def runner(video_id, language):
+        return [{"text": "ok", "start": 0.0, "duration": 1.0}]
+
+    async def deferred(video_id, language, fallback_languages, defer_fallback=False):
+        assert defer_fallback
+        raise TranscriptionDeferred(get_job_registry().submit(video_id, language, runner))
+
+    client = TestClient(app)
+    with patch("app.services.transcript.get_transcript_with_fallback", side_effect=deferred):
+        response = client.post(
+            "/api/v1/transcript/",
+            json={
+                "youtube_url": "https://www.youtube.com/watch?v=locate00001",
+                "async_fallback": True,
+            }
+        )
+
+    assert response.status_code == 202
+    location = response.headers["Location"]
+    assert location.startswith("/api/v1/transcript/jobs/")
+
+    job = client.get(location)
+    assert job.status_code == 200
+    assert job.json()["video_id"] == "locate00001"
@@ -32,6 +32,14 @@ class TestBasicEndpoints:
         assert "service" in data
         assert "version" in data
     
+    def test_status_endpoint(self):
+        """測試服務狀態端點"""
+        response = client.get("/status")
+        assert response.status_code == 200
+        data = response.json()
+        assert "executor" in data
+        assert data["transcribe"]["circuit"]["state"] in ["closed", "open", "half_open"]
+    
     def test_version_endpoint(self):
         """測試版本端點"""
         response = client.get("/version")
@@ -139,6 +147,57 @@ class TestTranscriptAPI:
         print(f"Response: {response.status_code}, {response.json()}")
 
 
+class TestBatchTranscriptAPI:
+    """批次字幕 API 測試"""
+    
+    def test_batch_partial_results(self):
+        """測試批次請求合併重複影片，且單一失敗不影響其他結果"""
+        import json
+        from unittest.mock import patch
+        from app.exceptions import VideoNotFoundError
+        
+        async def fake_get_transcript(video_id, language, fallback_languages):
+            if video_id == "AAAAAAAAAAA":
+                return [{"text": "hi", "start": 0.0, "duration": 1.0}], language
+            raise VideoNotFoundError(video_id)
+        
+        with patch('app.services.transcript.get_transcript_with_fallback',
+                   side_effect=fake_get_transcript) as mock_get:
+            response = client.post(
+                "/api/v1/transcript/batch",
+                json={"items": [
+                    {"youtube_url": "https://youtu.be/AAAAAAAAAAA", "language": "en"},
+                    {
+                        "youtube_url": "https://www.youtube.com/watch?v=AAAAAAAAAAA",
+                        "language": "en"
+                    },
+                    {"youtube_url": "https://youtu.be/BBBBBBBBBBB", "language": "en"},
+                    {"youtube_url": "invalid_url"},
+                ]}
+            )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        results = [json.loads(line) for line in response.text.splitlines()]
+        by_index = {tuple(r["indices"]): r for r in results}
+        
+        assert mock_get.call_count == 2
+        assert by_index[(0, 1)]["success"] is True
+        assert by_index[(0, 1)]["total_items"] == 1
+        assert by_index[(2,)]["status_code"] == 404
+        assert by_index[(3,)]["status_code"] == 400
+
+
+class TestTranscribeJobsAPI:
+    """Whisper 轉錄工作 API 測試"""
+    
+    def test_unknown_job(self):
+        """測試查詢不存在的工作"""
+        response = client.get("/api/v1/transcript/jobs/unknown")
+        assert response.status_code == 404
+        assert response.json()["type"] == "JobNotFoundError"
+
+
 class TestAvailableLanguagesAPI:
     """可用語言 API 測試"""
     
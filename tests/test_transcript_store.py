@@ -0,0 +1,146 @@
+"""
+字幕持久化儲存單元測試
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.services.transcript_store import TranscriptStore
+
+ITEMS = [{"text": "字幕", "start": 0.0, "duration": 1.0}]
+
+
+def test_put_and_get(tmp_path):
+    """測試寫入後可讀回，且未指定時優先回傳手動字幕"""
+    store = TranscriptStore(str(tmp_path / "t.sqlite3"))
+    store.put("vid00000001", "en", True, [{"text": "auto", "start": 0.0, "duration": 1.0}], ttl=60)
+    store.put("vid00000001", "en", False, ITEMS, ttl=60)
+
+    result = store.get("vid00000001", "en")
+
+    assert result == {"items": ITEMS, "language": "en", "is_generated": False}
+    assert store.get("vid00000001", "en", is_generated=True)["items"][0]["text"] == "auto"
+    assert store.get("vid00000001", "fr") is None
+
+
+def test_expired_entries_are_ignored(tmp_path):
+    """測試過期項目不會被回傳"""
+    store = TranscriptStore(str(tmp_path / "t.sqlite3"))
+
+    with patch('app.services.transcript_store.time.time', return_value=1000.0):
+        store.put("vid00000001", "en", False, ITEMS, ttl=10)
+
+    with patch('app.services.transcript_store.time.time', return_value=1011.0):
+        assert store.get("vid00000001", "en") is None
+
+
+def test_size_bounded_eviction(tmp_path):
+    """測試超過容量上限時淘汰最久未讀取的項目"""
+    store = TranscriptStore(str(tmp_path / "t.sqlite3"), max_bytes=150)
+    items = [{"text": "x" * 50, "start": 0.0, "duration": 1.0}]
+
+    store.put("vid00000001", "en", False, items, ttl=60)
+    store.put("vid00000002", "en", False, items, ttl=60)
+
+    assert store.get("vid00000001", "en") is None
+    assert store.get("vid00000002", "en") is not None
+
+
+def test_byte_total_tracks_replace_and_eviction(tmp_path):
+    """測試覆寫與淘汰後總容量仍正確，且只淘汰足夠的項目"""
+    store = TranscriptStore(str(tmp_path / "t.sqlite3"), max_bytes=250)
+    items = [{"text": "x" * 50, "start": 0.0, "duration": 1.0}]
+    size = len(json.dumps(items, ensure_ascii=False))
+
+    store.put("vid00000001", "en", False, ITEMS, ttl=60)
+    store.put("vid00000001", "en", False, items, ttl=60)
+    assert store.stats() == {"entries": 1, "bytes": size, "max_bytes": 250}
+
+    store.put("vid00000002", "en", False, items, ttl=60)
+    store.put("vid00000003", "en", False, items, ttl=60)
+
+    assert store.stats()["entries"] == 2
+    assert store.stats()["bytes"] == 2 * size
+    assert store.get("vid00000001", "en") is None
+
+
+def _info(*languages):
+    return {
+        "subtitles": {language: [{"ext": "json3"}] for language in languages},
+        "automatic_captions": {},
+    }
+
+
+@pytest.mark.asyncio
+async def test_stored_fallback_does_not_hide_preferred_language(tmp_path):
+    """測試保存的回退語言字幕不會蓋過影片實際有的偏好語言"""
+    from unittest.mock import MagicMock
+
+    from app.services.transcript import get_transcript_with_fallback
+
+    store = TranscriptStore(str(tmp_path / "t.sqlite3"))
+    store.put("storefb0001", "en", False, ITEMS, ttl=60)
+    preferred = [{"text": "繁中", "start": 0.0, "duration": 1.0}]
+
+    with patch('app.services.transcript.get_transcript_store', return_value=store), \
+         patch('app.services.transcript._get_wrapper') as mock_get_wrapper:
+        mock_wrapper = MagicMock()
+        mock_wrapper.get_video_info.return_value = _info("zh-Hant", "en")
+        mock_wrapper.get_subtitles.return_value = (preferred, "zh-Hant")
+        mock_get_wrapper.return_value = mock_wrapper
+
+        items, language = await get_transcript_with_fallback(
+            "storefb0001", "zh-Hant", ["zh-Hans", "zh", "en"]
+        )
+
+    assert (items, language) == (preferred, "zh-Hant")
+    mock_wrapper.get_subtitles.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_stored_fallback_used_when_preferred_language_missing(tmp_path):
+    """測試影片沒有偏好語言時，直接回傳已保存的回退語言字幕"""
+    from unittest.mock import MagicMock
+
+    from app.services.transcript import get_transcript_with_fallback
+
+    store = TranscriptStore(str(tmp_path / "t.sqlite3"))
+    store.put("storefb0003", "en", False, ITEMS, ttl=60)
+
+    with patch('app.services.transcript.get_transcript_store', return_value=store), \
+         patch('app.services.transcript._get_wrapper') as mock_get_wrapper:
+        mock_wrapper = MagicMock()
+        mock_wrapper.get_video_info.return_value = _info("en")
+        mock_get_wrapper.return_value = mock_wrapper
+
+        items, language = await get_transcript_with_fallback(
+            "storefb0003", "zh-Hant", ["zh-Hans", "zh", "en"]
+        )
+
+    assert (items, language) == (ITEMS, "en")
+    mock_wrapper.get_subtitles.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_save_failure_does_not_fail_request(tmp_path):
+    """測試寫入持久化儲存失敗（例如執行器滿載）時仍回傳已取得的字幕"""
+    from unittest.mock import MagicMock
+
+    from app.exceptions import ServiceOverloadedError
+    from app.services.transcript import get_transcript_with_fallback
+
+    store = TranscriptStore(str(tmp_path / "t.sqlite3"))
+
+    with patch('app.services.transcript.get_transcript_store', return_value=store), \
+         patch('app.services.transcript._get_wrapper') as mock_get_wrapper, \
+         patch('app.services.transcript._save_transcript',
+               side_effect=ServiceOverloadedError()):
+        mock_wrapper = MagicMock()
+        mock_wrapper.get_subtitles.return_value = (ITEMS, "en")
+        mock_get_wrapper.return_value = mock_wrapper
+
+        items, language = await get_transcript_with_fallback("storefb0002", "en", [])
+
+    assert (items, language) == (ITEMS, "en")
@@ -0,0 +1,98 @@
+"""
+影片 metadata 服務測試
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import video
+from app.services.cache import get_info_cache, get_metadata_cache
+
+client = TestClient(app)
+
+VIDEO_ID = "meta0000001"
+
+
+class FakeYouTube:
+    """記錄建構次數與讀取過的屬性"""
+
+    instances = []
+
+    def __init__(self, url):
+        self.url = url
+        self.accessed = []
+        FakeYouTube.instances.append(self)
+
+    def __getattr__(self, name):
+        values = {
+            "title": "Title",
+            "channel_id": "UCexample",
+            "author": "Example",
+            "length": 300,
+            "publish_date": datetime(2024, 1, 15),
+            "thumbnail_url": "https://i.ytimg.com/vi/meta0000001/hq.jpg",
+            "chapters": [SimpleNamespace(title="Intro", start_seconds=0)],
+        }
+        if name not in values:
+            raise AttributeError(name)
+        self.accessed.append(name)
+        return values[name]
+
+
+@pytest.fixture(autouse=True)
+def fake_youtube():
+    FakeYouTube.instances = []
+    get_metadata_cache().delete(("video", VIDEO_ID))
+    get_info_cache().delete(VIDEO_ID)
+    with patch.object(video, "YouTube", FakeYouTube), \
+         patch.object(video, "_backend", video.PytubefixMetadataBackend()), \
+         patch.object(video, "_provider", None):
+        yield
+    get_metadata_cache().delete(("video", VIDEO_ID))
+
+
+def test_single_extraction_and_cache():
+    """測試所有欄位來自同一個 YouTube 物件，快取命中時不再建構"""
+    metadata = video.get_video_metadata(VIDEO_ID)
+    assert len(FakeYouTube.instances) == 1
+    assert metadata["channel_name"] == "Example"
+    assert metadata["publish_date"] == "2024-01-15"
+    assert metadata["chapters"] == [{"title": "Intro", "start_seconds": 0}]
+
+    assert video.get_video_metadata(VIDEO_ID) == metadata
+    assert len(FakeYouTube.instances) == 1
+
+
+def test_only_requested_fields_are_loaded():
+    """測試只讀取請求的欄位，之後只補抓缺少的欄位"""
+    assert video.get_video_metadata(VIDEO_ID, ["title"]) == {"title": "Title"}
+    assert FakeYouTube.instances[0].accessed == ["title"]
+
+    video.get_video_metadata(VIDEO_ID, ["title", "chapters"])
+    assert len(FakeYouTube.instances) == 2
+    assert FakeYouTube.instances[1].accessed == ["chapters"]
+
+
+def test_uses_ytdlp_info_cache():
+    """測試 yt-dlp 已 extract 過時直接使用 info_dict"""
+    get_info_cache().set(VIDEO_ID, {
+        "title": "From yt-dlp", "channel": "Example", "upload_date": "20240115",
+        "chapters": [{"title": "Intro", "start_time": 0.0}],
+    })
+    metadata = video.get_video_metadata(VIDEO_ID)
+    assert FakeYouTube.instances == []
+    assert metadata["title"] == "From yt-dlp"
+    assert metadata["publish_date"] == "2024-01-15"
+
+
+def test_info_endpoint_builds_one_youtube_object():
+    """測試 /video/{id}/info 只建構一次 YouTube 物件"""
+    response = client.get(f"/api/v1/video/{VIDEO_ID}/info")
+    assert response.status_code == 200
+    assert response.json()["channel_id"] == "UCexample"
+    assert len(FakeYouTube.instances) == 1
@@ -0,0 +1,32 @@
+"""
+Whisper 轉錄結果儲存單元測試
+"""
+
+from app.services.whisper_store import WhisperStore
+
+
+ITEMS = [{"text": "轉錄", "start": 0.0, "duration": 2.0}]
+
+
+def test_put_and_get(tmp_path):
+    """測試寫入後可讀回，相同內容共用同一個 object"""
+    store = WhisperStore(str(tmp_path))
+
+    digest = store.put("vid00000001", "zh", ITEMS)
+    assert store.put("vid00000002", "zh", ITEMS) == digest
+
+    assert store.get("vid00000001", "zh") == ITEMS
+    assert store.get("vid00000002", "zh") == ITEMS
+    assert store.get("vid00000001", "en") is None
+
+
+def test_corrupted_object_is_discarded(tmp_path):
+    """測試內容損毀時完整性檢查失敗並視為未命中"""
+    store = WhisperStore(str(tmp_path))
+    digest = store.put("vid00000001", "zh", ITEMS)
+
+    with open(store._object_path(digest), "wb") as f:
+        f.write(b'[{"text": "tampered"}]')
+
+    assert store.get("vid00000001", "zh") is None
+    assert store.get("vid00000001", "zh") is None
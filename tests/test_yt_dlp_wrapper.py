@@ -0,0 +1,214 @@
+"""
+YtDlpWrapper 單元測試
+"""
+
+import json
+from unittest.mock import patch
+
+from app.services.yt_dlp_wrapper import YtDlpWrapper
+
+
+SAMPLE_INFO = {
+    'id': 'test_video1',
+    'subtitles': {
+        'en': [
+            {'ext': 'vtt', 'url': 'https://example.com/en.vtt'},
+            {'ext': 'json3', 'url': 'https://example.com/en.json3'},
+        ]
+    },
+    'automatic_captions': {},
+}
+
+SAMPLE_JSON3 = {
+    'events': [
+        {'tStartMs': 0, 'dDurationMs': 1500, 'segs': [{'utf8': 'Hello '}, {'utf8': 'world'}]},
+        {'tStartMs': 1500, 'dDurationMs': 500, 'segs': [{'utf8': '\n'}]},
+        {'tStartMs': 2000, 'dDurationMs': 1000},
+    ]
+}
+
+
+def test_get_subtitles_in_memory():
+    """測試直接使用 info_dict 中的 json3 URL，不觸發第二次下載"""
+    wrapper = YtDlpWrapper(in_memory_subtitles=True)
+
+    with patch.object(wrapper, 'get_video_info', return_value=SAMPLE_INFO), \
+         patch.object(wrapper, '_fetch_subtitle', return_value=[{'text': 'x'}]) as mock_fetch, \
+         patch.object(wrapper, '_download_subtitle') as mock_download:
+
+        items, lang = wrapper.get_subtitles('test_video1', 'en', [])
+
+        assert lang == 'en'
+        assert items == [{'text': 'x'}]
+        mock_fetch.assert_called_once_with('https://example.com/en.json3')
+        mock_download.assert_not_called()
+
+
+def test_get_subtitles_falls_back_to_download():
+    """測試記憶體取回的內容無法解析時退回下載流程"""
+    wrapper = YtDlpWrapper(in_memory_subtitles=True)
+    bad_json = json.JSONDecodeError("Expecting value", "", 0)
+
+    with patch.object(wrapper, 'get_video_info', return_value=SAMPLE_INFO), \
+         patch.object(wrapper, '_fetch_subtitle', side_effect=bad_json), \
+         patch.object(wrapper, '_download_subtitle', return_value=[]) as mock_download:
+
+        wrapper.get_subtitles('test_video1', 'en', [])
+
+        mock_download.assert_called_once_with('test_video1', 'en', False)
+
+
+def test_get_subtitles_raises_http_errors_without_download():
+    """測試節流與 HTTP 錯誤直接拋出，不以下載流程再打一次上游"""
+    import httpx
+    import pytest
+
+    url = 'https://example.com/en.json3'
+    response = httpx.Response(429, request=httpx.Request('GET', url))
+    error = httpx.HTTPStatusError(
+        "429 Too Many Requests", request=response.request, response=response
+    )
+    wrapper = YtDlpWrapper(in_memory_subtitles=True)
+
+    with patch.object(wrapper, 'get_video_info', return_value=SAMPLE_INFO), \
+         patch.object(wrapper, '_fetch_subtitle', side_effect=error), \
+         patch.object(wrapper, '_download_subtitle') as mock_download:
+
+        with pytest.raises(httpx.HTTPStatusError):
+            wrapper.get_subtitles('test_video1', 'en', [])
+
+        mock_download.assert_not_called()
+
+
+def test_fetch_subtitle_uses_shared_upstream_client():
+    """測試在服務中執行時，json3 字幕透過共用的連線池取回"""
+    from unittest.mock import MagicMock
+
+    import httpx
+
+    url = 'https://example.com/en.json3'
+    clients = MagicMock(bound=True)
+    clients.request_sync.return_value = httpx.Response(
+        200, json=SAMPLE_JSON3, request=httpx.Request('GET', url)
+    )
+    wrapper = YtDlpWrapper(in_memory_subtitles=True)
+
+    with patch('app.services.yt_dlp_wrapper.get_upstream_clients', return_value=clients), \
+         patch('app.services.yt_dlp_wrapper.yt_dlp.YoutubeDL') as mock_ydl:
+        items = wrapper._fetch_subtitle(url)
+
+    assert items == [{'text': 'Hello world', 'start': 0.0, 'duration': 1.5}]
+    clients.request_sync.assert_called_once_with('GET', url)
+    mock_ydl.assert_not_called()
+
+
+def test_parse_json3():
+    """測試 json3 解析會略過空白事件並轉換時間單位"""
+    items = YtDlpWrapper()._parse_json3(SAMPLE_JSON3)
+
+    assert items == [{'text': 'Hello world', 'start': 0.0, 'duration': 1.5}]
+
+
+def test_get_video_info_uses_shared_cache():
+    """測試 info_dict 會被精簡後快取，重複查詢不再 extract"""
+    from app.services.cache import get_info_cache
+
+    wrapper = YtDlpWrapper()
+    full_info = dict(SAMPLE_INFO, title='Test', formats=[{'format_id': '18'}] * 100)
+    get_info_cache().delete('test_video1')
+
+    with patch.object(wrapper, '_extract_info', return_value=full_info) as mock_extract:
+        first = wrapper.get_video_info('test_video1')
+        second = wrapper.get_video_info('test_video1')
+        languages = wrapper.list_available_subtitles('test_video1')
+
+    mock_extract.assert_called_once_with('test_video1')
+    assert first is second
+    assert 'formats' not in first
+    assert first['title'] == 'Test'
+    assert [lang['code'] for lang in languages] == ['en']
+    get_info_cache().delete('test_video1')
+
+
+def test_extractor_pool_runs_in_worker_process():
+    """測試工作行程池在獨立行程中執行，並於逾時後重建"""
+    import os
+    import time
+
+    import pytest
+
+    from app.services.ytdlp_pool import ExtractorPool
+
+    pool = ExtractorPool(processes=1, max_tasks_per_child=10, timeout=30)
+    try:
+        assert pool.call(os.getpid) != os.getpid()
+
+        pool.timeout = 0.5
+        with pytest.raises(TimeoutError):
+            pool.call(time.sleep, 5)
+
+        pool.timeout = 30
+        assert pool.call(os.getpid) != os.getpid()
+        assert pool.stats()["restarts"] == 1
+    finally:
+        pool.close()
+
+
+def test_extractor_pool_restart_resubmits_other_pending_jobs():
+    """測試行程池因其他工作逾時而重建時，尚未完成的工作重新送出而不是失敗"""
+    import threading
+    import time
+
+    from app.services.ytdlp_pool import ExtractorPool
+
+    pool = ExtractorPool(processes=2, max_tasks_per_child=10, timeout=30)
+    results = []
+
+    def pending_job():
+        results.append(pool.call(time.sleep, 1))
+
+    try:
+        pool.call(time.sleep, 0)  # 啟動工作行程
+        waiter = threading.Thread(target=pending_job)
+        waiter.start()
+        time.sleep(0.2)
+
+        # 模擬另一個工作逾時而重建行程池
+        pool._restart(pool._pool)
+
+        waiter.join(timeout=30)
+        assert not waiter.is_alive()
+        assert results == [None]
+        assert pool.stats()["restarts"] == 1
+    finally:
+        pool.close()
+
+
+def test_worker_error_keeps_ytdlp_error_class_and_expected():
+    """測試工作行程的 yt-dlp 例外傳回後還原為原本類別並保留 expected 旗標"""
+    import pickle
+
+    from yt_dlp.utils import DownloadError, ExtractorError
+
+    from app.exceptions import VideoNotFoundError
+    from app.services.transcript import classify_failure
+    from app.services.ytdlp_pool import WorkerError
+
+    cause = ExtractorError("Private video. Sign in if you've been granted access", expected=True)
+    error = DownloadError(f"ERROR: {cause}", exc_info=(ExtractorError, cause, None))
+
+    rebuilt = pickle.loads(pickle.dumps(WorkerError.capture(error))).rebuild()
+
+    assert isinstance(rebuilt, DownloadError)
+    assert isinstance(rebuilt.exc_info[1], ExtractorError)
+    assert rebuilt.exc_info[1].expected
+    assert str(rebuilt) == str(error)
+    assert classify_failure(rebuilt) is VideoNotFoundError
+
+    unexpected = WorkerError.capture(ExtractorError("Unable to extract", expected=False)).rebuild()
+    assert isinstance(unexpected, ExtractorError) and not unexpected.expected
+    assert classify_failure(unexpected) is None
+
+    other = WorkerError.capture(ValueError("bad json")).rebuild()
+    assert isinstance(other, WorkerError)
+    assert str(other) == "ValueError: bad json"